@@ -3251,6 +3251,15 @@ WHISPER_VAD_FILTER = PersistentConfig(
 
 WHISPER_LANGUAGE = os.getenv("WHISPER_LANGUAGE", "").lower() or None
 
+# Local transcription runs in a pool of worker processes, each keeping its
+# own copy of the model resident. Requests beyond the workers wait in a
+# bounded queue and are rejected once it is full.
+WHISPER_WORKERS = int(os.getenv("WHISPER_WORKERS", "1"))
+WHISPER_QUEUE_SIZE = int(os.getenv("WHISPER_QUEUE_SIZE", "8"))
+WHISPER_QUEUE_TIMEOUT = float(os.getenv("WHISPER_QUEUE_TIMEOUT", "30"))
+# Batch size for batched inference, 1 disables batching
+WHISPER_BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE", "1"))
+
 # Add Deepgram configuration
 DEEPGRAM_API_KEY = PersistentConfig(
     "DEEPGRAM_API_KEY",
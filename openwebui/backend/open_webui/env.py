@@ -354,6 +354,29 @@ if DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL is not None:
     except Exception:
         DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL = 0.0
 
+# Seconds an authenticated user is served from the user cache, 0 disables it
+USER_CACHE_TTL = os.environ.get("USER_CACHE_TTL", "10")
+try:
+    USER_CACHE_TTL = float(USER_CACHE_TTL)
+except Exception:
+    USER_CACHE_TTL = 10.0
+
+# Seconds between the bulk updates of the users' last active timestamps
+USER_LAST_ACTIVE_FLUSH_INTERVAL = os.environ.get(
+    "USER_LAST_ACTIVE_FLUSH_INTERVAL", "10"
+)
+try:
+    USER_LAST_ACTIVE_FLUSH_INTERVAL = float(USER_LAST_ACTIVE_FLUSH_INTERVAL)
+except Exception:
+    USER_LAST_ACTIVE_FLUSH_INTERVAL = 10.0
+
+# Number of validated API keys kept in memory by each worker
+API_KEY_CACHE_SIZE = os.environ.get("API_KEY_CACHE_SIZE", "1000")
+try:
+    API_KEY_CACHE_SIZE = int(API_KEY_CACHE_SIZE)
+except Exception:
+    API_KEY_CACHE_SIZE = 1000
+
 RESET_CONFIG_ON_START = (
     os.environ.get("RESET_CONFIG_ON_START", "False").lower() == "true"
 )
@@ -513,6 +536,22 @@ if LICENSE_PUBLIC_KEY:
     )
 
 
+####################################
+# AUDIO
+####################################
+
+# Size limit of the text-to-speech cache, least recently used files are
+# evicted first. An empty value or 0 disables the limit.
+SPEECH_CACHE_MAX_SIZE_MB = os.environ.get("SPEECH_CACHE_MAX_SIZE_MB", "1024")
+if SPEECH_CACHE_MAX_SIZE_MB == "":
+    SPEECH_CACHE_MAX_SIZE_MB = 0
+else:
+    try:
+        SPEECH_CACHE_MAX_SIZE_MB = int(SPEECH_CACHE_MAX_SIZE_MB)
+    except Exception:
+        SPEECH_CACHE_MAX_SIZE_MB = 1024
+
+
 ####################################
 # MODELS
 ####################################
@@ -526,6 +565,30 @@ else:
     except Exception:
         MODELS_CACHE_TTL = 1
 
+# Upstream model lists older than MODELS_CACHE_TTL keep being served for this
+# many seconds while they are refreshed in the background
+MODELS_CACHE_STALE_TTL = os.environ.get("MODELS_CACHE_STALE_TTL", "300")
+try:
+    MODELS_CACHE_STALE_TTL = int(MODELS_CACHE_STALE_TTL)
+except Exception:
+    MODELS_CACHE_STALE_TTL = 300
+
+# Interval in seconds of the scheduled refresh of the upstream model lists,
+# 0 disables it
+MODELS_CACHE_REFRESH_INTERVAL = os.environ.get("MODELS_CACHE_REFRESH_INTERVAL", "60")
+try:
+    MODELS_CACHE_REFRESH_INTERVAL = int(MODELS_CACHE_REFRESH_INTERVAL)
+except Exception:
+    MODELS_CACHE_REFRESH_INTERVAL = 60
+
+# Maximum number of upstream model lists kept per provider, which are cached
+# per user when user info is forwarded to the providers
+MODELS_CACHE_MAX_SIZE = os.environ.get("MODELS_CACHE_MAX_SIZE", "1000")
+try:
+    MODELS_CACHE_MAX_SIZE = int(MODELS_CACHE_MAX_SIZE)
+except Exception:
+    MODELS_CACHE_MAX_SIZE = 1000
+
 
 ####################################
 # CHAT
@@ -558,6 +621,76 @@ else:
     except Exception:
         CHAT_RESPONSE_MAX_TOOL_CALL_RETRIES = 10
 
+# Post-response tasks (title, tags and follow-up generation) run concurrently,
+# at most this many at a time for each user
+CHAT_BACKGROUND_TASKS_MAX_CONCURRENCY = os.environ.get(
+    "CHAT_BACKGROUND_TASKS_MAX_CONCURRENCY", "3"
+)
+
+try:
+    CHAT_BACKGROUND_TASKS_MAX_CONCURRENCY = max(
+        int(CHAT_BACKGROUND_TASKS_MAX_CONCURRENCY), 1
+    )
+except Exception:
+    CHAT_BACKGROUND_TASKS_MAX_CONCURRENCY = 3
+
+# Timeouts in seconds for the pre-processing stages of a chat request (memory,
+# web search, image generation, tools and retrieval query generation), for
+# each stage and for all of them together. Empty disables the timeout.
+CHAT_PREPROCESSING_STAGE_TIMEOUT = os.environ.get(
+    "CHAT_PREPROCESSING_STAGE_TIMEOUT", ""
+)
+
+try:
+    CHAT_PREPROCESSING_STAGE_TIMEOUT = float(CHAT_PREPROCESSING_STAGE_TIMEOUT) or None
+except Exception:
+    CHAT_PREPROCESSING_STAGE_TIMEOUT = None
+
+CHAT_PREPROCESSING_TIMEOUT = os.environ.get("CHAT_PREPROCESSING_TIMEOUT", "")
+
+try:
+    CHAT_PREPROCESSING_TIMEOUT = float(CHAT_PREPROCESSING_TIMEOUT) or None
+except Exception:
+    CHAT_PREPROCESSING_TIMEOUT = None
+
+
+####################################
+# CODE INTERPRETER
+####################################
+
+# Number of started Jupyter kernels kept ready for the code interpreter, 0
+# starts a new kernel for every execution
+JUPYTER_KERNEL_POOL_SIZE = os.environ.get("JUPYTER_KERNEL_POOL_SIZE", "1")
+
+if JUPYTER_KERNEL_POOL_SIZE == "":
+    JUPYTER_KERNEL_POOL_SIZE = 0
+else:
+    try:
+        JUPYTER_KERNEL_POOL_SIZE = int(JUPYTER_KERNEL_POOL_SIZE)
+    except Exception:
+        JUPYTER_KERNEL_POOL_SIZE = 1
+
+JUPYTER_KERNEL_POOL_MAX_KERNELS = os.environ.get(
+    "JUPYTER_KERNEL_POOL_MAX_KERNELS", "10"
+)
+
+try:
+    JUPYTER_KERNEL_POOL_MAX_KERNELS = int(JUPYTER_KERNEL_POOL_MAX_KERNELS)
+except Exception:
+    JUPYTER_KERNEL_POOL_MAX_KERNELS = 10
+
+JUPYTER_KERNEL_IDLE_TIMEOUT = os.environ.get("JUPYTER_KERNEL_IDLE_TIMEOUT", "600")
+
+try:
+    JUPYTER_KERNEL_IDLE_TIMEOUT = int(JUPYTER_KERNEL_IDLE_TIMEOUT)
+except Exception:
+    JUPYTER_KERNEL_IDLE_TIMEOUT = 600
+
+# Keep the kernel of a chat between executions so variables persist across turns
+ENABLE_JUPYTER_KERNEL_PERSISTENCE = (
+    os.environ.get("ENABLE_JUPYTER_KERNEL_PERSISTENCE", "False").lower() == "true"
+)
+
 
 ####################################
 # WEBSOCKET SUPPORT
@@ -635,6 +768,206 @@ AIOHTTP_CLIENT_SESSION_TOOL_SERVER_SSL = (
 )
 
 
+####################################
+# OLLAMA LOAD BALANCING
+####################################
+
+# random, round_robin (weighted by the connection's "weight") or least_outstanding
+OLLAMA_LOAD_BALANCING_STRATEGY = os.environ.get(
+    "OLLAMA_LOAD_BALANCING_STRATEGY", "least_outstanding"
+).lower()
+
+# Prefer backends that already have the requested model loaded
+ENABLE_OLLAMA_RESIDENCY_ROUTING = (
+    os.environ.get("ENABLE_OLLAMA_RESIDENCY_ROUTING", "True").lower() == "true"
+)
+
+# Consecutive failures after which a backend is skipped for the cooldown
+OLLAMA_CIRCUIT_BREAKER_FAILURES = os.environ.get("OLLAMA_CIRCUIT_BREAKER_FAILURES", "3")
+try:
+    OLLAMA_CIRCUIT_BREAKER_FAILURES = int(OLLAMA_CIRCUIT_BREAKER_FAILURES)
+except Exception:
+    OLLAMA_CIRCUIT_BREAKER_FAILURES = 3
+
+OLLAMA_CIRCUIT_BREAKER_COOLDOWN = os.environ.get(
+    "OLLAMA_CIRCUIT_BREAKER_COOLDOWN", "30"
+)
+try:
+    OLLAMA_CIRCUIT_BREAKER_COOLDOWN = float(OLLAMA_CIRCUIT_BREAKER_COOLDOWN)
+except Exception:
+    OLLAMA_CIRCUIT_BREAKER_COOLDOWN = 30.0
+
+
+####################################
+# WEB LOADER
+####################################
+
+# Connections of the shared web page fetcher, in total and per host
+WEB_LOADER_MAX_CONNECTIONS = os.environ.get("WEB_LOADER_MAX_CONNECTIONS", "100")
+try:
+    WEB_LOADER_MAX_CONNECTIONS = int(WEB_LOADER_MAX_CONNECTIONS)
+except Exception:
+    WEB_LOADER_MAX_CONNECTIONS = 100
+
+WEB_LOADER_MAX_CONNECTIONS_PER_HOST = os.environ.get(
+    "WEB_LOADER_MAX_CONNECTIONS_PER_HOST", "4"
+)
+try:
+    WEB_LOADER_MAX_CONNECTIONS_PER_HOST = int(WEB_LOADER_MAX_CONNECTIONS_PER_HOST)
+except Exception:
+    WEB_LOADER_MAX_CONNECTIONS_PER_HOST = 4
+
+# Pages larger than this are not loaded
+WEB_LOADER_MAX_PAGE_SIZE_MB = os.environ.get("WEB_LOADER_MAX_PAGE_SIZE_MB", "10")
+try:
+    WEB_LOADER_MAX_PAGE_SIZE_MB = float(WEB_LOADER_MAX_PAGE_SIZE_MB)
+except Exception:
+    WEB_LOADER_MAX_PAGE_SIZE_MB = 10.0
+
+# Seconds a fetched page is reused without revalidation, unless its
+# Cache-Control max-age is shorter. 0 disables the page cache.
+WEB_LOADER_CACHE_TTL = os.environ.get("WEB_LOADER_CACHE_TTL", "600")
+try:
+    WEB_LOADER_CACHE_TTL = int(WEB_LOADER_CACHE_TTL)
+except Exception:
+    WEB_LOADER_CACHE_TTL = 600
+
+# Size limit of the page cache, least recently used pages are evicted first
+WEB_LOADER_CACHE_MAX_SIZE_MB = os.environ.get("WEB_LOADER_CACHE_MAX_SIZE_MB", "512")
+try:
+    WEB_LOADER_CACHE_MAX_SIZE_MB = int(WEB_LOADER_CACHE_MAX_SIZE_MB)
+except Exception:
+    WEB_LOADER_CACHE_MAX_SIZE_MB = 512
+
+# Seconds the addresses of the web pages' hosts are cached, 0 disables it
+WEB_LOADER_DNS_CACHE_TTL = os.environ.get("WEB_LOADER_DNS_CACHE_TTL", "60")
+try:
+    WEB_LOADER_DNS_CACHE_TTL = int(WEB_LOADER_DNS_CACHE_TTL)
+except Exception:
+    WEB_LOADER_DNS_CACHE_TTL = 60
+
+# Browser contexts kept by the shared Playwright browser, and pages each web
+# load opens at once
+PLAYWRIGHT_MAX_CONTEXTS = os.environ.get("PLAYWRIGHT_MAX_CONTEXTS", "8")
+try:
+    PLAYWRIGHT_MAX_CONTEXTS = int(PLAYWRIGHT_MAX_CONTEXTS)
+except Exception:
+    PLAYWRIGHT_MAX_CONTEXTS = 8
+
+PLAYWRIGHT_MAX_CONCURRENT_PAGES = os.environ.get("PLAYWRIGHT_MAX_CONCURRENT_PAGES", "4")
+try:
+    PLAYWRIGHT_MAX_CONCURRENT_PAGES = int(PLAYWRIGHT_MAX_CONCURRENT_PAGES)
+except Exception:
+    PLAYWRIGHT_MAX_CONCURRENT_PAGES = 4
+
+# The shared Playwright browser is closed after this many idle seconds, or
+# once it served this many pages, to cap its memory
+PLAYWRIGHT_BROWSER_IDLE_TIMEOUT = os.environ.get(
+    "PLAYWRIGHT_BROWSER_IDLE_TIMEOUT", "300"
+)
+try:
+    PLAYWRIGHT_BROWSER_IDLE_TIMEOUT = int(PLAYWRIGHT_BROWSER_IDLE_TIMEOUT)
+except Exception:
+    PLAYWRIGHT_BROWSER_IDLE_TIMEOUT = 300
+
+PLAYWRIGHT_BROWSER_MAX_PAGES = os.environ.get("PLAYWRIGHT_BROWSER_MAX_PAGES", "200")
+try:
+    PLAYWRIGHT_BROWSER_MAX_PAGES = int(PLAYWRIGHT_BROWSER_MAX_PAGES)
+except Exception:
+    PLAYWRIGHT_BROWSER_MAX_PAGES = 200
+
+# Seconds the results of a web search are reused for identical searches, 0
+# disables the cache
+WEB_SEARCH_CACHE_TTL = os.environ.get("WEB_SEARCH_CACHE_TTL", "600")
+try:
+    WEB_SEARCH_CACHE_TTL = int(WEB_SEARCH_CACHE_TTL)
+except Exception:
+    WEB_SEARCH_CACHE_TTL = 600
+
+# Number of cached web searches kept by each worker
+WEB_SEARCH_CACHE_MAX_SIZE = os.environ.get("WEB_SEARCH_CACHE_MAX_SIZE", "1000")
+try:
+    WEB_SEARCH_CACHE_MAX_SIZE = int(WEB_SEARCH_CACHE_MAX_SIZE)
+except Exception:
+    WEB_SEARCH_CACHE_MAX_SIZE = 1000
+
+# Worker processes parsing the fetched pages, 0 parses them in threads
+WEB_LOADER_PARSER_WORKERS = os.environ.get("WEB_LOADER_PARSER_WORKERS", "2")
+try:
+    WEB_LOADER_PARSER_WORKERS = int(WEB_LOADER_PARSER_WORKERS)
+except Exception:
+    WEB_LOADER_PARSER_WORKERS = 2
+
+
+####################################
+# DOCUMENT INGESTION
+####################################
+
+# Chunks embedded and inserted together while documents are ingested
+RAG_INGEST_BATCH_SIZE = os.environ.get("RAG_INGEST_BATCH_SIZE", "64")
+try:
+    RAG_INGEST_BATCH_SIZE = max(1, int(RAG_INGEST_BATCH_SIZE))
+except Exception:
+    RAG_INGEST_BATCH_SIZE = 64
+
+# Batches buffered between the ingestion stages, bounds the memory used by
+# documents that load faster than they are embedded
+RAG_INGEST_QUEUE_SIZE = os.environ.get("RAG_INGEST_QUEUE_SIZE", "4")
+try:
+    RAG_INGEST_QUEUE_SIZE = max(1, int(RAG_INGEST_QUEUE_SIZE))
+except Exception:
+    RAG_INGEST_QUEUE_SIZE = 4
+
+# Worker processes splitting large batches of documents, 0 splits them in the
+# request thread
+RAG_SPLIT_WORKERS = os.environ.get("RAG_SPLIT_WORKERS", "2")
+try:
+    RAG_SPLIT_WORKERS = int(RAG_SPLIT_WORKERS)
+except Exception:
+    RAG_SPLIT_WORKERS = 2
+
+# Batches of documents with fewer characters than this are split in the
+# request thread
+RAG_SPLIT_PARALLEL_MIN_SIZE = os.environ.get("RAG_SPLIT_PARALLEL_MIN_SIZE", "1000000")
+try:
+    RAG_SPLIT_PARALLEL_MIN_SIZE = int(RAG_SPLIT_PARALLEL_MIN_SIZE)
+except Exception:
+    RAG_SPLIT_PARALLEL_MIN_SIZE = 1000000
+
+# Worker processes parsing uploaded documents with the local loaders, 0
+# parses them in the request thread
+DOCUMENT_PARSER_WORKERS = os.environ.get("DOCUMENT_PARSER_WORKERS", "2")
+try:
+    DOCUMENT_PARSER_WORKERS = int(DOCUMENT_PARSER_WORKERS)
+except Exception:
+    DOCUMENT_PARSER_WORKERS = 2
+
+# Seconds a worker gets to parse a document before it is killed, 0 disables
+# the limit
+DOCUMENT_PARSER_TIMEOUT = os.environ.get("DOCUMENT_PARSER_TIMEOUT", "300")
+try:
+    DOCUMENT_PARSER_TIMEOUT = float(DOCUMENT_PARSER_TIMEOUT)
+except Exception:
+    DOCUMENT_PARSER_TIMEOUT = 300.0
+
+# Heap size limit of each parser worker, 0 disables the limit
+DOCUMENT_PARSER_MAX_MEMORY_MB = os.environ.get("DOCUMENT_PARSER_MAX_MEMORY_MB", "2048")
+try:
+    DOCUMENT_PARSER_MAX_MEMORY_MB = int(DOCUMENT_PARSER_MAX_MEMORY_MB)
+except Exception:
+    DOCUMENT_PARSER_MAX_MEMORY_MB = 2048
+
+# Size limit of the cache of parsed documents, least recently used documents
+# are evicted first. 0 disables the cache.
+DOCUMENT_PARSER_CACHE_MAX_SIZE_MB = os.environ.get(
+    "DOCUMENT_PARSER_CACHE_MAX_SIZE_MB", "512"
+)
+try:
+    DOCUMENT_PARSER_CACHE_MAX_SIZE_MB = int(DOCUMENT_PARSER_CACHE_MAX_SIZE_MB)
+except Exception:
+    DOCUMENT_PARSER_CACHE_MAX_SIZE_MB = 512
+
+
 ####################################
 # SENTENCE TRANSFORMERS
 ####################################
@@ -797,6 +1130,12 @@ OTEL_LOGS_OTLP_SPAN_EXPORTER = os.environ.get(
 PIP_OPTIONS = os.getenv("PIP_OPTIONS", "").split()
 PIP_PACKAGE_INDEX_OPTIONS = os.getenv("PIP_PACKAGE_INDEX_OPTIONS", "").split()
 
+# Persist compiled tool/function bytecode in the cache directory so workers
+# do not compile every plugin again on a cold start
+ENABLE_PLUGIN_BYTECODE_CACHE = (
+    os.environ.get("ENABLE_PLUGIN_BYTECODE_CACHE", "True").lower() == "true"
+)
+
 
 ####################################
 # PROGRESSIVE WEB APP OPTIONS
@@ -440,6 +440,7 @@ from open_webui.env import (
     ENABLE_OTEL,
     EXTERNAL_PWA_MANIFEST_URL,
     AIOHTTP_CLIENT_SESSION_SSL,
+    MODELS_CACHE_REFRESH_INTERVAL,
 )
 
 
@@ -448,6 +449,7 @@ from open_webui.utils.models import (
     get_all_base_models,
     check_model_access,
     get_filtered_models,
+    periodic_models_cache_refresh,
 )
 from open_webui.utils.chat import (
     generate_chat_completion as chat_completion_handler,
@@ -455,6 +457,10 @@ from open_webui.utils.chat import (
     chat_action as chat_action_handler,
 )
 from open_webui.utils.embeddings import generate_embeddings
+from open_webui.utils.code_interpreter import close_jupyter_kernel_pools
+from open_webui.retrieval.web.utils import WEB_PAGE_FETCHER
+from open_webui.retrieval.web.browser import close_browser_pools
+from open_webui.routers.retrieval import DOCUMENT_PARSER, SPLITTER_POOL
 from open_webui.utils.middleware import process_chat_payload, process_chat_response
 from open_webui.utils.access_control import has_access
 
@@ -464,8 +470,13 @@ from open_webui.utils.auth import (
     decode_token,
     get_admin_user,
     get_verified_user,
+    flush_last_active,
+    periodic_users_last_active_flush,
+)
+from open_webui.utils.plugin import (
+    install_tool_and_function_dependencies,
+    warm_function_module_cache,
 )
-from open_webui.utils.plugin import install_tool_and_function_dependencies
 from open_webui.utils.oauth import OAuthManager
 from open_webui.utils.security_headers import SecurityHeadersMiddleware
 from open_webui.utils.redis import get_redis_connection
@@ -560,26 +571,38 @@ async def lifespan(app: FastAPI):
         limiter.total_tokens = THREAD_POOL_SIZE
 
     asyncio.create_task(periodic_usage_pool_cleanup())
+    app.state.users_last_active_flush = asyncio.create_task(
+        periodic_users_last_active_flush()
+    )
+
+    # Creating a mock request object to pass to internal helpers
+    internal_request = Request(
+        {
+            "type": "http",
+            "asgi.version": "3.0",
+            "asgi.spec_version": "2.0",
+            "method": "GET",
+            "path": "/internal",
+            "query_string": b"",
+            "headers": Headers({}).raw,
+            "client": ("127.0.0.1", 12345),
+            "server": ("127.0.0.1", 80),
+            "scheme": "http",
+            "app": app,
+        }
+    )
+
+    # Loaded in the background, requests load the functions they need
+    app.state.function_warmup = asyncio.create_task(
+        asyncio.to_thread(warm_function_module_cache, internal_request)
+    )
 
     if app.state.config.ENABLE_BASE_MODELS_CACHE:
-        await get_all_models(
-            Request(
-                # Creating a mock request object to pass to get_all_models
-                {
-                    "type": "http",
-                    "asgi.version": "3.0",
-                    "asgi.spec_version": "2.0",
-                    "method": "GET",
-                    "path": "/internal",
-                    "query_string": b"",
-                    "headers": Headers({}).raw,
-                    "client": ("127.0.0.1", 12345),
-                    "server": ("127.0.0.1", 80),
-                    "scheme": "http",
-                    "app": app,
-                }
-            ),
-            None,
+        await get_all_models(internal_request, refresh=True)
+
+    if MODELS_CACHE_REFRESH_INTERVAL > 0:
+        app.state.models_cache_refresh = asyncio.create_task(
+            periodic_models_cache_refresh(app)
         )
 
     yield
@@ -587,6 +610,19 @@ async def lifespan(app: FastAPI):
     if hasattr(app.state, "redis_task_command_listener"):
         app.state.redis_task_command_listener.cancel()
 
+    app.state.users_last_active_flush.cancel()
+    if hasattr(app.state, "models_cache_refresh"):
+        app.state.models_cache_refresh.cancel()
+    await asyncio.to_thread(flush_last_active)
+
+    await close_jupyter_kernel_pools()
+    await images.close_image_http_session()
+    await pipelines.close_pipelines_session()
+    await WEB_PAGE_FETCHER.close()
+    await close_browser_pools()
+    DOCUMENT_PARSER.close()
+    SPLITTER_POOL.close()
+
 
 app = FastAPI(
     title="Open WebUI",
@@ -772,7 +808,8 @@ app.state.TOOLS = {}
 app.state.TOOL_CONTENTS = {}
 
 app.state.FUNCTIONS = {}
-app.state.FUNCTION_CONTENTS = {}
+app.state.FUNCTION_HASHES = {}
+app.state.FUNCTION_UPDATED_AT = {}
 
 ########################################
 #
@@ -1090,7 +1127,7 @@ app.state.config.TTS_AZURE_SPEECH_BASE_URL = AUDIO_TTS_AZURE_SPEECH_BASE_URL
 app.state.config.TTS_AZURE_SPEECH_OUTPUT_FORMAT = AUDIO_TTS_AZURE_SPEECH_OUTPUT_FORMAT
 
 
-app.state.faster_whisper_model = None
+app.state.whisper_pool = None
 app.state.speech_synthesiser = None
 app.state.speech_speaker_embeddings_dataset = None
 
@@ -1142,6 +1179,8 @@ app.state.config.AUTOCOMPLETE_GENERATION_INPUT_MAX_LENGTH = (
 ########################################
 
 app.state.MODELS = {}
+app.state.MODELS_ACCESS = None
+app.state.MODELS_REGISTRY = None
 
 
 class RedirectMiddleware(BaseHTTPMiddleware):
@@ -1307,10 +1346,11 @@ async def get_models(
             tags = [tag.get("name") for tag in model.get("tags", [])]
 
             tags = list(set(model_tags + tags))
-            model["tags"] = [{"name": tag} for tag in tags]
+            # Copied, the models of the registry are shared between requests
+            model = {**model, "tags": [{"name": tag} for tag in tags]}
         except Exception as e:
             log.debug(f"Error processing model tags: {e}")
-            model["tags"] = []
+            model = {**model, "tags": []}
             pass
 
         models.append(model)
@@ -1326,7 +1366,7 @@ async def get_models(
             )
         )
 
-    models = get_filtered_models(models, user)
+    models = get_filtered_models(models, user, request.app.state.MODELS_ACCESS)
 
     log.debug(
         f"/api/models returned filtered models accessible to the user: {json.dumps([model.get('id') for model in models])}"
@@ -0,0 +1,78 @@
+"""Add api_key table
+
+Revision ID: 9a9b46f2c730
+Revises: 38d63c18f30f
+Create Date: 2025-09-22 10:12:41.518306
+
+"""
+
+import hashlib
+import time
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import table, column
+
+# revision identifiers, used by Alembic.
+revision: str = "9a9b46f2c730"
+down_revision: Union[str, None] = "38d63c18f30f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match API_KEY_PREFIX_LENGTH in open_webui.models.api_keys
+API_KEY_PREFIX_LENGTH = 10
+
+
+def upgrade() -> None:
+    # Create api_key table, keys are stored by their SHA-256 hash
+    op.create_table(
+        "api_key",
+        sa.Column("id", sa.Text(), nullable=False),
+        sa.Column("user_id", sa.Text(), nullable=False),
+        sa.Column("prefix", sa.Text(), nullable=False),
+        sa.Column("last_used_at", sa.BigInteger(), nullable=True),
+        sa.Column("created_at", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("idx_api_key_user_id", "api_key", ["user_id"])
+
+    user = table(
+        "user",
+        column("id", sa.String()),
+        column("api_key", sa.String()),
+    )
+    api_key = table(
+        "api_key",
+        column("id", sa.Text()),
+        column("user_id", sa.Text()),
+        column("prefix", sa.Text()),
+        column("created_at", sa.BigInteger()),
+    )
+
+    # Move the existing keys over, they keep working but are no longer
+    # stored in plain text
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.select(user.c.id, user.c.api_key).where(user.c.api_key.isnot(None))
+    ).fetchall()
+
+    now = int(time.time())
+    for user_id, key in rows:
+        conn.execute(
+            api_key.insert().values(
+                id=hashlib.sha256(key.encode()).hexdigest(),
+                user_id=user_id,
+                prefix=key[:API_KEY_PREFIX_LENGTH],
+                created_at=now,
+            )
+        )
+
+    conn.execute(user.update().where(user.c.api_key.isnot(None)).values(api_key=None))
+
+
+def downgrade() -> None:
+    # The keys can't be recovered from their hashes, users have to create
+    # new ones after a downgrade
+    op.drop_index("idx_api_key_user_id", table_name="api_key")
+    op.drop_table("api_key")
@@ -0,0 +1,272 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from open_webui.internal.db import Base, get_db
+from open_webui.env import (
+    API_KEY_CACHE_SIZE,
+    REDIS_KEY_PREFIX,
+    SRC_LOG_LEVELS,
+    USER_CACHE_TTL,
+)
+from open_webui.utils.redis import get_shared_redis_connection
+
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import BigInteger, Column, Text, Index, case
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+# Number of leading characters of a key kept to identify it, e.g. "sk-1a2b3c4"
+API_KEY_PREFIX_LENGTH = 10
+
+####################
+# DB MODEL
+####################
+
+
+class ApiKey(Base):
+    __tablename__ = "api_key"
+
+    # SHA-256 of the key, the key itself is never stored
+    id = Column(Text, primary_key=True)
+    user_id = Column(Text, nullable=False)
+    prefix = Column(Text, nullable=False)
+
+    last_used_at = Column(BigInteger, nullable=True)
+    created_at = Column(BigInteger, nullable=False)
+
+    __table_args__ = (Index("idx_api_key_user_id", "user_id"),)
+
+
+class ApiKeyModel(BaseModel):
+    id: str
+    user_id: str
+    prefix: str
+
+    last_used_at: Optional[int] = None  # timestamp in epoch
+    created_at: int  # timestamp in epoch
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+####################
+# API Key Cache
+####################
+
+
+class ApiKeyCache:
+    """
+    Bounded LRU of validated API keys, mapping key hashes to user ids.
+
+    Revoking a key bumps the revocation version, which drops every cached key
+    the next time it is checked. With Redis the version is shared by all
+    workers, otherwise revocations made by another worker are picked up once
+    the entry expires.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self._keys: OrderedDict[str, tuple[str, int, float]] = OrderedDict()
+        self._version = 0
+        self._lock = threading.Lock()
+
+        self._redis = None
+        self._redis_initialized = False
+
+    def _get_redis(self):
+        if not self._redis_initialized:
+            self._redis_initialized = True
+            try:
+                self._redis = get_shared_redis_connection()
+            except Exception as e:
+                log.warning(f"API key cache is not shared, redis unavailable: {e}")
+        return self._redis
+
+    def _get_version_key(self) -> str:
+        return f"{REDIS_KEY_PREFIX}:api_keys:version"
+
+    def get_version(self) -> Optional[int]:
+        redis = self._get_redis()
+        if redis is not None:
+            try:
+                return int(redis.get(self._get_version_key()) or 0)
+            except Exception as e:
+                log.warning(f"Failed to read the API key cache version: {e}")
+                return None
+        return self._version
+
+    def get(self, key_hash: str, version: Optional[int]) -> Optional[str]:
+        if not self.max_size or version is None:
+            return None
+
+        with self._lock:
+            entry = self._keys.get(key_hash)
+            if entry is None:
+                return None
+
+            user_id, entry_version, expires_at = entry
+            if entry_version != version or expires_at <= time.time():
+                self._keys.pop(key_hash, None)
+                return None
+
+            self._keys.move_to_end(key_hash)
+            return user_id
+
+    def set(self, key_hash: str, user_id: str, version: Optional[int]):
+        if not self.max_size or version is None:
+            return
+
+        with self._lock:
+            self._keys[key_hash] = (user_id, version, time.time() + self.ttl)
+            self._keys.move_to_end(key_hash)
+            while len(self._keys) > self.max_size:
+                self._keys.popitem(last=False)
+
+    def revoke(self, key_hashes: list[str]):
+        with self._lock:
+            for key_hash in key_hashes:
+                self._keys.pop(key_hash, None)
+            self._version += 1
+
+        redis = self._get_redis()
+        if redis is not None:
+            try:
+                redis.incr(self._get_version_key())
+            except Exception as e:
+                log.warning(f"Failed to propagate the API key revocation: {e}")
+
+
+API_KEY_CACHE = ApiKeyCache(API_KEY_CACHE_SIZE, USER_CACHE_TTL)
+
+
+class ApiKeysTable:
+    def __init__(self):
+        # Last used timestamps waiting to be written by the next flush
+        self._last_used: dict[str, int] = {}
+        self._last_used_lock = threading.Lock()
+
+    @staticmethod
+    def hash_api_key(api_key: str) -> str:
+        # Keys are random tokens, a fast unsalted hash keeps lookups indexable
+        return hashlib.sha256(api_key.encode()).hexdigest()
+
+    @staticmethod
+    def get_api_key_prefix(api_key: str) -> str:
+        return api_key[:API_KEY_PREFIX_LENGTH]
+
+    def insert_new_api_key(self, user_id: str, api_key: str) -> Optional[ApiKeyModel]:
+        """
+        Store the hash of a new API key, replacing the keys of the user.
+        """
+        self.delete_api_keys_by_user_id(user_id)
+
+        try:
+            with get_db() as db:
+                result = ApiKey(
+                    **{
+                        "id": self.hash_api_key(api_key),
+                        "user_id": user_id,
+                        "prefix": self.get_api_key_prefix(api_key),
+                        "created_at": int(time.time()),
+                    }
+                )
+                db.add(result)
+                db.commit()
+                db.refresh(result)
+                return ApiKeyModel.model_validate(result)
+        except Exception as e:
+            log.exception(f"Error inserting an API key: {e}")
+            return None
+
+    def get_api_key_by_user_id(self, user_id: str) -> Optional[ApiKeyModel]:
+        try:
+            with get_db() as db:
+                api_key = (
+                    db.query(ApiKey)
+                    .filter_by(user_id=user_id)
+                    .order_by(ApiKey.created_at.desc())
+                    .first()
+                )
+                return ApiKeyModel.model_validate(api_key) if api_key else None
+        except Exception:
+            return None
+
+    def validate_api_key(self, api_key: str) -> Optional[str]:
+        """
+        Get the id of the user owning the API key and record the use of the
+        key, or None when the key is unknown or revoked.
+        """
+        key_hash = self.hash_api_key(api_key)
+
+        version = API_KEY_CACHE.get_version()
+        user_id = API_KEY_CACHE.get(key_hash, version)
+
+        if user_id is None:
+            try:
+                with get_db() as db:
+                    result = db.query(ApiKey.user_id).filter_by(id=key_hash).first()
+            except Exception:
+                return None
+
+            if result is None:
+                return None
+
+            user_id = result.user_id
+            API_KEY_CACHE.set(key_hash, user_id, version)
+
+        with self._last_used_lock:
+            self._last_used[key_hash] = int(time.time())
+
+        return user_id
+
+    def flush_api_keys_last_used(self) -> int:
+        with self._last_used_lock:
+            pending, self._last_used = self._last_used, {}
+
+        if not pending:
+            return 0
+
+        try:
+            with get_db() as db:
+                db.query(ApiKey).filter(ApiKey.id.in_(pending.keys())).update(
+                    {"last_used_at": case(pending, value=ApiKey.id)},
+                    synchronize_session=False,
+                )
+                db.commit()
+            return len(pending)
+        except Exception as e:
+            log.exception(f"Failed to update the API keys' last used timestamps: {e}")
+
+            # Keep the timestamps for the next flush unless newer ones arrived
+            with self._last_used_lock:
+                self._last_used = {**pending, **self._last_used}
+            return 0
+
+    def delete_api_keys_by_user_id(self, user_id: str) -> bool:
+        try:
+            with get_db() as db:
+                key_hashes = [
+                    api_key.id
+                    for api_key in db.query(ApiKey.id).filter_by(user_id=user_id)
+                ]
+                if key_hashes:
+                    db.query(ApiKey).filter(ApiKey.id.in_(key_hashes)).delete(
+                        synchronize_session=False
+                    )
+                    db.commit()
+
+            if key_hashes:
+                API_KEY_CACHE.revoke(key_hashes)
+            return True
+        except Exception as e:
+            log.exception(f"Error deleting the API keys of user {user_id}: {e}")
+            return False
+
+
+ApiKeys = ApiKeysTable()
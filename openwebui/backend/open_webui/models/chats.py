@@ -1,3 +1,4 @@
+import copy
 import logging
 import json
 import time
@@ -229,6 +230,76 @@ class ChatTable:
             self.add_chat_tag_by_id_and_user_id_and_tag_name(id, user.id, tag_name)
         return self.get_chat_by_id(id)
 
+    def update_chat_task_results_by_id(
+        self,
+        id: str,
+        user_id: str,
+        message_id: str,
+        title: Optional[str] = None,
+        tags: Optional[list[str]] = None,
+        follow_ups: Optional[list[str]] = None,
+    ) -> Optional[ChatModel]:
+        """
+        Store the results of the post-response tasks (title, tags and
+        follow-ups of a message) with a single write to the chat.
+        """
+        tag_ids = None
+        if tags is not None:
+            tag_ids = []
+            for tag_name in tags:
+                if tag_name.lower() == "none":
+                    continue
+
+                tag = Tags.get_tag_by_name_and_user_id(tag_name, user_id)
+                if tag is None:
+                    tag = Tags.insert_new_tag(tag_name, user_id)
+                if tag is not None and tag.id not in tag_ids:
+                    tag_ids.append(tag.id)
+
+        try:
+            with get_db() as db:
+                chat_item = db.get(Chat, id)
+                if chat_item is None:
+                    return None
+
+                previous_tag_ids = chat_item.meta.get("tags", [])
+                chat = copy.deepcopy(chat_item.chat)
+
+                if title is not None:
+                    chat["title"] = title
+                    chat_item.title = title
+
+                if follow_ups is not None:
+                    history = chat.get("history", {})
+                    messages = history.setdefault("messages", {})
+                    messages[message_id] = {
+                        **messages.get(message_id, {}),
+                        "followUps": follow_ups,
+                    }
+                    history["currentId"] = message_id
+                    chat["history"] = history
+
+                if tag_ids is not None:
+                    chat_item.meta = {**chat_item.meta, "tags": tag_ids}
+
+                chat_item.chat = chat
+                chat_item.updated_at = int(time.time())
+                db.commit()
+                db.refresh(chat_item)
+                chat_model = ChatModel.model_validate(chat_item)
+        except Exception:
+            return None
+
+        if tag_ids is not None:
+            for tag_id in previous_tag_ids:
+                if (
+                    tag_id not in tag_ids
+                    and self.count_chats_by_tag_name_and_user_id(tag_id, user_id) == 0
+                ):
+                    Tags.delete_tag_by_name_and_user_id(tag_id, user_id)
+
+        return chat_model
+
     def get_chat_title_by_id(self, id: str) -> Optional[str]:
         chat = self.get_chat_by_id(id)
         if chat is None:
@@ -183,6 +183,20 @@ class FunctionsTable:
         except Exception:
             return None
 
+    def get_function_updated_at_by_id(self, id: str) -> Optional[int]:
+        try:
+            with get_db() as db:
+                return db.query(Function.updated_at).filter_by(id=id).scalar()
+        except Exception:
+            return None
+
+    def get_function_content_by_id(self, id: str) -> Optional[str]:
+        try:
+            with get_db() as db:
+                return db.query(Function.content).filter_by(id=id).scalar()
+        except Exception:
+            return None
+
     def get_functions(
         self, active_only=False, include_valves=False
     ) -> list[FunctionModel | FunctionWithValvesModel]:
@@ -1,21 +1,35 @@
+import json
+import logging
+import math
+import threading
 import time
 from typing import Optional
 
 from open_webui.internal.db import Base, JSONField, get_db
 
 
-from open_webui.env import DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL
+from open_webui.env import (
+    DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL,
+    REDIS_KEY_PREFIX,
+    SRC_LOG_LEVELS,
+    USER_CACHE_TTL,
+)
+from open_webui.models.api_keys import ApiKeys
 from open_webui.models.chats import Chats
 from open_webui.models.groups import Groups
 from open_webui.utils.misc import throttle
+from open_webui.utils.redis import get_shared_redis_connection
 
 
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Column, String, Text, Date
-from sqlalchemy import or_
+from sqlalchemy import case, or_
 
 import datetime
 
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
 ####################
 # User DB Schema
 ####################
@@ -150,7 +164,144 @@ class UserUpdateForm(BaseModel):
     password: Optional[str] = None
 
 
+####################
+# User Cache
+####################
+
+# Size above which expired entries are pruned from the in-process cache
+USER_CACHE_PRUNE_SIZE = 1024
+
+
+class UserCache:
+    """
+    Short-lived cache of users by id, used to authenticate requests without
+    reading the user table for every one of them.
+
+    Each user has a version which is bumped whenever the user changes, and a
+    cached user is only served while its version is current. With Redis the
+    versions and the cached users are shared by all workers, otherwise a
+    change made by another worker is picked up once the entry expires.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+
+        self._users: dict[str, tuple[UserModel, int, float]] = {}
+        self._versions: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self._redis = None
+        self._redis_initialized = False
+
+    def _get_redis(self):
+        if not self._redis_initialized:
+            self._redis_initialized = True
+            try:
+                self._redis = get_shared_redis_connection()
+            except Exception as e:
+                log.warning(f"User cache is not shared, redis unavailable: {e}")
+        return self._redis
+
+    def _get_user_key(self, id: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:users:{id}"
+
+    def _get_version_key(self, id: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:users:{id}:version"
+
+    def get(self, id: str) -> tuple[Optional[UserModel], Optional[int]]:
+        """
+        Get a cached user along with the current version of the user. The
+        version is passed to `set` when caching the user read from the
+        database, it is None when the user must not be cached.
+        """
+        if not self.ttl:
+            return None, None
+
+        shared_user = None
+        redis = self._get_redis()
+        if redis is not None:
+            try:
+                version, shared_user = redis.mget(
+                    [self._get_version_key(id), self._get_user_key(id)]
+                )
+                version = int(version or 0)
+            except Exception as e:
+                log.warning(f"Failed to read the user cache from redis: {e}")
+                return None, None
+        else:
+            version = self._versions.get(id, 0)
+
+        now = time.time()
+
+        entry = self._users.get(id)
+        if entry is not None:
+            user, user_version, expires_at = entry
+            if user_version == version and expires_at > now:
+                return user, version
+
+        if shared_user is not None:
+            try:
+                data = json.loads(shared_user)
+                if data["version"] == version:
+                    user = UserModel.model_validate(data["user"])
+                    self._users[id] = (user, version, now + self.ttl)
+                    return user, version
+            except Exception as e:
+                log.warning(f"Invalid cached user {id}: {e}")
+
+        return None, version
+
+    def set(self, id: str, user: UserModel, version: Optional[int]):
+        if not self.ttl or version is None:
+            return
+
+        now = time.time()
+        if len(self._users) > USER_CACHE_PRUNE_SIZE:
+            with self._lock:
+                for key, (_, _, expires_at) in list(self._users.items()):
+                    if expires_at <= now:
+                        self._users.pop(key, None)
+
+        self._users[id] = (user, version, now + self.ttl)
+
+        redis = self._get_redis()
+        if redis is not None:
+            try:
+                redis.set(
+                    self._get_user_key(id),
+                    json.dumps(
+                        {"version": version, "user": user.model_dump(mode="json")}
+                    ),
+                    ex=math.ceil(self.ttl),
+                )
+            except Exception as e:
+                log.warning(f"Failed to write the user cache to redis: {e}")
+
+    def invalidate(self, id: str):
+        self._users.pop(id, None)
+        with self._lock:
+            self._versions[id] = self._versions.get(id, 0) + 1
+
+        redis = self._get_redis()
+        if redis is not None:
+            try:
+                pipe = redis.pipeline()
+                pipe.incr(self._get_version_key(id))
+                pipe.delete(self._get_user_key(id))
+                pipe.execute()
+            except Exception as e:
+                log.warning(f"Failed to invalidate the user cache in redis: {e}")
+
+
+USER_CACHE = UserCache(USER_CACHE_TTL)
+
+
 class UsersTable:
+    def __init__(self):
+        # Last active timestamps waiting to be written by the next flush
+        self._last_active: dict[str, int] = {}
+        self._last_active_lock = threading.Lock()
+
     def insert_new_user(
         self,
         id: str,
@@ -191,13 +342,22 @@ class UsersTable:
         except Exception:
             return None
 
+    def get_user_by_id_cached(self, id: str) -> Optional[UserModel]:
+        """
+        Get a user by id through the user cache, for request authentication.
+        """
+        user, version = USER_CACHE.get(id)
+        if user is None:
+            user = self.get_user_by_id(id)
+            if user is not None:
+                USER_CACHE.set(id, user, version)
+        return user
+
     def get_user_by_api_key(self, api_key: str) -> Optional[UserModel]:
-        try:
-            with get_db() as db:
-                user = db.query(User).filter_by(api_key=api_key).first()
-                return UserModel.model_validate(user)
-        except Exception:
+        user_id = ApiKeys.validate_api_key(api_key)
+        if user_id is None:
             return None
+        return self.get_user_by_id_cached(user_id)
 
     def get_user_by_email(self, email: str) -> Optional[UserModel]:
         try:
@@ -327,6 +487,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update({"role": role})
                 db.commit()
+                USER_CACHE.invalidate(id)
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
         except Exception:
@@ -341,6 +502,7 @@ class UsersTable:
                     {"profile_image_url": profile_image_url}
                 )
                 db.commit()
+                USER_CACHE.invalidate(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -361,6 +523,37 @@ class UsersTable:
         except Exception:
             return None
 
+    def touch_user_last_active_by_id(self, id: str):
+        """
+        Record that the user is active. The timestamps are written in bulk by
+        `flush_users_last_active` rather than with one UPDATE per request.
+        """
+        with self._last_active_lock:
+            self._last_active[id] = int(time.time())
+
+    def flush_users_last_active(self) -> int:
+        with self._last_active_lock:
+            pending, self._last_active = self._last_active, {}
+
+        if not pending:
+            return 0
+
+        try:
+            with get_db() as db:
+                db.query(User).filter(User.id.in_(pending.keys())).update(
+                    {"last_active_at": case(pending, value=User.id)},
+                    synchronize_session=False,
+                )
+                db.commit()
+            return len(pending)
+        except Exception as e:
+            log.exception(f"Failed to update the users' last active timestamps: {e}")
+
+            # Keep the timestamps for the next flush unless newer ones arrived
+            with self._last_active_lock:
+                self._last_active = {**pending, **self._last_active}
+            return 0
+
     def update_user_oauth_sub_by_id(
         self, id: str, oauth_sub: str
     ) -> Optional[UserModel]:
@@ -368,6 +561,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update({"oauth_sub": oauth_sub})
                 db.commit()
+                USER_CACHE.invalidate(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -379,6 +573,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update(updated)
                 db.commit()
+                USER_CACHE.invalidate(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -399,6 +594,7 @@ class UsersTable:
 
                 db.query(User).filter_by(id=id).update({"settings": user_settings})
                 db.commit()
+                USER_CACHE.invalidate(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -417,6 +613,8 @@ class UsersTable:
                     # Delete User
                     db.query(User).filter_by(id=id).delete()
                     db.commit()
+                USER_CACHE.invalidate(id)
+                ApiKeys.delete_api_keys_by_user_id(id)
 
                 return True
             else:
@@ -424,22 +622,16 @@ class UsersTable:
         except Exception:
             return False
 
-    def update_user_api_key_by_id(self, id: str, api_key: str) -> bool:
-        try:
-            with get_db() as db:
-                result = db.query(User).filter_by(id=id).update({"api_key": api_key})
-                db.commit()
-                return True if result == 1 else False
-        except Exception:
-            return False
+    def update_user_api_key_by_id(self, id: str, api_key: Optional[str]) -> bool:
+        # Only the hash of the key is stored, in the api_key table
+        if api_key is None:
+            return ApiKeys.delete_api_keys_by_user_id(id)
+        return ApiKeys.insert_new_api_key(id, api_key) is not None
 
     def get_user_api_key_by_id(self, id: str) -> Optional[str]:
-        try:
-            with get_db() as db:
-                user = db.query(User).filter_by(id=id).first()
-                return user.api_key
-        except Exception:
-            return None
+        # The key can't be recovered from its hash, only its prefix is shown
+        api_key = ApiKeys.get_api_key_by_user_id(id)
+        return f"{api_key.prefix}..." if api_key else None
 
     def get_valid_user_ids(self, user_ids: list[str]) -> list[str]:
         with get_db() as db:
@@ -3,6 +3,7 @@ import logging
 import ftfy
 import sys
 import json
+from typing import Iterator, Optional
 
 from azure.identity import DefaultAzureCredential
 from langchain_community.document_loaders import (
@@ -27,6 +28,7 @@ from open_webui.retrieval.loaders.external_document import ExternalDocumentLoade
 
 from open_webui.retrieval.loaders.mistral import MistralLoader
 from open_webui.retrieval.loaders.datalab_marker import DatalabMarkerLoader
+from open_webui.retrieval.loaders.parser import DocumentParser
 
 
 from open_webui.env import SRC_LOG_LEVELS, GLOBAL_LOG_LEVEL
@@ -88,6 +90,22 @@ known_source_ext = [
     "json",
 ]
 
+# Loaders parsing documents in this process rather than through a service
+LOCAL_LOADERS = (
+    BSHTMLLoader,
+    CSVLoader,
+    Docx2txtLoader,
+    OutlookMessageLoader,
+    PyPDFLoader,
+    TextLoader,
+    UnstructuredEPubLoader,
+    UnstructuredExcelLoader,
+    UnstructuredODTLoader,
+    UnstructuredPowerPointLoader,
+    UnstructuredRSTLoader,
+    UnstructuredXMLLoader,
+)
+
 
 class TikaLoader:
     def __init__(self, url, file_path, mime_type=None, extract_images=None):
@@ -224,23 +242,73 @@ class DoclingLoader:
             raise Exception(f"Error calling Docling: {error_msg}")
 
 
+def parse_document(
+    engine: str, kwargs: dict, filename: str, file_content_type: str, file_path: str
+) -> list[Document]:
+    # Runs in the document parser processes
+    return Loader(engine, **kwargs).load(filename, file_content_type, file_path)
+
+
 class Loader:
-    def __init__(self, engine: str = "", **kwargs):
+    def __init__(
+        self, engine: str = "", parser: Optional[DocumentParser] = None, **kwargs
+    ):
         self.engine = engine
+        # Parses the documents of the local loaders out of process, and
+        # caches the parsed documents
+        self.parser = parser
         self.kwargs = kwargs
 
     def load(
         self, filename: str, file_content_type: str, file_path: str
     ) -> list[Document]:
+        return list(self.lazy_load(filename, file_content_type, file_path))
+
+    def lazy_load(
+        self, filename: str, file_content_type: str, file_path: str
+    ) -> Iterator[Document]:
         loader = self._get_loader(filename, file_content_type, file_path)
-        docs = loader.load()
+        if self.parser is None:
+            yield from self._parse(loader)
+            return
+
+        key = self.parser.get_cache_key(
+            file_path, [self.engine, self.kwargs, filename, file_content_type]
+        )
+        docs = self.parser.get_cached(key)
+        if docs is not None:
+            yield from docs
+            return
+
+        if isinstance(loader, LOCAL_LOADERS):
+            docs = self.parser.run(
+                parse_document,
+                self.engine,
+                self.kwargs,
+                filename,
+                file_content_type,
+                file_path,
+            )
+            yield from docs
+        else:
+            docs = []
+            for doc in self._parse(loader):
+                docs.append(doc)
+                yield doc
+
+        self.parser.set_cached(key, docs)
+
+    def _parse(self, loader) -> Iterator[Document]:
+        # Loaders that parse page by page hand out each page once it is parsed
+        if hasattr(loader, "lazy_load"):
+            docs = loader.lazy_load()
+        else:
+            docs = loader.load()
 
-        return [
-            Document(
+        for doc in docs:
+            yield Document(
                 page_content=ftfy.fix_text(doc.page_content), metadata=doc.metadata
             )
-            for doc in docs
-        ]
 
     def _is_text_file(self, file_ext: str, file_content_type: str) -> bool:
         return file_ext in known_source_ext or (
@@ -0,0 +1,206 @@
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Optional
+
+from langchain_core.documents import Document
+
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+FILE_CHUNK_SIZE = 1024 * 1024
+
+
+def limit_memory(max_memory: int):
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows
+        return
+
+    # Caps the heap rather than the address space, which shared libraries
+    # and GPU runtimes reserve generously without using it
+    resource.setrlimit(resource.RLIMIT_DATA, (max_memory, max_memory))
+
+
+class DocumentParser:
+    """
+    Parses documents in `workers` processes and caches the parsed pages by
+    the hash of the file and of the loader settings.
+
+    A document gets `timeout` seconds and its worker `max_memory` bytes. A
+    worker that runs out of either, or crashes, is replaced and only fails
+    the document it was parsing.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        cache_max_size: int = 512 * 1024 * 1024,
+        workers: int = 2,
+        timeout: float = 300,
+        max_memory: int = 2048 * 1024 * 1024,
+    ):
+        self.cache_dir = cache_dir
+        self.cache_max_size = cache_max_size
+        self.workers = workers
+        self.timeout = timeout
+        self.max_memory = max_memory
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Documents are only handed to idle workers, so that the time spent
+        # waiting for one doesn't count towards their timeout
+        self._slots = threading.Semaphore(max(1, workers))
+
+    ####################
+    # Parsed page cache
+    ####################
+
+    def get_cache_key(self, file_path: str, settings) -> Optional[str]:
+        if not self.cache_max_size:
+            return None
+
+        file_hash = hashlib.sha256()
+        with open(file_path, "rb") as file:
+            while chunk := file.read(FILE_CHUNK_SIZE):
+                file_hash.update(chunk)
+
+        return hashlib.sha256(
+            json.dumps(
+                [file_hash.hexdigest(), settings], sort_keys=True, default=str
+            ).encode("utf-8")
+        ).hexdigest()
+
+    def get_cached(self, key: Optional[str]) -> Optional[list[Document]]:
+        if key is None:
+            return None
+
+        path = self.cache_dir.joinpath(f"{key}.json")
+        try:
+            pages = json.loads(path.read_text())
+            # The modification time doubles as the last access time
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+
+        log.debug(f"Using the cached pages of {key}")
+        return [Document(**page) for page in pages]
+
+    def set_cached(self, key: Optional[str], docs: list[Document]):
+        if key is None:
+            return
+
+        path = self.cache_dir.joinpath(f"{key}.json")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+            # Written aside and moved so that readers never see partial files
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(
+                json.dumps(
+                    [
+                        {"page_content": doc.page_content, "metadata": doc.metadata}
+                        for doc in docs
+                    ],
+                    default=str,
+                )
+            )
+            os.replace(tmp_path, path)
+            self.prune_cache()
+        except OSError as e:
+            log.warning(f"Failed to cache the parsed pages of {key}: {e}")
+
+    def prune_cache(self):
+        """
+        Evict the least recently used documents until the cache fits within
+        `cache_max_size`.
+        """
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.cache_max_size:
+                break
+
+            path.unlink(missing_ok=True)
+            total_size -= size
+
+    ####################
+    # Parsing
+    ####################
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned rather than forked, so workers do not inherit the
+                # server's threads and sockets
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=limit_memory if self.max_memory else None,
+                    initargs=(self.max_memory,) if self.max_memory else (),
+                )
+            return self._executor
+
+    def _reset_executor(self, executor: ProcessPoolExecutor, kill: bool = False):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+
+        if kill:
+            # The executor can't cancel a running task, its workers are killed
+            for process in list((executor._processes or {}).values()):
+                process.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, parse: Callable[..., list[Document]], *args) -> list[Document]:
+        """
+        Run `parse` in a worker process and return the pages it parsed.
+        """
+        if self.workers <= 0:
+            return parse(*args)
+
+        with self._slots:
+            # Retried once, a worker killed for another document also fails
+            # the documents the other workers were parsing
+            for attempt in range(2):
+                executor = self._get_executor()
+                future = executor.submit(parse, *args)
+                try:
+                    return future.result(timeout=self.timeout or None)
+                except FuturesTimeoutError:
+                    log.warning("Parsing a document timed out, killing the parsers")
+                    self._reset_executor(executor, kill=True)
+                    raise TimeoutError(
+                        f"Parsing the document took longer than {self.timeout}s"
+                    )
+                except BrokenProcessPool:
+                    self._reset_executor(executor)
+                    if attempt:
+                        raise MemoryError(
+                            "The document parser crashed, the document may be too large"
+                        )
+                    log.warning("Document parser crashed, retrying in a new one")
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
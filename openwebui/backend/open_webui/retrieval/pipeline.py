@@ -0,0 +1,211 @@
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+from langchain_core.documents import Document
+
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+# Marks the end of the output of a stage
+DONE = object()
+
+
+class PipelineStopped(Exception):
+    pass
+
+
+@dataclass
+class StageMetrics:
+    name: str
+    items: int = 0
+    # Seconds spent working, and blocked on the neighbouring stages
+    busy: float = 0.0
+    waiting: float = 0.0
+
+    def __str__(self):
+        return (
+            f"{self.name} {self.items} items in {self.busy:.2f}s "
+            f"(waited {self.waiting:.2f}s)"
+        )
+
+
+class IngestionPipeline:
+    """
+    Streams documents through splitting, embedding and inserting.
+
+    Loading, splitting and embedding each run in their own thread and hand
+    their output to the next stage through queues of `queue_size` entries,
+    so the embedding backend works while the document is still being parsed
+    and a slow stage holds back the ones before it instead of letting their
+    output pile up. Inserting runs in the calling thread.
+    """
+
+    def __init__(
+        self,
+        split: Callable[[list[Document]], list[Document]],
+        embed: Callable[[list[Document]], list],
+        insert: Callable[[list[Document], list], Any],
+        batch_size: int = 64,
+        queue_size: int = 4,
+    ):
+        self.split = split
+        self.embed = embed
+        self.insert = insert
+        self.batch_size = max(1, batch_size)
+        self.queue_size = max(1, queue_size)
+
+        self.metrics = {
+            name: StageMetrics(name) for name in ("load", "split", "embed", "insert")
+        }
+
+        self._stop = threading.Event()
+        self._error = None
+
+    def _fail(self, e: BaseException):
+        if self._error is None:
+            self._error = e
+        self._stop.set()
+
+    def _put(self, q: queue.Queue, item, metrics: StageMetrics):
+        start = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+            raise PipelineStopped()
+        finally:
+            metrics.waiting += time.perf_counter() - start
+
+    def _get(self, q: queue.Queue, metrics: StageMetrics):
+        start = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            raise PipelineStopped()
+        finally:
+            metrics.waiting += time.perf_counter() - start
+
+    def _run_stage(self, stage: Callable, *args):
+        try:
+            stage(*args)
+        except PipelineStopped:
+            pass
+        except BaseException as e:
+            self._fail(e)
+
+    ####################
+    # Stages
+    ####################
+
+    def _load(self, docs: Iterable[Document], output: queue.Queue):
+        metrics = self.metrics["load"]
+        iterator = iter(docs)
+        try:
+            while True:
+                start = time.perf_counter()
+                doc = next(iterator, DONE)
+                metrics.busy += time.perf_counter() - start
+
+                if doc is DONE:
+                    break
+                metrics.items += 1
+                self._put(output, doc, metrics)
+        finally:
+            # Let generators release their files when the pipeline stops early
+            if hasattr(iterator, "close"):
+                iterator.close()
+
+        self._put(output, DONE, metrics)
+
+    def _split(self, input: queue.Queue, output: queue.Queue):
+        metrics = self.metrics["split"]
+        batch = []
+        while (doc := self._get(input, metrics)) is not DONE:
+            start = time.perf_counter()
+            chunks = self.split([doc])
+            metrics.busy += time.perf_counter() - start
+            metrics.items += len(chunks)
+
+            for chunk in chunks:
+                batch.append(chunk)
+                if len(batch) >= self.batch_size:
+                    self._put(output, batch, metrics)
+                    batch = []
+
+        if batch:
+            self._put(output, batch, metrics)
+        self._put(output, DONE, metrics)
+
+    def _embed(self, input: queue.Queue, output: queue.Queue):
+        metrics = self.metrics["embed"]
+        while (batch := self._get(input, metrics)) is not DONE:
+            start = time.perf_counter()
+            vectors = self.embed(batch)
+            metrics.busy += time.perf_counter() - start
+
+            if len(vectors) != len(batch):
+                raise ValueError(
+                    f"Got {len(vectors)} embeddings for {len(batch)} chunks"
+                )
+            metrics.items += len(batch)
+            self._put(output, (batch, vectors), metrics)
+
+        self._put(output, DONE, metrics)
+
+    def _insert(self, chunks: list[Document], vectors: list):
+        metrics = self.metrics["insert"]
+        start = time.perf_counter()
+        self.insert(chunks, vectors)
+        metrics.busy += time.perf_counter() - start
+        metrics.items += len(chunks)
+
+    def run(self, docs: Iterable[Document]) -> int:
+        """
+        Ingest the documents, returning the number of chunks inserted.
+        """
+        loaded = queue.Queue(maxsize=self.queue_size)
+        split = queue.Queue(maxsize=self.queue_size)
+        embedded = queue.Queue(maxsize=self.queue_size)
+
+        threads = [
+            threading.Thread(
+                target=self._run_stage, args=args, name=f"ingest-{name}", daemon=True
+            )
+            for name, args in (
+                ("load", (self._load, docs, loaded)),
+                ("split", (self._split, loaded, split)),
+                ("embed", (self._embed, split, embedded)),
+            )
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            while (batch := self._get(embedded, self.metrics["insert"])) is not DONE:
+                self._insert(*batch)
+        except PipelineStopped:
+            pass
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            # Stops the other stages if inserting failed
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+
+        if self._error is not None:
+            raise self._error
+
+        return self.metrics["insert"].items
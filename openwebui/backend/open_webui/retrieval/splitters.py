@@ -0,0 +1,213 @@
+import functools
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+from typing import Callable, Iterator, Optional
+
+from langchain_core.documents import Document
+from langchain_text_splitters import (
+    MarkdownHeaderTextSplitter,
+    RecursiveCharacterTextSplitter,
+    TokenTextSplitter,
+)
+from langchain_text_splitters.base import Tokenizer, split_text_on_tokens
+
+from open_webui.constants import ERROR_MESSAGES
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+# Define headers to split on - covering most common markdown header levels
+MARKDOWN_HEADERS = [
+    ("#", "Header 1"),
+    ("##", "Header 2"),
+    ("###", "Header 3"),
+    ("####", "Header 4"),
+    ("#####", "Header 5"),
+    ("######", "Header 6"),
+]
+
+
+class BatchTokenTextSplitter(TokenTextSplitter):
+    """
+    Token text splitter encoding all the documents it splits at once with
+    tiktoken's batch encoder, which encodes them in parallel threads. Splits
+    exactly like TokenTextSplitter.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # Tokens of the documents being split, by text. Splitters are shared
+        # between requests, so this is kept per thread
+        self._local = threading.local()
+
+    def split_documents(self, documents) -> list[Document]:
+        documents = list(documents)
+        texts = [doc.page_content for doc in documents]
+
+        self._local.tokens = dict(
+            zip(
+                texts,
+                self._tokenizer.encode_batch(
+                    texts,
+                    allowed_special=self._allowed_special,
+                    disallowed_special=self._disallowed_special,
+                ),
+            )
+        )
+        try:
+            return super().split_documents(documents)
+        finally:
+            self._local.tokens = None
+
+    def split_text(self, text: str) -> list[str]:
+        tokens = (getattr(self._local, "tokens", None) or {}).get(text)
+        if tokens is None:
+            return super().split_text(text)
+
+        tokenizer = Tokenizer(
+            chunk_overlap=self._chunk_overlap,
+            tokens_per_chunk=self._chunk_size,
+            decode=self._tokenizer.decode,
+            encode=lambda _: tokens,
+        )
+        return split_text_on_tokens(text=text, tokenizer=tokenizer)
+
+
+@functools.lru_cache(maxsize=16)
+def get_text_splitter(
+    text_splitter: str, chunk_size: int, chunk_overlap: int, encoding_name: str
+) -> Callable[[list[Document]], list[Document]]:
+    """
+    Return the function splitting documents with the given settings. The
+    splitters are built once per settings and shared.
+    """
+    if text_splitter in ["", "character"]:
+        return RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            add_start_index=True,
+        ).split_documents
+    elif text_splitter == "token":
+        return BatchTokenTextSplitter(
+            encoding_name=encoding_name,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            add_start_index=True,
+        ).split_documents
+    elif text_splitter == "markdown_header":
+        markdown_splitter = MarkdownHeaderTextSplitter(
+            headers_to_split_on=MARKDOWN_HEADERS,
+            strip_headers=False,  # Keep headers in content for context
+        )
+        character_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            add_start_index=True,
+        )
+
+        def split_markdown(docs: list[Document]) -> list[Document]:
+            md_split_docs = []
+            for doc in docs:
+                md_header_splits = markdown_splitter.split_text(doc.page_content)
+                md_header_splits = character_splitter.split_documents(md_header_splits)
+
+                # Convert back to Document objects, preserving original metadata
+                for split_chunk in md_header_splits:
+                    headings_list = []
+                    # Extract header values in order based on headers_to_split_on
+                    for _, header_meta_key_name in MARKDOWN_HEADERS:
+                        if header_meta_key_name in split_chunk.metadata:
+                            headings_list.append(
+                                split_chunk.metadata[header_meta_key_name]
+                            )
+
+                    md_split_docs.append(
+                        Document(
+                            page_content=split_chunk.page_content,
+                            metadata={**doc.metadata, "headings": headings_list},
+                        )
+                    )
+            return md_split_docs
+
+        return split_markdown
+    else:
+        raise ValueError(ERROR_MESSAGES.DEFAULT("Invalid text splitter"))
+
+
+def split_documents(settings: tuple, docs: list[Document]) -> list[Document]:
+    # Runs in the splitter processes
+    return get_text_splitter(*settings)(docs)
+
+
+class SplitterPool:
+    """
+    Splits large batches of documents across `workers` processes.
+
+    Documents are split independently of each other, so a batch is cut into
+    contiguous slices that are split in parallel and put back together in
+    order, giving the same chunks as splitting it in one go. Batches with
+    less than `min_size` characters are split in the calling thread.
+    """
+
+    def __init__(self, workers: int = 2, min_size: int = 1_000_000):
+        self.workers = workers
+        self.min_size = min_size
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned rather than forked, so workers do not inherit the
+                # server's threads and sockets
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def split(self, settings: tuple, docs: list[Document]) -> Iterator[Document]:
+        """
+        Split the documents with the splitter of `settings`, yielding their
+        chunks in order as the slices are split.
+        """
+        if (
+            self.workers <= 0
+            or len(docs) < 2
+            or sum(len(doc.page_content) for doc in docs) < self.min_size
+        ):
+            yield from get_text_splitter(*settings)(docs)
+            return
+
+        # A few slices per worker, so that uneven documents even out
+        slice_size = max(1, -(-len(docs) // (self.workers * 4)))
+        slices = [docs[i : i + slice_size] for i in range(0, len(docs), slice_size)]
+
+        executor = self._get_executor()
+        done = 0
+        try:
+            for chunks in executor.map(split_documents, repeat(settings), slices):
+                yield from chunks
+                done += 1
+        except BrokenProcessPool:
+            log.warning("Splitter pool crashed, splitting in this thread")
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+
+            for docs_slice in slices[done:]:
+                yield from get_text_splitter(*settings)(docs_slice)
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
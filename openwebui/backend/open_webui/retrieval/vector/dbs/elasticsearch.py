@@ -192,17 +192,25 @@ class ElasticsearchClient(VectorDBBase):
         }
 
         for field, value in filter.items():
-            query_body["query"]["bool"]["filter"].append({"term": {field: value}})
+            query_body["query"]["bool"]["filter"].append(
+                {"term": {f"metadata.{field}": value}}
+            )
         query_body["query"]["bool"]["filter"].append(
             {"term": {"collection": collection_name}}
         )
-        size = limit if limit else 10
 
         try:
+            if not limit:
+                # A search returns 10 hits at most by default, scan them all
+                results = list(
+                    scan(self.client, index=f"{self.index_prefix}*", query=query_body)
+                )
+                return self._scan_result_to_get_result(results)
+
             result = self.client.search(
                 index=f"{self.index_prefix}*",
                 body=query_body,
-                size=size,
+                size=limit,
             )
 
             return self._result_to_get_result(result)
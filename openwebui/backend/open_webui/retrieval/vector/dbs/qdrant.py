@@ -2,11 +2,13 @@ from typing import Optional
 import logging
 from urllib.parse import urlparse
 
+from qdrant_client import AsyncQdrantClient as AsyncQclient
 from qdrant_client import QdrantClient as Qclient
 from qdrant_client.http.models import PointStruct
 from qdrant_client.models import models
 
 from open_webui.retrieval.vector.main import (
+    AsyncVectorDBBase,
     VectorDBBase,
     VectorItem,
     SearchResult,
@@ -30,7 +32,11 @@ log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
-class QdrantClient(VectorDBBase):
+class QdrantClientBase:
+    """
+    Configuration and conversions shared by the sync and async Qdrant clients.
+    """
+
     def __init__(self):
         self.collection_prefix = QDRANT_COLLECTION_PREFIX
         self.QDRANT_URI = QDRANT_URI
@@ -41,30 +47,27 @@ class QdrantClient(VectorDBBase):
         self.QDRANT_TIMEOUT = QDRANT_TIMEOUT
         self.QDRANT_HNSW_M = QDRANT_HNSW_M
 
-        if not self.QDRANT_URI:
-            self.client = None
-            return
-
+    def _get_client_kwargs(self) -> dict:
         # Unified handling for either scheme
         parsed = urlparse(self.QDRANT_URI)
         host = parsed.hostname or self.QDRANT_URI
         http_port = parsed.port or 6333  # default REST port
 
         if self.PREFER_GRPC:
-            self.client = Qclient(
-                host=host,
-                port=http_port,
-                grpc_port=self.GRPC_PORT,
-                prefer_grpc=self.PREFER_GRPC,
-                api_key=self.QDRANT_API_KEY,
-                timeout=self.QDRANT_TIMEOUT,
-            )
+            return {
+                "host": host,
+                "port": http_port,
+                "grpc_port": self.GRPC_PORT,
+                "prefer_grpc": self.PREFER_GRPC,
+                "api_key": self.QDRANT_API_KEY,
+                "timeout": self.QDRANT_TIMEOUT,
+            }
         else:
-            self.client = Qclient(
-                url=self.QDRANT_URI,
-                api_key=self.QDRANT_API_KEY,
-                timeout=QDRANT_TIMEOUT,
-            )
+            return {
+                "url": self.QDRANT_URI,
+                "api_key": self.QDRANT_API_KEY,
+                "timeout": QDRANT_TIMEOUT,
+            }
 
     def _result_to_get_result(self, points) -> GetResult:
         ids = []
@@ -85,6 +88,56 @@ class QdrantClient(VectorDBBase):
             }
         )
 
+    def _result_to_search_result(self, points) -> SearchResult:
+        get_result = self._result_to_get_result(points)
+        return SearchResult(
+            ids=get_result.ids,
+            documents=get_result.documents,
+            metadatas=get_result.metadatas,
+            # qdrant distance is [-1, 1], normalize to [0, 1]
+            distances=[[(point.score + 1.0) / 2.0 for point in points]],
+        )
+
+    def _get_keyword_index_schema(self):
+        return models.KeywordIndexParams(
+            type=models.KeywordIndexType.KEYWORD,
+            is_tenant=False,
+            on_disk=self.QDRANT_ON_DISK,
+        )
+
+    def _get_field_conditions(self, filter: dict) -> list:
+        return [
+            models.FieldCondition(
+                key=f"metadata.{key}", match=models.MatchValue(value=value)
+            )
+            for key, value in filter.items()
+        ]
+
+    def _get_id_conditions(self, ids: list[str]) -> list:
+        # Items are stored as points keyed by their id
+        return [models.HasIdCondition(has_id=ids)]
+
+    def _create_points(self, items: list[VectorItem]):
+        return [
+            PointStruct(
+                id=item["id"],
+                vector=item["vector"],
+                payload={"text": item["text"], "metadata": item["metadata"]},
+            )
+            for item in items
+        ]
+
+
+class QdrantClient(QdrantClientBase, VectorDBBase):
+    def __init__(self):
+        super().__init__()
+
+        if not self.QDRANT_URI:
+            self.client = None
+            return
+
+        self.client = Qclient(**self._get_client_kwargs())
+
     def _create_collection(self, collection_name: str, dimension: int):
         collection_name_with_prefix = f"{self.collection_prefix}_{collection_name}"
         self.client.create_collection(
@@ -100,24 +153,12 @@ class QdrantClient(VectorDBBase):
         )
 
         # Create payload indexes for efficient filtering
-        self.client.create_payload_index(
-            collection_name=collection_name_with_prefix,
-            field_name="metadata.hash",
-            field_schema=models.KeywordIndexParams(
-                type=models.KeywordIndexType.KEYWORD,
-                is_tenant=False,
-                on_disk=self.QDRANT_ON_DISK,
-            ),
-        )
-        self.client.create_payload_index(
-            collection_name=collection_name_with_prefix,
-            field_name="metadata.file_id",
-            field_schema=models.KeywordIndexParams(
-                type=models.KeywordIndexType.KEYWORD,
-                is_tenant=False,
-                on_disk=self.QDRANT_ON_DISK,
-            ),
-        )
+        for field_name in ("metadata.hash", "metadata.file_id"):
+            self.client.create_payload_index(
+                collection_name=collection_name_with_prefix,
+                field_name=field_name,
+                field_schema=self._get_keyword_index_schema(),
+            )
         log.info(f"collection {collection_name_with_prefix} successfully created!")
 
     def _create_collection_if_not_exists(self, collection_name, dimension):
@@ -126,16 +167,6 @@ class QdrantClient(VectorDBBase):
                 collection_name=collection_name, dimension=dimension
             )
 
-    def _create_points(self, items: list[VectorItem]):
-        return [
-            PointStruct(
-                id=item["id"],
-                vector=item["vector"],
-                payload={"text": item["text"], "metadata": item["metadata"]},
-            )
-            for item in items
-        ]
-
     def has_collection(self, collection_name: str) -> bool:
         return self.client.collection_exists(
             f"{self.collection_prefix}_{collection_name}"
@@ -158,14 +189,7 @@ class QdrantClient(VectorDBBase):
             query=vectors[0],
             limit=limit,
         )
-        get_result = self._result_to_get_result(query_response.points)
-        return SearchResult(
-            ids=get_result.ids,
-            documents=get_result.documents,
-            metadatas=get_result.metadatas,
-            # qdrant distance is [-1, 1], normalize to [0, 1]
-            distances=[[(point.score + 1.0) / 2.0 for point in query_response.points]],
-        )
+        return self._result_to_search_result(query_response.points)
 
     def query(self, collection_name: str, filter: dict, limit: Optional[int] = None):
         # Construct the filter string for querying
@@ -175,17 +199,9 @@ class QdrantClient(VectorDBBase):
             if limit is None:
                 limit = NO_LIMIT  # otherwise qdrant would set limit to 10!
 
-            field_conditions = []
-            for key, value in filter.items():
-                field_conditions.append(
-                    models.FieldCondition(
-                        key=f"metadata.{key}", match=models.MatchValue(value=value)
-                    )
-                )
-
             points = self.client.scroll(
                 collection_name=f"{self.collection_prefix}_{collection_name}",
-                scroll_filter=models.Filter(should=field_conditions),
+                scroll_filter=models.Filter(should=self._get_field_conditions(filter)),
                 limit=limit,
             )
             return self._result_to_get_result(points[0])
@@ -223,21 +239,9 @@ class QdrantClient(VectorDBBase):
         field_conditions = []
 
         if ids:
-            for id_value in ids:
-                field_conditions.append(
-                    models.FieldCondition(
-                        key="metadata.id",
-                        match=models.MatchValue(value=id_value),
-                    ),
-                ),
+            field_conditions = self._get_id_conditions(ids)
         elif filter:
-            for key, value in filter.items():
-                field_conditions.append(
-                    models.FieldCondition(
-                        key=f"metadata.{key}",
-                        match=models.MatchValue(value=value),
-                    ),
-                ),
+            field_conditions = self._get_field_conditions(filter)
 
         return self.client.delete(
             collection_name=f"{self.collection_prefix}_{collection_name}",
@@ -252,3 +256,141 @@ class QdrantClient(VectorDBBase):
         for collection_name in collection_names:
             if collection_name.name.startswith(self.collection_prefix):
                 self.client.delete_collection(collection_name=collection_name.name)
+
+
+class AsyncQdrantClient(QdrantClientBase, AsyncVectorDBBase):
+    """
+    Native async counterpart of QdrantClient, requests are awaited on the
+    event loop instead of blocking a worker thread.
+    """
+
+    def __init__(self):
+        super().__init__()
+
+        if not self.QDRANT_URI:
+            self.client = None
+            return
+
+        self.client = AsyncQclient(**self._get_client_kwargs())
+
+    async def _create_collection(self, collection_name: str, dimension: int):
+        collection_name_with_prefix = f"{self.collection_prefix}_{collection_name}"
+        await self.client.create_collection(
+            collection_name=collection_name_with_prefix,
+            vectors_config=models.VectorParams(
+                size=dimension,
+                distance=models.Distance.COSINE,
+                on_disk=self.QDRANT_ON_DISK,
+            ),
+            hnsw_config=models.HnswConfigDiff(
+                m=self.QDRANT_HNSW_M,
+            ),
+        )
+
+        # Create payload indexes for efficient filtering
+        for field_name in ("metadata.hash", "metadata.file_id"):
+            await self.client.create_payload_index(
+                collection_name=collection_name_with_prefix,
+                field_name=field_name,
+                field_schema=self._get_keyword_index_schema(),
+            )
+        log.info(f"collection {collection_name_with_prefix} successfully created!")
+
+    async def _create_collection_if_not_exists(self, collection_name, dimension):
+        if not await self.has_collection(collection_name=collection_name):
+            await self._create_collection(
+                collection_name=collection_name, dimension=dimension
+            )
+
+    async def has_collection(self, collection_name: str) -> bool:
+        return await self.client.collection_exists(
+            f"{self.collection_prefix}_{collection_name}"
+        )
+
+    async def delete_collection(self, collection_name: str):
+        return await self.client.delete_collection(
+            collection_name=f"{self.collection_prefix}_{collection_name}"
+        )
+
+    async def search(
+        self, collection_name: str, vectors: list[list[float | int]], limit: int
+    ) -> Optional[SearchResult]:
+        if limit is None:
+            limit = NO_LIMIT  # otherwise qdrant would set limit to 10!
+
+        query_response = await self.client.query_points(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            query=vectors[0],
+            limit=limit,
+        )
+        return self._result_to_search_result(query_response.points)
+
+    async def query(
+        self, collection_name: str, filter: dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        if not await self.has_collection(collection_name):
+            return None
+        try:
+            if limit is None:
+                limit = NO_LIMIT  # otherwise qdrant would set limit to 10!
+
+            points = await self.client.scroll(
+                collection_name=f"{self.collection_prefix}_{collection_name}",
+                scroll_filter=models.Filter(should=self._get_field_conditions(filter)),
+                limit=limit,
+            )
+            return self._result_to_get_result(points[0])
+        except Exception as e:
+            log.exception(f"Error querying a collection '{collection_name}': {e}")
+            return None
+
+    async def get(self, collection_name: str) -> Optional[GetResult]:
+        points = await self.client.scroll(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            limit=NO_LIMIT,  # otherwise qdrant would set limit to 10!
+        )
+        return self._result_to_get_result(points[0])
+
+    async def insert(self, collection_name: str, items: list[VectorItem]):
+        await self._create_collection_if_not_exists(
+            collection_name, len(items[0]["vector"])
+        )
+        points = self._create_points(items)
+        await self.client.upsert(f"{self.collection_prefix}_{collection_name}", points)
+
+    async def upsert(self, collection_name: str, items: list[VectorItem]):
+        await self._create_collection_if_not_exists(
+            collection_name, len(items[0]["vector"])
+        )
+        points = self._create_points(items)
+        return await self.client.upsert(
+            f"{self.collection_prefix}_{collection_name}", points
+        )
+
+    async def delete(
+        self,
+        collection_name: str,
+        ids: Optional[list[str]] = None,
+        filter: Optional[dict] = None,
+    ):
+        field_conditions = []
+
+        if ids:
+            field_conditions = self._get_id_conditions(ids)
+        elif filter:
+            field_conditions = self._get_field_conditions(filter)
+
+        return await self.client.delete(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            points_selector=models.FilterSelector(
+                filter=models.Filter(must=field_conditions)
+            ),
+        )
+
+    async def reset(self):
+        collection_names = (await self.client.get_collections()).collections
+        for collection_name in collection_names:
+            if collection_name.name.startswith(self.collection_prefix):
+                await self.client.delete_collection(
+                    collection_name=collection_name.name
+                )
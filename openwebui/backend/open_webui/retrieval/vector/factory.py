@@ -1,4 +1,8 @@
-from open_webui.retrieval.vector.main import VectorDBBase
+from open_webui.retrieval.vector.main import (
+    AsyncVectorDBAdapter,
+    AsyncVectorDBBase,
+    VectorDBBase,
+)
 from open_webui.retrieval.vector.type import VectorType
 from open_webui.config import VECTOR_DB, ENABLE_QDRANT_MULTITENANCY_MODE
 
@@ -59,5 +63,20 @@ class Vector:
             case _:
                 raise ValueError(f"Unsupported vector type: {vector_type}")
 
+    @staticmethod
+    def get_async_vector(vector_type: str, client: VectorDBBase) -> AsyncVectorDBBase:
+        """
+        get async vector db instance by vector type, backends without a native
+        async client run the calls of the given sync client in a thread
+        """
+        match vector_type:
+            case VectorType.QDRANT if not ENABLE_QDRANT_MULTITENANCY_MODE:
+                from open_webui.retrieval.vector.dbs.qdrant import AsyncQdrantClient
+
+                return AsyncQdrantClient()
+            case _:
+                return AsyncVectorDBAdapter(client)
+
 
 VECTOR_DB_CLIENT = Vector.get_vector(VECTOR_DB)
+ASYNC_VECTOR_DB_CLIENT = Vector.get_async_vector(VECTOR_DB, VECTOR_DB_CLIENT)
@@ -1,3 +1,4 @@
+import asyncio
 from pydantic import BaseModel
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional, Union
@@ -84,3 +85,136 @@ class VectorDBBase(ABC):
     def reset(self) -> None:
         """Reset the vector database by removing all collections or those matching a condition."""
         pass
+
+
+class AsyncVectorDBBase(ABC):
+    """
+    Abstract base class for asynchronous vector database backends.
+
+    Mirrors VectorDBBase with coroutine methods, so that async routes can
+    query the vector database without blocking the event loop. Backends
+    without an async client library are wrapped with AsyncVectorDBAdapter.
+    """
+
+    @abstractmethod
+    async def has_collection(self, collection_name: str) -> bool:
+        """Check if the collection exists in the vector DB."""
+        pass
+
+    @abstractmethod
+    async def delete_collection(self, collection_name: str) -> None:
+        """Delete a collection from the vector DB."""
+        pass
+
+    @abstractmethod
+    async def insert(self, collection_name: str, items: List[VectorItem]) -> None:
+        """Insert a list of vector items into a collection."""
+        pass
+
+    @abstractmethod
+    async def upsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        """Insert or update vector items in a collection."""
+        pass
+
+    @abstractmethod
+    async def search(
+        self, collection_name: str, vectors: List[List[Union[float, int]]], limit: int
+    ) -> Optional[SearchResult]:
+        """Search for similar vectors in a collection."""
+        pass
+
+    @abstractmethod
+    async def query(
+        self, collection_name: str, filter: Dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        """Query vectors from a collection using metadata filter."""
+        pass
+
+    @abstractmethod
+    async def get(self, collection_name: str) -> Optional[GetResult]:
+        """Retrieve all vectors from a collection."""
+        pass
+
+    @abstractmethod
+    async def delete(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict] = None,
+    ) -> None:
+        """Delete vectors by ID or filter from a collection."""
+        pass
+
+    @abstractmethod
+    async def reset(self) -> None:
+        """Reset the vector database by removing all collections or those matching a condition."""
+        pass
+
+
+class AsyncVectorDBAdapter(AsyncVectorDBBase):
+    """
+    Exposes a synchronous vector database backend through AsyncVectorDBBase
+    by running its calls in worker threads.
+    """
+
+    def __init__(self, client: VectorDBBase):
+        self.client = client
+
+    async def has_collection(self, collection_name: str) -> bool:
+        return await asyncio.to_thread(
+            self.client.has_collection, collection_name=collection_name
+        )
+
+    async def delete_collection(self, collection_name: str) -> None:
+        return await asyncio.to_thread(
+            self.client.delete_collection, collection_name=collection_name
+        )
+
+    async def insert(self, collection_name: str, items: List[VectorItem]) -> None:
+        return await asyncio.to_thread(
+            self.client.insert, collection_name=collection_name, items=items
+        )
+
+    async def upsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        return await asyncio.to_thread(
+            self.client.upsert, collection_name=collection_name, items=items
+        )
+
+    async def search(
+        self, collection_name: str, vectors: List[List[Union[float, int]]], limit: int
+    ) -> Optional[SearchResult]:
+        return await asyncio.to_thread(
+            self.client.search,
+            collection_name=collection_name,
+            vectors=vectors,
+            limit=limit,
+        )
+
+    async def query(
+        self, collection_name: str, filter: Dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        return await asyncio.to_thread(
+            self.client.query,
+            collection_name=collection_name,
+            filter=filter,
+            limit=limit,
+        )
+
+    async def get(self, collection_name: str) -> Optional[GetResult]:
+        return await asyncio.to_thread(self.client.get, collection_name=collection_name)
+
+    async def delete(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict] = None,
+    ) -> None:
+        return await asyncio.to_thread(
+            self.client.delete,
+            collection_name=collection_name,
+            ids=ids,
+            filter=filter,
+        )
+
+    async def reset(self) -> None:
+        return await asyncio.to_thread(self.client.reset)
@@ -0,0 +1,218 @@
+import asyncio
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+# Resources that don't contribute to the text of a page
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+
+
+async def block_resources(route):
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+class BrowserPool:
+    """
+    Long-lived Chromium browser shared by the Playwright web loaders.
+
+    Pages are opened in at most `max_contexts` browser contexts, which are
+    kept and reused once their page is closed. The browser is closed after
+    `idle_timeout` seconds without use, or once it has served `max_pages`
+    pages, to cap its memory; the next load starts a new one.
+    """
+
+    def __init__(
+        self,
+        ws_url: Optional[str] = None,
+        headless: bool = True,
+        proxy: Optional[dict] = None,
+        max_contexts: int = 8,
+        idle_timeout: float = 300,
+        max_pages: int = 200,
+    ):
+        self.ws_url = ws_url
+        self.headless = headless
+        self.proxy = proxy
+        self.max_contexts = max(1, max_contexts)
+        self.idle_timeout = idle_timeout
+        self.max_pages = max_pages
+
+        self._playwright = None
+        self._browser = None
+        self._contexts: list = []
+        self._in_use = 0
+        self._pages_served = 0
+        self._last_used = time.time()
+
+        self._lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(self.max_contexts)
+        self._reaper: Optional[asyncio.Task] = None
+
+    async def _get_browser(self):
+        if self._browser is not None and self._browser.is_connected():
+            return self._browser
+
+        from playwright.async_api import async_playwright
+
+        await self._close_browser()
+
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+
+        # Use remote browser if ws_endpoint is provided, otherwise use local browser
+        if self.ws_url:
+            self._browser = await self._playwright.chromium.connect(self.ws_url)
+        else:
+            self._browser = await self._playwright.chromium.launch(
+                headless=self.headless, proxy=self.proxy
+            )
+        self._pages_served = 0
+
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._close_idle_browser())
+
+        return self._browser
+
+    async def _close_browser(self):
+        contexts, self._contexts = self._contexts, []
+        browser, self._browser = self._browser, None
+
+        for context in contexts:
+            try:
+                await context.close()
+            except Exception:
+                pass
+
+        if browser is not None:
+            try:
+                await browser.close()
+            except Exception as e:
+                log.debug(f"Failed to close the browser: {e}")
+
+    async def _close_idle_browser(self):
+        while True:
+            await asyncio.sleep(max(1, self.idle_timeout / 2))
+            async with self._lock:
+                if (
+                    self._browser is not None
+                    and self._in_use == 0
+                    and time.time() - self._last_used > self.idle_timeout
+                ):
+                    log.debug("Closing the idle Playwright browser")
+                    await self._close_browser()
+
+    async def _acquire_context(self):
+        async with self._lock:
+            browser = await self._get_browser()
+            self._in_use += 1
+
+            if self._contexts:
+                return self._contexts.pop()
+
+        try:
+            context = await browser.new_context()
+            await context.route("**/*", block_resources)
+            return context
+        except Exception:
+            async with self._lock:
+                self._in_use -= 1
+            raise
+
+    async def _release_context(self, context, reusable: bool):
+        async with self._lock:
+            self._in_use -= 1
+            self._pages_served += 1
+            self._last_used = time.time()
+
+            if reusable and context.browser is self._browser:
+                try:
+                    # Don't leak the session of one load into the next
+                    await context.clear_cookies()
+                    self._contexts.append(context)
+                    context = None
+                except Exception:
+                    pass
+
+            if context is not None:
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+
+            # Recycle the browser once it served its share of pages
+            if (
+                self.max_pages
+                and self._pages_served >= self.max_pages
+                and self._in_use == 0
+            ):
+                await self._close_browser()
+
+    @asynccontextmanager
+    async def page(self):
+        """
+        Open a page in one of the pooled contexts, closing it afterwards.
+        """
+        async with self._slots:
+            context = await self._acquire_context()
+            page = None
+            reusable = False
+            try:
+                page = await context.new_page()
+                yield page
+                reusable = True
+            finally:
+                if page is not None:
+                    try:
+                        await page.close()
+                    except Exception:
+                        reusable = False
+                await self._release_context(context, reusable)
+
+    async def close(self):
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+
+        async with self._lock:
+            await self._close_browser()
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+
+# Pools by browser endpoint and proxy settings
+BROWSER_POOLS: dict[str, BrowserPool] = {}
+
+
+def get_browser_pool(
+    ws_url: Optional[str] = None,
+    headless: bool = True,
+    proxy: Optional[dict] = None,
+    **kwargs,
+) -> BrowserPool:
+    key = json.dumps([ws_url, headless, proxy], sort_keys=True)
+    pool = BROWSER_POOLS.get(key)
+    if pool is None:
+        pool = BROWSER_POOLS[key] = BrowserPool(
+            ws_url=ws_url, headless=headless, proxy=proxy, **kwargs
+        )
+    return pool
+
+
+async def close_browser_pools():
+    for pool in list(BROWSER_POOLS.values()):
+        try:
+            await pool.close()
+        except Exception as e:
+            log.debug(f"Failed to close a browser pool: {e}")
+    BROWSER_POOLS.clear()
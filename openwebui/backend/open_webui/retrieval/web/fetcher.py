@@ -0,0 +1,346 @@
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import aiohttp
+from aiohttp.abc import AbstractResolver
+
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+PAGE_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class WebPage:
+    url: str
+    body: bytes
+    # Charset declared by the Content-Type header, if any
+    encoding: Optional[str] = None
+
+
+##########################################
+#
+# Parsing, runs in the parser processes
+#
+##########################################
+
+
+def extract_metadata(soup, url):
+    metadata = {"source": url}
+    if title := soup.find("title"):
+        metadata["title"] = title.get_text()
+    if description := soup.find("meta", attrs={"name": "description"}):
+        metadata["description"] = description.get("content", "No description found.")
+    if html := soup.find("html"):
+        metadata["language"] = html.get("lang", "No language found.")
+    return metadata
+
+
+def parse_web_page(
+    page: WebPage, parser: str, bs_kwargs: dict, get_text_kwargs: dict
+) -> tuple[str, dict]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(
+        page.body, parser, from_encoding=page.encoding, **(bs_kwargs or {})
+    )
+    return soup.get_text(**(get_text_kwargs or {})), extract_metadata(soup, page.url)
+
+
+##########################################
+#
+# Fetcher
+#
+##########################################
+
+
+def get_max_age(cache_control: str) -> Optional[int]:
+    if match := re.search(r"max-age=(\d+)", cache_control):
+        return int(match.group(1))
+    return None
+
+
+class WebPageFetcher:
+    """
+    Fetches web pages through shared connection pools and caches them on disk.
+
+    Cached pages are reused for `cache_ttl` seconds, or less when their
+    Cache-Control max-age says so, then revalidated with their ETag or
+    Last-Modified when they have one. Concurrent fetches of the same URL
+    share a single request. Pages are parsed in `parser_workers` processes so
+    that large documents don't block the event loop.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        cache_ttl: int = 600,
+        cache_max_size: int = 512 * 1024 * 1024,
+        max_page_size: int = 10 * 1024 * 1024,
+        max_connections: int = 100,
+        max_connections_per_host: int = 4,
+        parser_workers: int = 2,
+        resolver: Optional[AbstractResolver] = None,
+    ):
+        self.cache_dir = cache_dir
+        self.cache_ttl = cache_ttl
+        self.cache_max_size = cache_max_size
+        self.max_page_size = max_page_size
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.parser_workers = parser_workers
+        self.resolver = resolver
+
+        # Sessions by trust_env, created in the event loop using them
+        self._sessions: dict[bool, aiohttp.ClientSession] = {}
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Size of the cache directory, computed on the first write
+        self._cache_size: Optional[int] = None
+
+    def get_session(self, trust_env: bool = False) -> aiohttp.ClientSession:
+        session = self._sessions.get(trust_env)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                trust_env=trust_env,
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_connections,
+                    limit_per_host=self.max_connections_per_host,
+                    # Behind a proxy, the proxy resolves the pages' hosts
+                    resolver=self.resolver if not trust_env else None,
+                ),
+            )
+            self._sessions[trust_env] = session
+        return session
+
+    ####################
+    # Page cache
+    ####################
+
+    def _get_cache_paths(self, url: str) -> tuple[Path, Path]:
+        name = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return (
+            self.cache_dir.joinpath(f"{name}.html"),
+            self.cache_dir.joinpath(f"{name}.json"),
+        )
+
+    def _read_cache(self, url: str) -> Optional[tuple[dict, bytes]]:
+        body_path, meta_path = self._get_cache_paths(url)
+        try:
+            meta = json.loads(meta_path.read_text())
+            body = body_path.read_bytes()
+            # The modification time doubles as the last access time
+            os.utime(body_path)
+            return meta, body
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, url: str, meta: dict, body: Optional[bytes] = None):
+        body_path, meta_path = self._get_cache_paths(url)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        written = 0
+        for path, data in (
+            (body_path, body),
+            (meta_path, json.dumps(meta).encode("utf-8")),
+        ):
+            if data is None:
+                continue
+            # Written aside and moved so that readers never see partial files
+            tmp_path = path.with_suffix(f"{path.suffix}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+            written += len(data)
+
+        if self._cache_size is None:
+            self.prune_cache()
+        else:
+            self._cache_size += written
+            if self._cache_size > self.cache_max_size:
+                self.prune_cache()
+
+    def prune_cache(self):
+        """
+        Evict the least recently used pages until the cache fits within
+        `cache_max_size`.
+        """
+        entries = {}
+        for path in self.cache_dir.iterdir():
+            if path.suffix not in (".html", ".json"):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+
+            mtime, size = entries.get(path.stem, (0, 0))
+            entries[path.stem] = (max(mtime, stat.st_mtime), size + stat.st_size)
+
+        total_size = sum(size for _, size in entries.values())
+        for name, (_, size) in sorted(entries.items(), key=lambda item: item[1][0]):
+            if total_size <= self.cache_max_size:
+                break
+
+            for suffix in (".html", ".json"):
+                self.cache_dir.joinpath(f"{name}{suffix}").unlink(missing_ok=True)
+            total_size -= size
+
+        self._cache_size = total_size
+
+    ####################
+    # Fetching
+    ####################
+
+    async def _read_body(self, url: str, response: aiohttp.ClientResponse) -> bytes:
+        if (response.content_length or 0) > self.max_page_size:
+            raise ValueError(f"Page {url} exceeds the maximum page size")
+
+        body = bytearray()
+        async for chunk in response.content.iter_chunked(PAGE_CHUNK_SIZE):
+            body.extend(chunk)
+            if len(body) > self.max_page_size:
+                raise ValueError(f"Page {url} exceeds the maximum page size")
+        return bytes(body)
+
+    async def _fetch(
+        self,
+        url: str,
+        trust_env: bool,
+        request_kwargs: dict,
+        raise_for_status: bool,
+        use_cache: bool,
+    ) -> WebPage:
+        cached = None
+        headers = dict(request_kwargs.pop("headers", None) or {})
+
+        if use_cache:
+            cached = await asyncio.to_thread(self._read_cache, url)
+            if cached is not None:
+                meta, body = cached
+                if time.time() < meta.get("expires_at", 0):
+                    return WebPage(url, body, meta.get("encoding"))
+
+                # Stale, ask the server whether it changed
+                if meta.get("etag"):
+                    headers["If-None-Match"] = meta["etag"]
+                if meta.get("last_modified"):
+                    headers["If-Modified-Since"] = meta["last_modified"]
+
+        session = self.get_session(trust_env)
+        async with session.get(
+            url, headers=headers, allow_redirects=False, **request_kwargs
+        ) as response:
+            cache_control = response.headers.get("Cache-Control", "").lower()
+            max_age = get_max_age(cache_control)
+            ttl = self.cache_ttl if max_age is None else min(max_age, self.cache_ttl)
+
+            if response.status == 304 and cached is not None:
+                meta, body = cached
+                meta["expires_at"] = time.time() + ttl
+                await asyncio.to_thread(self._write_cache, url, meta)
+                return WebPage(url, body, meta.get("encoding"))
+
+            if raise_for_status:
+                response.raise_for_status()
+
+            page = WebPage(url, await self._read_body(url, response), response.charset)
+
+            if use_cache and response.status == 200 and "no-store" not in cache_control:
+                meta = {
+                    "url": url,
+                    "encoding": page.encoding,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "expires_at": time.time() + ttl,
+                }
+                await asyncio.to_thread(self._write_cache, url, meta, page.body)
+
+            return page
+
+    async def fetch(
+        self,
+        url: str,
+        trust_env: bool = False,
+        request_kwargs: Optional[dict] = None,
+        raise_for_status: bool = False,
+    ) -> WebPage:
+        request_kwargs = dict(request_kwargs or {})
+
+        # Pages fetched with cookies may be personalized, they are not shared
+        use_cache = self.cache_ttl > 0 and not request_kwargs.get("cookies")
+        if not use_cache:
+            return await self._fetch(
+                url, trust_env, request_kwargs, raise_for_status, use_cache
+            )
+
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.create_task(
+                self._fetch(url, trust_env, request_kwargs, raise_for_status, True)
+            )
+            self._inflight[url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+
+        # Shielded so a cancelled caller doesn't cancel the fetch of others
+        return await asyncio.shield(task)
+
+    ####################
+    # Parsing
+    ####################
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.parser_workers > 0 and self._executor is None:
+            # Spawned rather than forked, so workers do not inherit the
+            # server's threads and sockets
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.parser_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def parse(
+        self,
+        page: WebPage,
+        parser: str,
+        bs_kwargs: Optional[dict] = None,
+        get_text_kwargs: Optional[dict] = None,
+    ) -> tuple[str, dict]:
+        """
+        Extract the text and metadata of a page.
+        """
+        args = (page, parser, bs_kwargs or {}, get_text_kwargs or {})
+
+        executor = self._get_executor()
+        if executor is not None:
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    executor, parse_web_page, *args
+                )
+            except BrokenProcessPool:
+                log.warning("Web page parser pool crashed, recreating it")
+                self._executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        return await asyncio.to_thread(parse_web_page, *args)
+
+    async def close(self):
+        for session in self._sessions.values():
+            await session.close()
+        self._sessions = {}
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
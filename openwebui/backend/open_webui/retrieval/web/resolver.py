@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import socket
+import time
+from typing import Optional
+
+import validators
+from aiohttp.abc import AbstractResolver
+
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+def is_private_address(address: str) -> bool:
+    return bool(
+        validators.ipv4(address, private=True) or validators.ipv6(address, private=True)
+    )
+
+
+class CachingResolver(AbstractResolver):
+    """
+    Resolves hostnames without blocking the event loop and caches the
+    addresses for `ttl` seconds.
+
+    URL validation and the web page fetcher share the same resolver, so a
+    page is fetched from the addresses it was validated against. Unless
+    `allow_private` is set, connections to private addresses are refused
+    even when a hostname starts resolving to one after validation.
+    """
+
+    def __init__(self, ttl: int = 60, max_size: int = 4096, allow_private=False):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.allow_private = allow_private
+
+        # (expires at, [(family, address)]) by hostname
+        self._cache: dict[str, tuple[float, list[tuple[int, str]]]] = {}
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    def _get_cached(self, hostname: str) -> Optional[list[tuple[int, str]]]:
+        entry = self._cache.get(hostname)
+        if entry is not None and entry[0] > time.time():
+            return entry[1]
+        return None
+
+    def _set_cached(self, hostname: str, addr_info: list) -> list[tuple[int, str]]:
+        addresses = list(
+            dict.fromkeys(
+                (info[0], info[4][0])
+                for info in addr_info
+                if info[0] in (socket.AF_INET, socket.AF_INET6)
+            )
+        )
+
+        if self.ttl > 0:
+            self._cache.pop(hostname, None)
+            self._cache[hostname] = (time.time() + self.ttl, addresses)
+            while len(self._cache) > self.max_size:
+                self._cache.pop(next(iter(self._cache)), None)
+
+        return addresses
+
+    def lookup(self, hostname: str) -> list[tuple[int, str]]:
+        """
+        Resolve the hostname, blocking. Meant for synchronous callers only.
+        """
+        addresses = self._get_cached(hostname)
+        if addresses is None:
+            addresses = self._set_cached(
+                hostname,
+                socket.getaddrinfo(hostname, None, type=socket.SOCK_STREAM),
+            )
+        return addresses
+
+    async def alookup(self, hostname: str) -> list[tuple[int, str]]:
+        addresses = self._get_cached(hostname)
+        if addresses is not None:
+            return addresses
+
+        # Concurrent lookups of the same hostname share a single query
+        task = self._inflight.get(hostname)
+        if task is None:
+            task = asyncio.create_task(
+                asyncio.get_running_loop().getaddrinfo(
+                    hostname, None, type=socket.SOCK_STREAM
+                )
+            )
+            self._inflight[hostname] = task
+            task.add_done_callback(lambda _: self._inflight.pop(hostname, None))
+
+        return self._set_cached(hostname, await asyncio.shield(task))
+
+    async def resolve(
+        self, host: str, port: int = 0, family: int = socket.AF_INET
+    ) -> list[dict]:
+        addresses = await self.alookup(host)
+
+        if not self.allow_private and any(
+            is_private_address(address) for _, address in addresses
+        ):
+            raise OSError(f"{host} resolves to a private address")
+
+        results = [
+            {
+                "hostname": host,
+                "host": address,
+                "port": port,
+                "family": address_family,
+                "proto": 0,
+                "flags": socket.AI_NUMERICHOST | socket.AI_NUMERICSERV,
+            }
+            for address_family, address in addresses
+            if family in (0, socket.AF_UNSPEC) or address_family == family
+        ]
+        if not results:
+            raise OSError(f"Could not resolve {host}")
+        return results
+
+    async def close(self):
+        pass
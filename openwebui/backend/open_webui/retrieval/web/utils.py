@@ -6,6 +6,7 @@ import urllib.parse
 import urllib.request
 from collections import defaultdict
 from datetime import datetime, time, timedelta
+from pathlib import Path
 from typing import (
     Any,
     AsyncIterator,
@@ -26,8 +27,16 @@ from langchain_community.document_loaders.base import BaseLoader
 from langchain_core.documents import Document
 from open_webui.retrieval.loaders.tavily import TavilyLoader
 from open_webui.retrieval.loaders.external_web import ExternalWebLoader
+from open_webui.retrieval.web.fetcher import (
+    WebPage,
+    WebPageFetcher,
+    extract_metadata,
+)
+from open_webui.retrieval.web.resolver import CachingResolver
+from open_webui.retrieval.web.browser import BrowserPool, get_browser_pool
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.config import (
+    CACHE_DIR,
     ENABLE_RAG_LOCAL_WEB_FETCH,
     PLAYWRIGHT_WS_URL,
     PLAYWRIGHT_TIMEOUT,
@@ -39,29 +48,62 @@ from open_webui.config import (
     EXTERNAL_WEB_LOADER_URL,
     EXTERNAL_WEB_LOADER_API_KEY,
 )
-from open_webui.env import SRC_LOG_LEVELS, AIOHTTP_CLIENT_SESSION_SSL
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    AIOHTTP_CLIENT_SESSION_SSL,
+    WEB_LOADER_MAX_CONNECTIONS,
+    WEB_LOADER_MAX_CONNECTIONS_PER_HOST,
+    WEB_LOADER_MAX_PAGE_SIZE_MB,
+    WEB_LOADER_CACHE_TTL,
+    WEB_LOADER_CACHE_MAX_SIZE_MB,
+    WEB_LOADER_PARSER_WORKERS,
+    WEB_LOADER_DNS_CACHE_TTL,
+    PLAYWRIGHT_MAX_CONTEXTS,
+    PLAYWRIGHT_MAX_CONCURRENT_PAGES,
+    PLAYWRIGHT_BROWSER_IDLE_TIMEOUT,
+    PLAYWRIGHT_BROWSER_MAX_PAGES,
+)
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
+# Validated URLs are fetched from the addresses they were validated against
+WEB_RESOLVER = CachingResolver(
+    ttl=WEB_LOADER_DNS_CACHE_TTL, allow_private=ENABLE_RAG_LOCAL_WEB_FETCH
+)
+
+# Shared by every web loader, so that pages searched by many users at once
+# are fetched a single time
+WEB_PAGE_FETCHER = WebPageFetcher(
+    cache_dir=Path(CACHE_DIR) / "web",
+    cache_ttl=WEB_LOADER_CACHE_TTL,
+    cache_max_size=WEB_LOADER_CACHE_MAX_SIZE_MB * 1024 * 1024,
+    max_page_size=int(WEB_LOADER_MAX_PAGE_SIZE_MB * 1024 * 1024),
+    max_connections=WEB_LOADER_MAX_CONNECTIONS,
+    max_connections_per_host=WEB_LOADER_MAX_CONNECTIONS_PER_HOST,
+    parser_workers=WEB_LOADER_PARSER_WORKERS,
+    resolver=WEB_RESOLVER,
+)
+
+
+def check_url_addresses(ipv4_addresses: list[str], ipv6_addresses: list[str]):
+    # Local web fetch is disabled, filter out any URLs that resolve to private IP addresses
+    for ip in ipv4_addresses:
+        if validators.ipv4(ip, private=True):
+            raise ValueError(ERROR_MESSAGES.INVALID_URL)
+    for ip in ipv6_addresses:
+        if validators.ipv6(ip, private=True):
+            raise ValueError(ERROR_MESSAGES.INVALID_URL)
+
+
 def validate_url(url: Union[str, Sequence[str]]):
     if isinstance(url, str):
         if isinstance(validators.url(url), validators.ValidationError):
             raise ValueError(ERROR_MESSAGES.INVALID_URL)
         if not ENABLE_RAG_LOCAL_WEB_FETCH:
-            # Local web fetch is disabled, filter out any URLs that resolve to private IP addresses
             parsed_url = urllib.parse.urlparse(url)
-            # Get IPv4 and IPv6 addresses
-            ipv4_addresses, ipv6_addresses = resolve_hostname(parsed_url.hostname)
-            # Check if any of the resolved addresses are private
-            # This is technically still vulnerable to DNS rebinding attacks, as we don't control WebBaseLoader
-            for ip in ipv4_addresses:
-                if validators.ipv4(ip, private=True):
-                    raise ValueError(ERROR_MESSAGES.INVALID_URL)
-            for ip in ipv6_addresses:
-                if validators.ipv6(ip, private=True):
-                    raise ValueError(ERROR_MESSAGES.INVALID_URL)
+            check_url_addresses(*resolve_hostname(parsed_url.hostname))
         return True
     elif isinstance(url, Sequence):
         return all(validate_url(u) for u in url)
@@ -69,37 +111,57 @@ def validate_url(url: Union[str, Sequence[str]]):
         return False
 
 
+async def avalidate_url(url: str) -> bool:
+    """Async version of validate_url, resolving hostnames off the event loop."""
+    if isinstance(validators.url(url), validators.ValidationError):
+        raise ValueError(ERROR_MESSAGES.INVALID_URL)
+    if not ENABLE_RAG_LOCAL_WEB_FETCH:
+        parsed_url = urllib.parse.urlparse(url)
+        check_url_addresses(*await aresolve_hostname(parsed_url.hostname))
+    return True
+
+
 def safe_validate_urls(url: Sequence[str]) -> Sequence[str]:
     valid_urls = []
     for u in url:
         try:
             if validate_url(u):
                 valid_urls.append(u)
-        except ValueError:
+        except (ValueError, OSError):
             continue
     return valid_urls
 
 
-def resolve_hostname(hostname):
-    # Get address information
-    addr_info = socket.getaddrinfo(hostname, None)
+async def asafe_validate_urls(urls: Sequence[str]) -> Sequence[str]:
+    """Validate the URLs concurrently, keeping the valid ones in order."""
+
+    async def is_valid(url: str) -> bool:
+        try:
+            return await avalidate_url(url)
+        except (ValueError, OSError):
+            return False
 
-    # Extract IP addresses from address information
-    ipv4_addresses = [info[4][0] for info in addr_info if info[0] == socket.AF_INET]
-    ipv6_addresses = [info[4][0] for info in addr_info if info[0] == socket.AF_INET6]
+    results = await asyncio.gather(*[is_valid(url) for url in urls])
+    return [url for url, valid in zip(urls, results) if valid]
 
+
+def split_addresses(addresses: list[tuple[int, str]]) -> tuple[list, list]:
+    ipv4_addresses = [
+        address for family, address in addresses if family == socket.AF_INET
+    ]
+    ipv6_addresses = [
+        address for family, address in addresses if family == socket.AF_INET6
+    ]
     return ipv4_addresses, ipv6_addresses
 
 
-def extract_metadata(soup, url):
-    metadata = {"source": url}
-    if title := soup.find("title"):
-        metadata["title"] = title.get_text()
-    if description := soup.find("meta", attrs={"name": "description"}):
-        metadata["description"] = description.get("content", "No description found.")
-    if html := soup.find("html"):
-        metadata["language"] = html.get("lang", "No language found.")
-    return metadata
+def resolve_hostname(hostname):
+    # Served from the resolver cache shared with the web page fetcher
+    return split_addresses(WEB_RESOLVER.lookup(hostname))
+
+
+async def aresolve_hostname(hostname):
+    return split_addresses(await WEB_RESOLVER.alookup(hostname))
 
 
 def verify_ssl_cert(url: str) -> bool:
@@ -123,12 +185,20 @@ def verify_ssl_cert(url: str) -> bool:
 class RateLimitMixin:
     async def _wait_for_rate_limit(self):
         """Wait to respect the rate limit if specified."""
-        if self.requests_per_second and self.last_request_time:
-            min_interval = timedelta(seconds=1.0 / self.requests_per_second)
-            time_since_last = datetime.now() - self.last_request_time
-            if time_since_last < min_interval:
-                await asyncio.sleep((min_interval - time_since_last).total_seconds())
-        self.last_request_time = datetime.now()
+        # Concurrent loads wait in turn, otherwise they would all compute their
+        # delay from the same last request time
+        if getattr(self, "_rate_limit_lock", None) is None:
+            self._rate_limit_lock = asyncio.Lock()
+
+        async with self._rate_limit_lock:
+            if self.requests_per_second and self.last_request_time:
+                min_interval = timedelta(seconds=1.0 / self.requests_per_second)
+                time_since_last = datetime.now() - self.last_request_time
+                if time_since_last < min_interval:
+                    await asyncio.sleep(
+                        (min_interval - time_since_last).total_seconds()
+                    )
+            self.last_request_time = datetime.now()
 
     def _sync_wait_for_rate_limit(self):
         """Synchronous version of rate limit wait."""
@@ -440,6 +510,7 @@ class SafePlaywrightURLLoader(PlaywrightURLLoader, RateLimitMixin, URLProcessing
                 browser = p.chromium.launch(headless=self.headless, proxy=self.proxy)
 
             for url in self.urls:
+                page = None
                 try:
                     self._safe_process_url_sync(url)
                     page = browser.new_page()
@@ -448,45 +519,59 @@ class SafePlaywrightURLLoader(PlaywrightURLLoader, RateLimitMixin, URLProcessing
                         raise ValueError(f"page.goto() returned None for url {url}")
 
                     text = self.evaluator.evaluate(page, browser, response)
-                    metadata = {"source": url}
-                    yield Document(page_content=text, metadata=metadata)
                 except Exception as e:
                     if self.continue_on_failure:
                         log.exception(f"Error loading {url}: {e}")
                         continue
                     raise e
+                finally:
+                    if page is not None:
+                        page.close()
+
+                metadata = {"source": url}
+                yield Document(page_content=text, metadata=metadata)
             browser.close()
 
+    async def _aload_url(self, pool: BrowserPool, url: str) -> Optional[Document]:
+        try:
+            await self._safe_process_url(url)
+            async with pool.page() as page:
+                response = await page.goto(url, timeout=self.playwright_timeout)
+                if response is None:
+                    raise ValueError(f"page.goto() returned None for url {url}")
+
+                text = await self.evaluator.evaluate_async(
+                    page, page.context.browser, response
+                )
+                metadata = {"source": url}
+                return Document(page_content=text, metadata=metadata)
+        except Exception as e:
+            if self.continue_on_failure:
+                log.exception(f"Error loading {url}: {e}")
+                return None
+            raise e
+
     async def alazy_load(self) -> AsyncIterator[Document]:
-        """Safely load URLs asynchronously with support for remote browser."""
-        from playwright.async_api import async_playwright
+        """Safely load URLs concurrently with the shared browser pool."""
+        pool = get_browser_pool(
+            ws_url=self.playwright_ws_url,
+            headless=self.headless,
+            proxy=self.proxy,
+            max_contexts=PLAYWRIGHT_MAX_CONTEXTS,
+            idle_timeout=PLAYWRIGHT_BROWSER_IDLE_TIMEOUT,
+            max_pages=PLAYWRIGHT_BROWSER_MAX_PAGES,
+        )
 
-        async with async_playwright() as p:
-            # Use remote browser if ws_endpoint is provided, otherwise use local browser
-            if self.playwright_ws_url:
-                browser = await p.chromium.connect(self.playwright_ws_url)
-            else:
-                browser = await p.chromium.launch(
-                    headless=self.headless, proxy=self.proxy
-                )
+        semaphore = asyncio.Semaphore(max(1, PLAYWRIGHT_MAX_CONCURRENT_PAGES))
 
-            for url in self.urls:
-                try:
-                    await self._safe_process_url(url)
-                    page = await browser.new_page()
-                    response = await page.goto(url, timeout=self.playwright_timeout)
-                    if response is None:
-                        raise ValueError(f"page.goto() returned None for url {url}")
+        async def load_url(url: str) -> Optional[Document]:
+            async with semaphore:
+                return await self._aload_url(pool, url)
 
-                    text = await self.evaluator.evaluate_async(page, browser, response)
-                    metadata = {"source": url}
-                    yield Document(page_content=text, metadata=metadata)
-                except Exception as e:
-                    if self.continue_on_failure:
-                        log.exception(f"Error loading {url}: {e}")
-                        continue
-                    raise e
-            await browser.close()
+        documents = await asyncio.gather(*[load_url(url) for url in self.urls])
+        for document in documents:
+            if document is not None:
+                yield document
 
 
 class SafeWebBaseLoader(WebBaseLoader):
@@ -503,36 +588,42 @@ class SafeWebBaseLoader(WebBaseLoader):
 
     async def _fetch(
         self, url: str, retries: int = 3, cooldown: int = 2, backoff: float = 1.5
-    ) -> str:
-        async with aiohttp.ClientSession(trust_env=self.trust_env) as session:
-            for i in range(retries):
-                try:
-                    kwargs: Dict = dict(
-                        headers=self.session.headers,
-                        cookies=self.session.cookies.get_dict(),
+    ) -> WebPage:
+        kwargs: Dict = dict(
+            headers=dict(self.session.headers),
+            cookies=self.session.cookies.get_dict(),
+        )
+        if not self.session.verify:
+            kwargs["ssl"] = False
+
+        for i in range(retries):
+            try:
+                return await WEB_PAGE_FETCHER.fetch(
+                    url,
+                    trust_env=self.trust_env,
+                    request_kwargs=self.requests_kwargs | kwargs,
+                    raise_for_status=self.raise_for_status,
+                )
+            except aiohttp.ClientConnectionError as e:
+                if i == retries - 1:
+                    raise
+                else:
+                    log.warning(
+                        f"Error fetching {url} with attempt "
+                        f"{i + 1}/{retries}: {e}. Retrying..."
                     )
-                    if not self.session.verify:
-                        kwargs["ssl"] = False
-
-                    async with session.get(
-                        url,
-                        **(self.requests_kwargs | kwargs),
-                        allow_redirects=False,
-                    ) as response:
-                        if self.raise_for_status:
-                            response.raise_for_status()
-                        return await response.text()
-                except aiohttp.ClientConnectionError as e:
-                    if i == retries - 1:
-                        raise
-                    else:
-                        log.warning(
-                            f"Error fetching {url} with attempt "
-                            f"{i + 1}/{retries}: {e}. Retrying..."
-                        )
-                        await asyncio.sleep(cooldown * backoff**i)
+                    await asyncio.sleep(cooldown * backoff**i)
         raise ValueError("retry count exceeded")
 
+    def _get_parser(self, url: str, parser: Union[str, None] = None) -> str:
+        if parser is None:
+            if url.endswith(".xml"):
+                parser = "xml"
+            else:
+                parser = self.default_parser
+            self._check_parser(parser)
+        return parser
+
     def _unpack_fetch_results(
         self, results: Any, urls: List[str], parser: Union[str, None] = None
     ) -> List[Any]:
@@ -542,13 +633,18 @@ class SafeWebBaseLoader(WebBaseLoader):
         final_results = []
         for i, result in enumerate(results):
             url = urls[i]
-            if parser is None:
-                if url.endswith(".xml"):
-                    parser = "xml"
-                else:
-                    parser = self.default_parser
-                self._check_parser(parser)
-            final_results.append(BeautifulSoup(result, parser, **self.bs_kwargs))
+            if isinstance(result, WebPage):
+                soup = BeautifulSoup(
+                    result.body,
+                    self._get_parser(url, parser),
+                    from_encoding=result.encoding,
+                    **self.bs_kwargs,
+                )
+            else:
+                soup = BeautifulSoup(
+                    result, self._get_parser(url, parser), **self.bs_kwargs
+                )
+            final_results.append(soup)
         return final_results
 
     async def ascrape_all(
@@ -575,18 +671,26 @@ class SafeWebBaseLoader(WebBaseLoader):
 
     async def alazy_load(self) -> AsyncIterator[Document]:
         """Async lazy load text from the url(s) in web_path."""
-        results = await self.ascrape_all(self.web_paths)
-        for path, soup in zip(self.web_paths, results):
-            text = soup.get_text(**self.bs_get_text_kwargs)
-            metadata = {"source": path}
-            if title := soup.find("title"):
-                metadata["title"] = title.get_text()
-            if description := soup.find("meta", attrs={"name": "description"}):
-                metadata["description"] = description.get(
-                    "content", "No description found."
+        results = await self.fetch_all(self.web_paths)
+
+        # Failed fetches come back as empty strings when continuing on failure
+        pages = [
+            result if isinstance(result, WebPage) else WebPage(path, b"")
+            for path, result in zip(self.web_paths, results)
+        ]
+        parsed = await asyncio.gather(
+            *[
+                WEB_PAGE_FETCHER.parse(
+                    page,
+                    self._get_parser(page.url),
+                    self.bs_kwargs,
+                    self.bs_get_text_kwargs,
                 )
-            if html := soup.find("html"):
-                metadata["language"] = html.get("lang", "No language found.")
+                for page in pages
+            ]
+        )
+
+        for text, metadata in parsed:
             yield Document(page_content=text, metadata=metadata)
 
     async def aload(self) -> list[Document]:
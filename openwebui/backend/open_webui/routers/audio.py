@@ -1,13 +1,24 @@
+import asyncio
 import hashlib
 import json
 import logging
 import os
+import queue
+import re
+import subprocess
+import tempfile
+import threading
+import time
 import uuid
 from functools import lru_cache
+import numpy as np
 from pydub import AudioSegment
 from pydub.silence import split_on_silence
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
-from typing import Optional
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Optional
 
 from fnmatch import fnmatch
 import aiohttp
@@ -28,16 +39,22 @@ from fastapi import (
     APIRouter,
 )
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.whisper import WhisperPoolFullError, WhisperWorkerPool
 from open_webui.config import (
     WHISPER_MODEL_AUTO_UPDATE,
     WHISPER_MODEL_DIR,
     CACHE_DIR,
     WHISPER_LANGUAGE,
+    WHISPER_WORKERS,
+    WHISPER_QUEUE_SIZE,
+    WHISPER_QUEUE_TIMEOUT,
+    WHISPER_BATCH_SIZE,
 )
 
 from open_webui.constants import ERROR_MESSAGES
@@ -48,6 +65,7 @@ from open_webui.env import (
     SRC_LOG_LEVELS,
     DEVICE_TYPE,
     ENABLE_FORWARD_USER_INFO_HEADERS,
+    SPEECH_CACHE_MAX_SIZE_MB,
 )
 
 
@@ -59,11 +77,40 @@ MAX_FILE_SIZE = MAX_FILE_SIZE_MB * 1024 * 1024  # Convert MB to bytes
 AZURE_MAX_FILE_SIZE_MB = 200
 AZURE_MAX_FILE_SIZE = AZURE_MAX_FILE_SIZE_MB * 1024 * 1024  # Convert MB to bytes
 
+# Audio is decoded once to 16 kHz mono 16-bit PCM before being chunked
+AUDIO_SAMPLE_RATE = 16000
+AUDIO_SAMPLE_WIDTH = 2
+AUDIO_BYTES_PER_SECOND = AUDIO_SAMPLE_RATE * AUDIO_SAMPLE_WIDTH
+
+# Chunks are encoded to 32 kbps mp3 and filled to 90% of the size limit,
+# leaving room for the container overhead
+AUDIO_CHUNK_BITRATE = 32000
+AUDIO_CHUNK_FILL = 0.9
+
+# Chunks are cut at the quietest 20ms frame within the last seconds of a chunk
+SILENCE_SEARCH_SECONDS = 30
+SILENCE_FRAME_SAMPLES = AUDIO_SAMPLE_RATE // 50
+
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["AUDIO"])
 
 SPEECH_CACHE_DIR = CACHE_DIR / "audio" / "speech"
 SPEECH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+SPEECH_CACHE_MAX_SIZE = SPEECH_CACHE_MAX_SIZE_MB * 1024 * 1024
+
+# Sentences synthesized ahead of the one being streamed
+SPEECH_STREAM_PREFETCH = 2
+SPEECH_STREAM_CHUNK_SIZE = 64 * 1024
+
+# In-flight syntheses by cache name, shared by concurrent identical requests
+SPEECH_REQUESTS: dict[str, asyncio.Task] = {}
+
+# Speech files used more recently than this are kept when pruning the cache,
+# they may be about to be sent. Leftover temporary files are removed once
+# this old
+SPEECH_CACHE_MIN_AGE = 60
+
+WHISPER_POOL_LOCK = threading.Lock()
 
 
 ##########################################
@@ -106,24 +153,9 @@ def is_audio_conversion_required(file_path):
         return False
 
 
-def convert_audio_to_mp3(file_path):
-    """Convert audio file to mp3 format."""
-    try:
-        output_path = os.path.splitext(file_path)[0] + ".mp3"
-        audio = AudioSegment.from_file(file_path)
-        audio.export(output_path, format="mp3")
-        log.info(f"Converted {file_path} to {output_path}")
-        return output_path
-    except Exception as e:
-        log.error(f"Error converting audio file: {e}")
-        return None
-
-
-def set_faster_whisper_model(model: str, auto_update: bool = False):
-    whisper_model = None
+def set_whisper_worker_pool(model: str, auto_update: bool = False):
+    whisper_pool = None
     if model:
-        from faster_whisper import WhisperModel
-
         faster_whisper_kwargs = {
             "model_size_or_path": model,
             "device": DEVICE_TYPE if DEVICE_TYPE and DEVICE_TYPE == "cuda" else "cpu",
@@ -132,15 +164,32 @@ def set_faster_whisper_model(model: str, auto_update: bool = False):
             "local_files_only": not auto_update,
         }
 
-        try:
-            whisper_model = WhisperModel(**faster_whisper_kwargs)
-        except Exception:
-            log.warning(
-                "WhisperModel initialization failed, attempting download with local_files_only=False"
-            )
-            faster_whisper_kwargs["local_files_only"] = False
-            whisper_model = WhisperModel(**faster_whisper_kwargs)
-    return whisper_model
+        # The model is loaded by each worker process on its first transcription
+        whisper_pool = WhisperWorkerPool(
+            faster_whisper_kwargs,
+            workers=WHISPER_WORKERS,
+            queue_size=WHISPER_QUEUE_SIZE,
+            queue_timeout=WHISPER_QUEUE_TIMEOUT,
+            batch_size=WHISPER_BATCH_SIZE,
+        )
+    return whisper_pool
+
+
+def get_whisper_worker_pool(request: Request) -> WhisperWorkerPool:
+    if request.app.state.whisper_pool is None:
+        with WHISPER_POOL_LOCK:
+            if request.app.state.whisper_pool is None:
+                request.app.state.whisper_pool = set_whisper_worker_pool(
+                    request.app.state.config.WHISPER_MODEL
+                )
+    return request.app.state.whisper_pool
+
+
+def reset_whisper_worker_pool(request: Request, whisper_pool=None):
+    with WHISPER_POOL_LOCK:
+        if request.app.state.whisper_pool is not None:
+            request.app.state.whisper_pool.shutdown()
+        request.app.state.whisper_pool = whisper_pool
 
 
 ##########################################
@@ -253,11 +302,14 @@ async def update_audio_config(
     )
 
     if request.app.state.config.STT_ENGINE == "":
-        request.app.state.faster_whisper_model = set_faster_whisper_model(
-            form_data.stt.WHISPER_MODEL, WHISPER_MODEL_AUTO_UPDATE
+        reset_whisper_worker_pool(
+            request,
+            set_whisper_worker_pool(
+                form_data.stt.WHISPER_MODEL, WHISPER_MODEL_AUTO_UPDATE
+            ),
         )
     else:
-        request.app.state.faster_whisper_model = None
+        reset_whisper_worker_pool(request)
 
     return {
         "tts": {
@@ -304,21 +356,187 @@ def load_speech_pipeline(request):
         )
 
 
-@router.post("/speech")
-async def speech(request: Request, user=Depends(get_verified_user)):
-    body = await request.body()
-    name = hashlib.sha256(
-        body
+def get_speech_cache_name(request: Request, payload: dict) -> str:
+    # Keyed by the parsed payload, so that the formatting of the request body
+    # and the stream flag do not split the cache
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True).encode("utf-8")
         + str(request.app.state.config.TTS_ENGINE).encode("utf-8")
         + str(request.app.state.config.TTS_MODEL).encode("utf-8")
     ).hexdigest()
 
+
+def prune_speech_cache(in_flight: set[str]):
+    """
+    Evict the least recently used speech files until the cache fits within
+    SPEECH_CACHE_MAX_SIZE_MB. Cache hits refresh the modification time of the
+    audio file, so it doubles as the last access time. Files being synthesized
+    or used within SPEECH_CACHE_MIN_AGE seconds are kept.
+    """
+    if not SPEECH_CACHE_MAX_SIZE:
+        return
+
+    cutoff = time.time() - SPEECH_CACHE_MIN_AGE
+    entries = {}
+    for path in SPEECH_CACHE_DIR.iterdir():
+        try:
+            stat = path.stat()
+
+            # Temporary files of syntheses that didn't complete
+            if path.name.startswith("."):
+                if stat.st_mtime < cutoff:
+                    path.unlink()
+                continue
+        except FileNotFoundError:
+            continue
+
+        mtime, size = entries.get(path.stem, (0, 0))
+        entries[path.stem] = (max(mtime, stat.st_mtime), size + stat.st_size)
+
+    total_size = sum(size for _, size in entries.values())
+    for name, (mtime, size) in sorted(entries.items(), key=lambda item: item[1][0]):
+        if total_size <= SPEECH_CACHE_MAX_SIZE or mtime >= cutoff:
+            break
+        if name in in_flight:
+            continue
+
+        for suffix in (".mp3", ".json"):
+            SPEECH_CACHE_DIR.joinpath(f"{name}{suffix}").unlink(missing_ok=True)
+        total_size -= size
+
+
+async def get_speech_file(request: Request, payload: dict, user) -> Path:
+    """
+    Return the cached audio file for a speech request, synthesizing it on a
+    miss. Concurrent requests for the same speech share a single synthesis.
+    """
+    name = get_speech_cache_name(request, payload)
+
     file_path = SPEECH_CACHE_DIR.joinpath(f"{name}.mp3")
     file_body_path = SPEECH_CACHE_DIR.joinpath(f"{name}.json")
 
-    # Check if the file already exists in the cache
-    if file_path.is_file():
-        return FileResponse(file_path)
+    task = SPEECH_REQUESTS.get(name)
+    if task is None:
+        # Check if the file already exists in the cache, files are moved in
+        # place once complete
+        if file_path.is_file():
+            try:
+                os.utime(file_path)
+                return file_path
+            except FileNotFoundError:
+                pass
+            except OSError:
+                return file_path
+
+        async def cache_speech():
+            # Written next to the cache, hidden from it until complete
+            temp_name = f".{name}.{uuid.uuid4().hex}"
+            temp_file_path = SPEECH_CACHE_DIR.joinpath(f"{temp_name}.mp3")
+            temp_file_body_path = SPEECH_CACHE_DIR.joinpath(f"{temp_name}.json")
+            try:
+                await synthesize_speech(
+                    request, dict(payload), temp_file_path, temp_file_body_path, user
+                )
+                os.replace(temp_file_body_path, file_body_path)
+                os.replace(temp_file_path, file_path)
+            finally:
+                temp_file_path.unlink(missing_ok=True)
+                temp_file_body_path.unlink(missing_ok=True)
+
+            await run_in_threadpool(prune_speech_cache, set(SPEECH_REQUESTS))
+
+        task = asyncio.create_task(cache_speech())
+        SPEECH_REQUESTS[name] = task
+        task.add_done_callback(lambda _: SPEECH_REQUESTS.pop(name, None))
+
+    # Shielded so that a client disconnecting does not cancel the synthesis
+    # other requests are waiting on
+    await asyncio.shield(task)
+    return file_path
+
+
+def split_speech_input(text: str, split_on: str) -> list[str]:
+    if split_on == "punctuation":
+        parts = re.split(r"(?<=[.!?。！？])\s+", text)
+    elif split_on == "paragraphs":
+        parts = re.split(r"\n+", text)
+    else:
+        parts = [text]
+
+    return [part.strip() for part in parts if part.strip()]
+
+
+def is_speech_streamable(request: Request, payload: dict) -> bool:
+    """
+    Sentences are streamed as consecutive MP3 files, which only plays back
+    correctly for engines producing MP3 frames.
+    """
+    engine = request.app.state.config.TTS_ENGINE
+    if engine == "openai":
+        return payload.get("response_format", "mp3") == "mp3"
+    elif engine == "elevenlabs":
+        return True
+    elif engine == "azure":
+        return request.app.state.config.TTS_AZURE_SPEECH_OUTPUT_FORMAT.endswith("mp3")
+    return False
+
+
+async def stream_speech(request: Request, payload: dict, user):
+    """
+    Synthesize the input sentence by sentence, yielding the audio of each
+    sentence as soon as it is ready while the next ones are synthesized.
+    Every sentence goes through the speech cache on its own.
+    """
+    sentences = iter(
+        split_speech_input(payload["input"], request.app.state.config.TTS_SPLIT_ON)
+    )
+    pending = deque()
+
+    def schedule():
+        while len(pending) < SPEECH_STREAM_PREFETCH:
+            sentence = next(sentences, None)
+            if sentence is None:
+                return
+
+            sentence_payload = {**payload, "input": sentence}
+            pending.append(
+                (
+                    sentence_payload,
+                    asyncio.create_task(
+                        get_speech_file(request, sentence_payload, user)
+                    ),
+                )
+            )
+
+    schedule()
+    try:
+        while pending:
+            sentence_payload, task = pending.popleft()
+            file_path = await task
+            schedule()
+
+            try:
+                f = await aiofiles.open(file_path, "rb")
+            except FileNotFoundError:
+                # Evicted from the cache in the meantime, synthesized again
+                file_path = await get_speech_file(request, sentence_payload, user)
+                f = await aiofiles.open(file_path, "rb")
+
+            async with f:
+                while chunk := await f.read(SPEECH_STREAM_CHUNK_SIZE):
+                    yield chunk
+    except Exception as e:
+        # Raised so that the response fails instead of ending short
+        log.exception(f"Error streaming speech: {e}")
+        raise e
+    finally:
+        for _, task in pending:
+            task.cancel()
+
+
+@router.post("/speech")
+async def speech(request: Request, user=Depends(get_verified_user)):
+    body = await request.body()
 
     payload = None
     try:
@@ -327,6 +545,17 @@ async def speech(request: Request, user=Depends(get_verified_user)):
         log.exception(e)
         raise HTTPException(status_code=400, detail="Invalid JSON payload")
 
+    if payload.pop("stream", False) and is_speech_streamable(request, payload):
+        return StreamingResponse(
+            stream_speech(request, payload, user), media_type="audio/mpeg"
+        )
+
+    return FileResponse(await get_speech_file(request, payload, user))
+
+
+async def synthesize_speech(
+    request: Request, payload: dict, file_path: Path, file_body_path: Path, user
+):
     r = None
     if request.app.state.config.TTS_ENGINE == "openai":
         payload["model"] = request.app.state.config.TTS_MODEL
@@ -364,8 +593,6 @@ async def speech(request: Request, user=Depends(get_verified_user)):
                 async with aiofiles.open(file_body_path, "w") as f:
                     await f.write(json.dumps(payload))
 
-            return FileResponse(file_path)
-
         except Exception as e:
             log.exception(e)
             detail = None
@@ -424,8 +651,6 @@ async def speech(request: Request, user=Depends(get_verified_user)):
                     async with aiofiles.open(file_body_path, "w") as f:
                         await f.write(json.dumps(payload))
 
-            return FileResponse(file_path)
-
         except Exception as e:
             log.exception(e)
             detail = None
@@ -444,12 +669,6 @@ async def speech(request: Request, user=Depends(get_verified_user)):
             )
 
     elif request.app.state.config.TTS_ENGINE == "azure":
-        try:
-            payload = json.loads(body.decode("utf-8"))
-        except Exception as e:
-            log.exception(e)
-            raise HTTPException(status_code=400, detail="Invalid JSON payload")
-
         region = request.app.state.config.TTS_AZURE_SPEECH_REGION or "eastus"
         base_url = request.app.state.config.TTS_AZURE_SPEECH_BASE_URL
         language = request.app.state.config.TTS_VOICE
@@ -483,8 +702,6 @@ async def speech(request: Request, user=Depends(get_verified_user)):
                     async with aiofiles.open(file_body_path, "w") as f:
                         await f.write(json.dumps(payload))
 
-                    return FileResponse(file_path)
-
         except Exception as e:
             log.exception(e)
             detail = None
@@ -503,13 +720,6 @@ async def speech(request: Request, user=Depends(get_verified_user)):
             )
 
     elif request.app.state.config.TTS_ENGINE == "transformers":
-        payload = None
-        try:
-            payload = json.loads(body.decode("utf-8"))
-        except Exception as e:
-            log.exception(e)
-            raise HTTPException(status_code=400, detail="Invalid JSON payload")
-
         import torch
         import soundfile as sf
 
@@ -539,13 +749,15 @@ async def speech(request: Request, user=Depends(get_verified_user)):
         async with aiofiles.open(file_body_path, "w") as f:
             await f.write(json.dumps(payload))
 
-        return FileResponse(file_path)
+    else:
+        raise HTTPException(
+            status_code=400,
+            detail=ERROR_MESSAGES.DEFAULT("Unsupported TTS engine"),
+        )
 
 
-def transcription_handler(request, file_path, metadata):
+def transcription_handler(request, file_path, metadata, on_segment=None):
     filename = os.path.basename(file_path)
-    file_dir = os.path.dirname(file_path)
-    id = filename.split(".")[0]
 
     metadata = metadata or {}
 
@@ -555,31 +767,35 @@ def transcription_handler(request, file_path, metadata):
     ]
 
     if request.app.state.config.STT_ENGINE == "":
-        if request.app.state.faster_whisper_model is None:
-            request.app.state.faster_whisper_model = set_faster_whisper_model(
-                request.app.state.config.WHISPER_MODEL
+        whisper_pool = get_whisper_worker_pool(request)
+        try:
+            data = whisper_pool.transcribe(
+                file_path,
+                {
+                    "beam_size": 5,
+                    "vad_filter": request.app.state.config.WHISPER_VAD_FILTER,
+                    "language": languages[0],
+                },
+                on_segment=on_segment,
             )
+        except WhisperPoolFullError as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=ERROR_MESSAGES.DEFAULT(e),
+            )
+        except BrokenProcessPool:
+            # A worker crashed or failed to load the model, start over with a
+            # fresh pool on the next request
+            if request.app.state.whisper_pool is whisper_pool:
+                reset_whisper_worker_pool(request)
+            raise
 
-        model = request.app.state.faster_whisper_model
-        segments, info = model.transcribe(
-            file_path,
-            beam_size=5,
-            vad_filter=request.app.state.config.WHISPER_VAD_FILTER,
-            language=languages[0],
-        )
         log.info(
             "Detected language '%s' with probability %f"
-            % (info.language, info.language_probability)
+            % (data["language"], data["language_probability"])
         )
 
-        transcript = "".join([segment.text for segment in list(segments)])
-        data = {"text": transcript.strip()}
-
-        # save the transcript to a json file
-        transcript_file = f"{file_dir}/{id}.json"
-        with open(transcript_file, "w") as f:
-            json.dump(data, f)
-
+        data = {"text": data["text"]}
         log.debug(data)
         return data
     elif request.app.state.config.STT_ENGINE == "openai":
@@ -609,11 +825,6 @@ def transcription_handler(request, file_path, metadata):
             r.raise_for_status()
             data = r.json()
 
-            # save the transcript to a json file
-            transcript_file = f"{file_dir}/{id}.json"
-            with open(transcript_file, "w") as f:
-                json.dump(data, f)
-
             return data
         except Exception as e:
             log.exception(e)
@@ -681,11 +892,6 @@ def transcription_handler(request, file_path, metadata):
                 )
             data = {"text": transcript.strip()}
 
-            # Save transcript
-            transcript_file = f"{file_dir}/{id}.json"
-            with open(transcript_file, "w") as f:
-                json.dump(data, f)
-
             return data
 
         except Exception as e:
@@ -787,11 +993,6 @@ def transcription_handler(request, file_path, metadata):
 
             data = {"text": transcript}
 
-            # Save transcript to json file (consistent with other providers)
-            transcript_file = f"{file_dir}/{id}.json"
-            with open(transcript_file, "w") as f:
-                json.dump(data, f)
-
             log.debug(data)
             return data
 
@@ -819,40 +1020,268 @@ def transcription_handler(request, file_path, metadata):
             )
 
 
-def transcribe(request: Request, file_path: str, metadata: Optional[dict] = None):
-    log.info(f"transcribe: {file_path} {metadata}")
+def find_quietest_offset(pcm: bytearray, start: int, end: int) -> int:
+    """
+    Return the byte offset of the quietest frame of 16-bit PCM between start and end.
+    """
+    frame_size = SILENCE_FRAME_SAMPLES * AUDIO_SAMPLE_WIDTH
+    frame_count = (end - start) // frame_size
+    if frame_count == 0:
+        return end
+
+    samples = np.frombuffer(
+        pcm, dtype=np.int16, count=frame_count * SILENCE_FRAME_SAMPLES, offset=start
+    ).astype(np.float32)
+    energy = np.mean(samples.reshape(frame_count, SILENCE_FRAME_SAMPLES) ** 2, axis=1)
+
+    return start + int(np.argmin(energy)) * frame_size
+
+
+def read_process_errors(stderr) -> str:
+    stderr.seek(0)
+    return stderr.read().decode("utf-8", errors="ignore").strip()
+
+
+def start_chunk_encoder(chunk_path: str, stderr) -> subprocess.Popen:
+    return subprocess.Popen(
+        [
+            AudioSegment.converter,
+            "-loglevel",
+            "error",
+            "-nostats",
+            "-y",
+            "-f",
+            "s16le",
+            "-ac",
+            "1",
+            "-ar",
+            str(AUDIO_SAMPLE_RATE),
+            "-i",
+            "pipe:0",
+            "-b:a",
+            str(AUDIO_CHUNK_BITRATE),
+            chunk_path,
+        ],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        stderr=stderr,
+    )
 
-    if is_audio_conversion_required(file_path):
-        file_path = convert_audio_to_mp3(file_path)
 
-    try:
-        file_path = compress_audio(file_path)
-    except Exception as e:
-        log.exception(e)
+def finish_chunk_encoder(encoder: subprocess.Popen, chunk_path: str, stderr) -> str:
+    encoder.stdin.close()
+    if encoder.wait() != 0:
+        raise Exception(f"Error encoding audio: {read_process_errors(stderr)}")
+    return chunk_path
 
-    # Always produce a list of chunk paths (could be one entry if small)
-    try:
-        chunk_paths = split_audio(file_path, MAX_FILE_SIZE)
-        print(f"Chunk paths: {chunk_paths}")
-    except Exception as e:
-        log.exception(e)
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=ERROR_MESSAGES.DEFAULT(e),
+
+def stream_audio_chunks(file_path: str, max_bytes: int):
+    """
+    Decode the audio in a single ffmpeg pass, resampled to 16 kHz mono, and
+    yield mp3 chunk paths not exceeding max_bytes as soon as each one is ready.
+
+    Chunk durations follow from the mp3 bitrate; each chunk is cut at the
+    quietest point near its end so words are not split across chunks. The
+    PCM is streamed into the encoder of the current chunk, only the window
+    searched for the cut is held in memory.
+    """
+    base, _ = os.path.splitext(file_path)
+
+    chunk_seconds = int(max_bytes * AUDIO_CHUNK_FILL * 8 / AUDIO_CHUNK_BITRATE)
+    max_chunk_bytes = max(chunk_seconds, 1) * AUDIO_BYTES_PER_SECOND
+    search_bytes = min(
+        SILENCE_SEARCH_SECONDS * AUDIO_BYTES_PER_SECOND, max_chunk_bytes // 2
+    )
+    search_bytes -= search_bytes % AUDIO_SAMPLE_WIDTH
+    search_start = max_chunk_bytes - search_bytes
+
+    # Errors go to temporary files, a full stderr pipe would block ffmpeg
+    with tempfile.TemporaryFile() as decoder_errors, tempfile.TemporaryFile() as encoder_errors:
+        decoder = subprocess.Popen(
+            [
+                AudioSegment.converter,
+                "-nostdin",
+                "-loglevel",
+                "error",
+                "-nostats",
+                "-i",
+                file_path,
+                "-vn",
+                "-ac",
+                "1",
+                "-ar",
+                str(AUDIO_SAMPLE_RATE),
+                "-f",
+                "s16le",
+                "pipe:1",
+            ],
+            stdout=subprocess.PIPE,
+            stderr=decoder_errors,
         )
 
+        encoder = None
+        # PCM of the current chunk not yet encoded, in which it may be cut
+        pending = bytearray()
+        # Bytes of the current chunk already encoded
+        encoded = 0
+        i = 0
+
+        def encode(pcm):
+            nonlocal encoder, encoded
+            if encoder is None:
+                encoder = start_chunk_encoder(f"{base}_chunk_{i}.mp3", encoder_errors)
+            encoder.stdin.write(pcm)
+            encoded += len(pcm)
+
+        def finish():
+            nonlocal encoder, encoded, i
+            if encoder is None:
+                encoder = start_chunk_encoder(f"{base}_chunk_{i}.mp3", encoder_errors)
+            chunk_path = finish_chunk_encoder(
+                encoder, f"{base}_chunk_{i}.mp3", encoder_errors
+            )
+            encoder = None
+            encoded = 0
+            i += 1
+            return chunk_path
+
+        try:
+            while True:
+                data = decoder.stdout.read(AUDIO_BYTES_PER_SECOND)
+                pending.extend(data)
+
+                while encoded + len(pending) >= max_chunk_bytes:
+                    cut = find_quietest_offset(
+                        pending, search_start - encoded, max_chunk_bytes - encoded
+                    )
+                    encode(pending[:cut])
+                    del pending[:cut]
+                    yield finish()
+
+                # Audio before the searched window is final, encode it now
+                flush = min(search_start - encoded, len(pending))
+                if flush > 0:
+                    encode(pending[:flush])
+                    del pending[:flush]
+
+                if not data:
+                    break
+
+            if decoder.wait() != 0:
+                raise Exception(
+                    f"Error decoding audio: {read_process_errors(decoder_errors)}"
+                )
+
+            if pending or encoded or i == 0:
+                encode(pending)
+                yield finish()
+        finally:
+            for process in (decoder, encoder):
+                if process is not None and process.poll() is None:
+                    process.kill()
+                    process.wait()
+
+
+class OrderedSegments:
+    """
+    Forwards partial transcripts of concurrently transcribed chunks in chunk
+    order: segments of the earliest unfinished chunk are passed through as
+    they arrive, those of later chunks are held back until it finishes.
+    """
+
+    def __init__(self, callback: Callable[[str], None]):
+        self.callback = callback
+        self.lock = threading.Lock()
+        self.current = 0
+        self.buffers = {}
+        self.emitted = set()
+        self.finished = {}
+
+    def emit(self, index: int, text: str):
+        with self.lock:
+            self.emitted.add(index)
+            if index == self.current:
+                self.callback(text)
+            else:
+                self.buffers.setdefault(index, []).append(text)
+
+    def finish(self, index: int, text: str):
+        with self.lock:
+            self.finished[index] = text
+            while self.current in self.finished:
+                text = self.finished.pop(self.current)
+
+                # Engines without partial results emit the whole chunk at once
+                if self.current not in self.emitted and text:
+                    self.callback(f" {text}" if self.current else text)
+                self.emitted.discard(self.current)
+
+                self.current += 1
+                for text in self.buffers.pop(self.current, []):
+                    self.callback(text)
+
+
+def transcribe(
+    request: Request,
+    file_path: str,
+    metadata: Optional[dict] = None,
+    on_segment: Optional[Callable[[str], None]] = None,
+):
+    log.info(f"transcribe: {file_path} {metadata}")
+
+    if os.path.getsize(file_path) <= MAX_FILE_SIZE and not is_audio_conversion_required(
+        file_path
+    ):
+        chunks = [file_path]  # Nothing to convert or split
+    else:
+        chunks = stream_audio_chunks(file_path, MAX_FILE_SIZE)
+
+    segments = OrderedSegments(on_segment) if on_segment else None
+
+    def transcribe_chunk(index: int, chunk_path: str):
+        result = transcription_handler(
+            request,
+            chunk_path,
+            metadata,
+            on_segment=(
+                (lambda text: segments.emit(index, text)) if segments else None
+            ),
+        )
+        if segments:
+            segments.finish(index, result["text"])
+        return result
+
+    # Chunks of a local transcription are queued here rather than in the
+    # whisper pool, so a long file takes at most one slot per worker and
+    # doesn't crowd out, or time out on, other transcriptions
+    max_workers = (
+        max(1, WHISPER_WORKERS) if request.app.state.config.STT_ENGINE == "" else None
+    )
+
+    chunk_paths = []
     results = []
     try:
-        with ThreadPoolExecutor() as executor:
-            # Submit tasks for each chunk_path
-            futures = [
-                executor.submit(transcription_handler, request, chunk_path, metadata)
-                for chunk_path in chunk_paths
-            ]
-            # Gather results as they complete
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Submit each chunk as soon as it is decoded so transcription
+            # overlaps with decoding the rest of the file
+            futures = []
+            try:
+                for index, chunk_path in enumerate(chunks):
+                    chunk_paths.append(chunk_path)
+                    futures.append(executor.submit(transcribe_chunk, index, chunk_path))
+            except Exception as e:
+                log.exception(e)
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=ERROR_MESSAGES.DEFAULT(e),
+                )
+
+            # Gather results in chunk order
             for future in futures:
                 try:
                     results.append(future.result())
+                except HTTPException:
+                    raise
                 except Exception as transcribe_exc:
                     raise HTTPException(
                         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -872,66 +1301,35 @@ def transcribe(request: Request, file_path: str, metadata: Optional[dict] = None
     }
 
 
-def compress_audio(file_path):
-    if os.path.getsize(file_path) > MAX_FILE_SIZE:
-        id = os.path.splitext(os.path.basename(file_path))[
-            0
-        ]  # Handles names with multiple dots
-        file_dir = os.path.dirname(file_path)
-
-        audio = AudioSegment.from_file(file_path)
-        audio = audio.set_frame_rate(16000).set_channels(1)  # Compress audio
-
-        compressed_path = os.path.join(file_dir, f"{id}_compressed.mp3")
-        audio.export(compressed_path, format="mp3", bitrate="32k")
-        # log.debug(f"Compressed audio to {compressed_path}")  # Uncomment if log is defined
-
-        return compressed_path
-    else:
-        return file_path
-
-
-def split_audio(file_path, max_bytes, format="mp3", bitrate="32k"):
+def stream_transcription(
+    request: Request, file_path: str, metadata: Optional[dict] = None
+):
     """
-    Splits audio into chunks not exceeding max_bytes.
-    Returns a list of chunk file paths. If audio fits, returns list with original path.
+    Transcribe in a background thread and yield server-sent events with the
+    partial transcripts as they are produced, followed by the full result.
     """
-    file_size = os.path.getsize(file_path)
-    if file_size <= max_bytes:
-        return [file_path]  # Nothing to split
-
-    audio = AudioSegment.from_file(file_path)
-    duration_ms = len(audio)
-    orig_size = file_size
-
-    approx_chunk_ms = max(int(duration_ms * (max_bytes / orig_size)) - 1000, 1000)
-    chunks = []
-    start = 0
-    i = 0
+    events = queue.Queue()
 
-    base, _ = os.path.splitext(file_path)
-
-    while start < duration_ms:
-        end = min(start + approx_chunk_ms, duration_ms)
-        chunk = audio[start:end]
-        chunk_path = f"{base}_chunk_{i}.{format}"
-        chunk.export(chunk_path, format=format, bitrate=bitrate)
-
-        # Reduce chunk duration if still too large
-        while os.path.getsize(chunk_path) > max_bytes and (end - start) > 5000:
-            end = start + ((end - start) // 2)
-            chunk = audio[start:end]
-            chunk.export(chunk_path, format=format, bitrate=bitrate)
-
-        if os.path.getsize(chunk_path) > max_bytes:
-            os.remove(chunk_path)
-            raise Exception("Audio chunk cannot be reduced below max file size.")
+    def run():
+        try:
+            result = transcribe(
+                request,
+                file_path,
+                metadata,
+                on_segment=lambda text: events.put({"delta": text}),
+            )
+            events.put({**result, "filename": os.path.basename(file_path)})
+        except Exception as e:
+            log.exception(e)
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            events.put({"error": {"detail": detail}})
+        finally:
+            events.put(None)
 
-        chunks.append(chunk_path)
-        start = end
-        i += 1
+    threading.Thread(target=run, daemon=True).start()
 
-    return chunks
+    while (event := events.get()) is not None:
+        yield f"data: {json.dumps(event)}\n\n"
 
 
 @router.post("/transcriptions")
@@ -939,6 +1337,7 @@ def transcription(
     request: Request,
     file: UploadFile = File(...),
     language: Optional[str] = Form(None),
+    stream: bool = Form(False),
     user=Depends(get_verified_user),
 ):
     log.info(f"file.content_type: {file.content_type}")
@@ -981,6 +1380,12 @@ def transcription(
             if language:
                 metadata = {"language": language}
 
+            if stream:
+                return StreamingResponse(
+                    stream_transcription(request, file_path, metadata),
+                    media_type="text/event-stream",
+                )
+
             result = transcribe(request, file_path, metadata)
 
             return {
@@ -988,6 +1393,8 @@ def transcription(
                 "filename": os.path.basename(file_path),
             }
 
+        except HTTPException:
+            raise
         except Exception as e:
             log.exception(e)
 
@@ -996,6 +1403,8 @@ def transcription(
                 detail=ERROR_MESSAGES.DEFAULT(e),
             )
 
+    except HTTPException:
+        raise
     except Exception as e:
         log.exception(e)
 
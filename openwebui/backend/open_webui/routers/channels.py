@@ -232,7 +232,11 @@ async def send_notification(name, webui_url, channel, message, active_user_ids):
 async def model_response_handler(request, channel, message, user):
     MODELS = {
         model["id"]: model
-        for model in get_filtered_models(await get_all_models(request, user=user), user)
+        for model in get_filtered_models(
+            await get_all_models(request, user=user),
+            user,
+            request.app.state.MODELS_ACCESS,
+        )
     }
 
     mentions = extract_mentions(message.content)
@@ -4,6 +4,7 @@ from pydantic import BaseModel, ConfigDict
 from typing import Optional
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.cache import bump_cache_versions
 from open_webui.config import get_config, save_config
 from open_webui.config import BannerModel
 
@@ -73,6 +74,8 @@ async def set_connections_config(
         form_data.ENABLE_BASE_MODELS_CACHE
     )
 
+    await bump_cache_versions(request.app, "connections")
+
     return {
         "ENABLE_DIRECT_CONNECTIONS": request.app.state.config.ENABLE_DIRECT_CONNECTIONS,
         "ENABLE_BASE_MODELS_CACHE": request.app.state.config.ENABLE_BASE_MODELS_CACHE,
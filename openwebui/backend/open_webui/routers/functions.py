@@ -16,8 +16,10 @@ from open_webui.models.functions import (
 from open_webui.utils.plugin import (
     load_function_module_by_id,
     replace_imports,
+    get_content_hash,
     get_function_module_from_cache,
 )
+from open_webui.utils.cache import bump_cache_versions
 from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
 from fastapi import APIRouter, Depends, HTTPException, Request, status
@@ -146,6 +148,7 @@ async def sync_functions(
             function_module, function_type, frontmatter = load_function_module_by_id(
                 function.id,
                 content=function.content,
+                app=request.app,
             )
 
             if hasattr(function_module, "Valves") and function.valves:
@@ -160,7 +163,9 @@ async def sync_functions(
                     )
                     raise e
 
-        return Functions.sync_functions(user.id, form_data.functions)
+        functions = Functions.sync_functions(user.id, form_data.functions)
+        await bump_cache_versions(request.app, "functions")
+        return functions
     except Exception as e:
         log.exception(f"Failed to load a function: {e}")
         raise HTTPException(
@@ -193,11 +198,15 @@ async def create_new_function(
             function_module, function_type, frontmatter = load_function_module_by_id(
                 form_data.id,
                 content=form_data.content,
+                app=request.app,
             )
             form_data.meta.manifest = frontmatter
 
             FUNCTIONS = request.app.state.FUNCTIONS
             FUNCTIONS[form_data.id] = function_module
+            request.app.state.FUNCTION_HASHES[form_data.id] = get_content_hash(
+                form_data.content
+            )
 
             function = Functions.insert_new_function(user.id, function_type, form_data)
 
@@ -208,6 +217,7 @@ async def create_new_function(
                 Functions.update_function_metadata_by_id(id, {"toggle": True})
 
             if function:
+                await bump_cache_versions(request.app, "functions")
                 return function
             else:
                 raise HTTPException(
@@ -251,7 +261,9 @@ async def get_function_by_id(id: str, user=Depends(get_admin_user)):
 
 
 @router.post("/id/{id}/toggle", response_model=Optional[FunctionModel])
-async def toggle_function_by_id(id: str, user=Depends(get_admin_user)):
+async def toggle_function_by_id(
+    request: Request, id: str, user=Depends(get_admin_user)
+):
     function = Functions.get_function_by_id(id)
     if function:
         function = Functions.update_function_by_id(
@@ -259,6 +271,7 @@ async def toggle_function_by_id(id: str, user=Depends(get_admin_user)):
         )
 
         if function:
+            await bump_cache_versions(request.app, "functions")
             return function
         else:
             raise HTTPException(
@@ -278,7 +291,7 @@ async def toggle_function_by_id(id: str, user=Depends(get_admin_user)):
 
 
 @router.post("/id/{id}/toggle/global", response_model=Optional[FunctionModel])
-async def toggle_global_by_id(id: str, user=Depends(get_admin_user)):
+async def toggle_global_by_id(request: Request, id: str, user=Depends(get_admin_user)):
     function = Functions.get_function_by_id(id)
     if function:
         function = Functions.update_function_by_id(
@@ -286,6 +299,7 @@ async def toggle_global_by_id(id: str, user=Depends(get_admin_user)):
         )
 
         if function:
+            await bump_cache_versions(request.app, "functions")
             return function
         else:
             raise HTTPException(
@@ -311,12 +325,13 @@ async def update_function_by_id(
     try:
         form_data.content = replace_imports(form_data.content)
         function_module, function_type, frontmatter = load_function_module_by_id(
-            id, content=form_data.content
+            id, content=form_data.content, app=request.app
         )
         form_data.meta.manifest = frontmatter
 
         FUNCTIONS = request.app.state.FUNCTIONS
         FUNCTIONS[id] = function_module
+        request.app.state.FUNCTION_HASHES[id] = get_content_hash(form_data.content)
 
         updated = {**form_data.model_dump(exclude={"id"}), "type": function_type}
         log.debug(updated)
@@ -327,6 +342,7 @@ async def update_function_by_id(
             Functions.update_function_metadata_by_id(id, {"toggle": True})
 
         if function:
+            await bump_cache_versions(request.app, "functions")
             return function
         else:
             raise HTTPException(
@@ -357,6 +373,8 @@ async def delete_function_by_id(
         if id in FUNCTIONS:
             del FUNCTIONS[id]
 
+        await bump_cache_versions(request.app, "functions")
+
     return result
 
 
@@ -432,6 +450,7 @@ async def update_function_valves_by_id(
                 form_data = {k: v for k, v in form_data.items() if v is not None}
                 valves = Valves(**form_data)
                 Functions.update_function_valves_by_id(id, valves.model_dump())
+                await bump_cache_versions(request.app, "functions")
                 return valves.model_dump()
             except Exception as e:
                 log.exception(f"Error updating function values by id {id}: {e}")
@@ -517,6 +536,7 @@ async def update_function_user_valves_by_id(
                 Functions.update_user_valves_by_id_and_user_id(
                     id, user.id, user_valves.model_dump()
                 )
+                await bump_cache_versions(request.app, "valves")
                 return user_valves.model_dump()
             except Exception as e:
                 log.exception(f"Error updating function user valves by id {id}: {e}")
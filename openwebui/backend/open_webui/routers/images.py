@@ -5,10 +5,12 @@ import json
 import logging
 import mimetypes
 import re
+import tempfile
 from pathlib import Path
-from typing import Optional
+from typing import Awaitable, BinaryIO, Optional
 
 from urllib.parse import quote
+import aiohttp
 import requests
 from fastapi import (
     APIRouter,
@@ -17,10 +19,15 @@ from fastapi import (
     Request,
     UploadFile,
 )
+from fastapi.concurrency import run_in_threadpool
 
 from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
-from open_webui.env import ENABLE_FORWARD_USER_INFO_HEADERS, SRC_LOG_LEVELS
+from open_webui.env import (
+    AIOHTTP_CLIENT_TIMEOUT,
+    ENABLE_FORWARD_USER_INFO_HEADERS,
+    SRC_LOG_LEVELS,
+)
 from open_webui.routers.files import upload_file_handler
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.images.comfyui import (
@@ -36,6 +43,14 @@ log.setLevel(SRC_LOG_LEVELS["IMAGES"])
 IMAGE_CACHE_DIR = CACHE_DIR / "image" / "generations"
 IMAGE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
+# Generated images are kept in memory up to this size and spooled to disk
+# beyond it, so multi-image generations don't hold every image in memory
+IMAGE_SPOOL_MAX_SIZE = 1024 * 1024
+IMAGE_CHUNK_SIZE = 64 * 1024
+
+# Shared by all image downloads so connections to the provider are reused
+IMAGE_HTTP_SESSION: Optional[aiohttp.ClientSession] = None
+
 
 router = APIRouter()
 
@@ -453,30 +468,85 @@ def load_b64_image_data(b64_str):
         return None, None
 
 
-def load_url_image_data(url, headers=None):
+def load_b64_image_file(b64_str) -> tuple[Optional[BinaryIO], Optional[str]]:
+    """
+    Decode a base64 image into a spooled file, chunk by chunk, so the decoded
+    image does not need to be held in memory next to its encoded form.
+    """
+    if "," in b64_str:
+        header, encoded = b64_str.split(",", 1)
+        mime_type = header.split(";")[0].lstrip("data:")
+    else:
+        mime_type = "image/png"
+        encoded = b64_str
+
+    file = tempfile.SpooledTemporaryFile(max_size=IMAGE_SPOOL_MAX_SIZE)
     try:
-        if headers:
-            r = requests.get(url, headers=headers)
-        else:
-            r = requests.get(url)
+        # Each chunk is a multiple of 4 characters, so it decodes on its own
+        for i in range(0, len(encoded), IMAGE_CHUNK_SIZE):
+            file.write(base64.b64decode(encoded[i : i + IMAGE_CHUNK_SIZE]))
+    except Exception:
+        # The data contains line breaks or other padding, decode it at once
+        file.close()
+        image_data, mime_type = load_b64_image_data(b64_str)
+        if image_data is None:
+            return None, None
+        file = io.BytesIO(image_data)
+
+    file.seek(0)
+    return file, mime_type
+
+
+async def get_image_http_session() -> aiohttp.ClientSession:
+    global IMAGE_HTTP_SESSION
+
+    if IMAGE_HTTP_SESSION is None or IMAGE_HTTP_SESSION.closed:
+        IMAGE_HTTP_SESSION = aiohttp.ClientSession(
+            trust_env=True,
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
+        )
+    return IMAGE_HTTP_SESSION
 
-        r.raise_for_status()
-        if r.headers["content-type"].split("/")[0] == "image":
-            mime_type = r.headers["content-type"]
-            return r.content, mime_type
-        else:
-            log.error("Url does not point to an image.")
-            return None
 
+async def close_image_http_session():
+    global IMAGE_HTTP_SESSION
+
+    if IMAGE_HTTP_SESSION is not None:
+        await IMAGE_HTTP_SESSION.close()
+        IMAGE_HTTP_SESSION = None
+
+
+async def load_url_image_file(
+    url, headers=None
+) -> tuple[Optional[BinaryIO], Optional[str]]:
+    """
+    Stream an image from a url into a spooled file.
+    """
+    try:
+        session = await get_image_http_session()
+        async with session.get(url, headers=headers) as r:
+            r.raise_for_status()
+
+            content_type = r.headers.get("content-type", "")
+            if content_type.split("/")[0] != "image":
+                log.error("Url does not point to an image.")
+                return None, None
+
+            file = tempfile.SpooledTemporaryFile(max_size=IMAGE_SPOOL_MAX_SIZE)
+            async for chunk in r.content.iter_chunked(IMAGE_CHUNK_SIZE):
+                file.write(chunk)
+
+        file.seek(0)
+        return file, content_type
     except Exception as e:
         log.exception(f"Error saving image: {e}")
-        return None
+        return None, None
 
 
 def upload_image(request, image_data, content_type, metadata, user):
     image_format = mimetypes.guess_extension(content_type)
     file = UploadFile(
-        file=io.BytesIO(image_data),
+        file=(image_data if hasattr(image_data, "read") else io.BytesIO(image_data)),
         filename=f"generated-image{image_format}",  # will be converted to a unique ID on upload_file
         headers={
             "content-type": content_type,
@@ -493,6 +563,42 @@ def upload_image(request, image_data, content_type, metadata, user):
     return url
 
 
+async def upload_images(
+    request,
+    image_files: list[Awaitable[tuple[Optional[BinaryIO], Optional[str]]]],
+    metadata,
+    user,
+) -> list[dict]:
+    """
+    Load and store the generated images concurrently, each image goes
+    straight from its spooled file into the storage provider.
+
+    :param image_files: Awaitables returning an image file and its content type
+    :return: The urls of the stored images, in the order of `image_files`
+    """
+
+    async def upload(image_file):
+        file, content_type = await image_file
+        if file is None:
+            raise Exception("Failed to load the generated image")
+
+        try:
+            url = await run_in_threadpool(
+                upload_image, request, file, content_type, metadata, user
+            )
+        finally:
+            file.close()
+        return {"url": url}
+
+    tasks = [asyncio.create_task(upload(image_file)) for image_file in image_files]
+    try:
+        return await asyncio.gather(*tasks)
+    finally:
+        # Drop the remaining images if one of them failed
+        for task in tasks:
+            task.cancel()
+
+
 @router.post("/generations")
 async def image_generations(
     request: Request,
@@ -567,17 +673,19 @@ async def image_generations(
             r.raise_for_status()
             res = r.json()
 
-            images = []
-
-            for image in res["data"]:
-                if image_url := image.get("url", None):
-                    image_data, content_type = load_url_image_data(image_url, headers)
-                else:
-                    image_data, content_type = load_b64_image_data(image["b64_json"])
-
-                url = upload_image(request, image_data, content_type, data, user)
-                images.append({"url": url})
-            return images
+            return await upload_images(
+                request,
+                [
+                    (
+                        load_url_image_file(image_url, headers)
+                        if (image_url := image.get("url", None))
+                        else run_in_threadpool(load_b64_image_file, image["b64_json"])
+                    )
+                    for image in res["data"]
+                ],
+                data,
+                user,
+            )
 
         elif request.app.state.config.IMAGE_GENERATION_ENGINE == "gemini":
             headers = {}
@@ -604,15 +712,15 @@ async def image_generations(
             r.raise_for_status()
             res = r.json()
 
-            images = []
-            for image in res["predictions"]:
-                image_data, content_type = load_b64_image_data(
-                    image["bytesBase64Encoded"]
-                )
-                url = upload_image(request, image_data, content_type, data, user)
-                images.append({"url": url})
-
-            return images
+            return await upload_images(
+                request,
+                [
+                    run_in_threadpool(load_b64_image_file, image["bytesBase64Encoded"])
+                    for image in res["predictions"]
+                ],
+                data,
+                user,
+            )
 
         elif request.app.state.config.IMAGE_GENERATION_ENGINE == "comfyui":
             data = {
@@ -648,25 +756,18 @@ async def image_generations(
             )
             log.debug(f"res: {res}")
 
-            images = []
-
-            for image in res["data"]:
-                headers = None
-                if request.app.state.config.COMFYUI_API_KEY:
-                    headers = {
-                        "Authorization": f"Bearer {request.app.state.config.COMFYUI_API_KEY}"
-                    }
-
-                image_data, content_type = load_url_image_data(image["url"], headers)
-                url = upload_image(
-                    request,
-                    image_data,
-                    content_type,
-                    form_data.model_dump(exclude_none=True),
-                    user,
-                )
-                images.append({"url": url})
-            return images
+            headers = None
+            if request.app.state.config.COMFYUI_API_KEY:
+                headers = {
+                    "Authorization": f"Bearer {request.app.state.config.COMFYUI_API_KEY}"
+                }
+
+            return await upload_images(
+                request,
+                [load_url_image_file(image["url"], headers) for image in res["data"]],
+                form_data.model_dump(exclude_none=True),
+                user,
+            )
         elif (
             request.app.state.config.IMAGE_GENERATION_ENGINE == "automatic1111"
             or request.app.state.config.IMAGE_GENERATION_ENGINE == ""
@@ -707,19 +808,15 @@ async def image_generations(
             res = r.json()
             log.debug(f"res: {res}")
 
-            images = []
-
-            for image in res["images"]:
-                image_data, content_type = load_b64_image_data(image)
-                url = upload_image(
-                    request,
-                    image_data,
-                    content_type,
-                    {**data, "info": res["info"]},
-                    user,
-                )
-                images.append({"url": url})
-            return images
+            return await upload_images(
+                request,
+                [
+                    run_in_threadpool(load_b64_image_file, image)
+                    for image in res["images"]
+                ],
+                {**data, "info": res["info"]},
+                user,
+            )
     except Exception as e:
         error = e
         if r != None:
@@ -10,7 +10,10 @@ from open_webui.models.knowledge import (
     KnowledgeUserResponse,
 )
 from open_webui.models.files import Files, FileModel, FileMetadataResponse
-from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.vector.factory import (
+    ASYNC_VECTOR_DB_CLIENT,
+    VECTOR_DB_CLIENT,
+)
 from open_webui.routers.retrieval import (
     process_file,
     ProcessFileForm,
@@ -22,6 +25,7 @@ from open_webui.storage.provider import Storage
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.utils.auth import get_verified_user
 from open_webui.utils.access_control import has_access, has_permission
+from open_webui.utils.cache import bump_cache_versions
 
 
 from open_webui.env import SRC_LOG_LEVELS
@@ -473,12 +477,8 @@ def update_file_from_knowledge_by_id(
             detail=ERROR_MESSAGES.NOT_FOUND,
         )
 
-    # Remove content from the vector database
-    VECTOR_DB_CLIENT.delete(
-        collection_name=knowledge.id, filter={"file_id": form_data.file_id}
-    )
-
-    # Add content to the vector database
+    # Replace the file's content in the vector database, only its changed
+    # chunks are embedded again
     try:
         process_file(
             request,
@@ -608,7 +608,9 @@ def remove_file_from_knowledge_by_id(
 
 
 @router.delete("/{id}/delete", response_model=bool)
-async def delete_knowledge_by_id(id: str, user=Depends(get_verified_user)):
+async def delete_knowledge_by_id(
+    request: Request, id: str, user=Depends(get_verified_user)
+):
     knowledge = Knowledges.get_knowledge_by_id(id=id)
     if not knowledge:
         raise HTTPException(
@@ -633,6 +635,7 @@ async def delete_knowledge_by_id(id: str, user=Depends(get_verified_user)):
     log.info(f"Found {len(models)} models to check for knowledge base {id}")
 
     # Update models that reference this knowledge base
+    models_updated = False
     for model in models:
         if model.meta and hasattr(model.meta, "knowledge"):
             knowledge_list = model.meta.knowledge or []
@@ -654,10 +657,14 @@ async def delete_knowledge_by_id(id: str, user=Depends(get_verified_user)):
                     is_active=model.is_active,
                 )
                 Models.update_model_by_id(model.id, model_form)
+                models_updated = True
+
+    if models_updated:
+        await bump_cache_versions(request.app, "models")
 
     # Clean up vector DB
     try:
-        VECTOR_DB_CLIENT.delete_collection(collection_name=id)
+        await ASYNC_VECTOR_DB_CLIENT.delete_collection(collection_name=id)
     except Exception as e:
         log.debug(e)
         pass
@@ -690,7 +697,7 @@ async def reset_knowledge_by_id(id: str, user=Depends(get_verified_user)):
         )
 
     try:
-        VECTOR_DB_CLIENT.delete_collection(collection_name=id)
+        await ASYNC_VECTOR_DB_CLIENT.delete_collection(collection_name=id)
     except Exception as e:
         log.debug(e)
         pass
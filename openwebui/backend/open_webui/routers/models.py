@@ -18,6 +18,7 @@ from fastapi.responses import FileResponse, StreamingResponse
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_access, has_permission
+from open_webui.utils.cache import bump_cache_versions
 from open_webui.config import BYPASS_ADMIN_ACCESS_CONTROL, STATIC_DIR
 
 router = APIRouter()
@@ -75,6 +76,7 @@ async def create_new_model(
     else:
         model = Models.insert_new_model(form_data, user.id)
         if model:
+            await bump_cache_versions(request.app, "models")
             return model
         else:
             raise HTTPException(
@@ -106,7 +108,9 @@ class SyncModelsForm(BaseModel):
 async def sync_models(
     request: Request, form_data: SyncModelsForm, user=Depends(get_admin_user)
 ):
-    return Models.sync_models(user.id, form_data.models)
+    models = Models.sync_models(user.id, form_data.models)
+    await bump_cache_versions(request.app, "models")
+    return models
 
 
 ###########################
@@ -171,7 +175,9 @@ async def get_model_profile_image(id: str, user=Depends(get_verified_user)):
 
 
 @router.post("/model/toggle", response_model=Optional[ModelResponse])
-async def toggle_model_by_id(id: str, user=Depends(get_verified_user)):
+async def toggle_model_by_id(
+    request: Request, id: str, user=Depends(get_verified_user)
+):
     model = Models.get_model_by_id(id)
     if model:
         if (
@@ -182,6 +188,7 @@ async def toggle_model_by_id(id: str, user=Depends(get_verified_user)):
             model = Models.toggle_model_by_id(id)
 
             if model:
+                await bump_cache_versions(request.app, "models")
                 return model
             else:
                 raise HTTPException(
@@ -207,6 +214,7 @@ async def toggle_model_by_id(id: str, user=Depends(get_verified_user)):
 
 @router.post("/model/update", response_model=Optional[ModelModel])
 async def update_model_by_id(
+    request: Request,
     id: str,
     form_data: ModelForm,
     user=Depends(get_verified_user),
@@ -230,6 +238,7 @@ async def update_model_by_id(
         )
 
     model = Models.update_model_by_id(id, form_data)
+    await bump_cache_versions(request.app, "models")
     return model
 
 
@@ -239,7 +248,9 @@ async def update_model_by_id(
 
 
 @router.delete("/model/delete", response_model=bool)
-async def delete_model_by_id(id: str, user=Depends(get_verified_user)):
+async def delete_model_by_id(
+    request: Request, id: str, user=Depends(get_verified_user)
+):
     model = Models.get_model_by_id(id)
     if not model:
         raise HTTPException(
@@ -258,10 +269,12 @@ async def delete_model_by_id(id: str, user=Depends(get_verified_user)):
         )
 
     result = Models.delete_model_by_id(id)
+    await bump_cache_versions(request.app, "models")
     return result
 
 
 @router.delete("/delete/all", response_model=bool)
-async def delete_all_models(user=Depends(get_admin_user)):
+async def delete_all_models(request: Request, user=Depends(get_admin_user)):
     result = Models.delete_all_models()
+    await bump_cache_versions(request.app, "models")
     return result
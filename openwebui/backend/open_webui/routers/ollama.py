@@ -1,12 +1,7 @@
-# TODO: Implement a more intelligent load balancing mechanism for distributing requests among multiple backend instances.
-# Current implementation uses a simple round-robin approach (random.choice). Consider incorporating algorithms like weighted round-robin,
-# least connections, or least response time for better resource utilization and performance optimization.
-
 import asyncio
 import json
 import logging
 import os
-import random
 import re
 import time
 from datetime import datetime
@@ -14,7 +9,6 @@ from datetime import datetime
 from typing import Optional, Union
 from urllib.parse import urlparse
 import aiohttp
-from aiocache import cached
 import requests
 from urllib.parse import quote
 
@@ -51,6 +45,8 @@ from open_webui.utils.payload import (
 )
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_access
+from open_webui.utils.cache import SharedCache, bump_cache_versions
+from open_webui.utils.balancer import LoadBalancer
 
 
 from open_webui.config import (
@@ -60,10 +56,16 @@ from open_webui.env import (
     ENV,
     SRC_LOG_LEVELS,
     MODELS_CACHE_TTL,
+    MODELS_CACHE_STALE_TTL,
+    MODELS_CACHE_MAX_SIZE,
     AIOHTTP_CLIENT_SESSION_SSL,
     AIOHTTP_CLIENT_TIMEOUT,
     AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST,
     BYPASS_MODEL_ACCESS_CONTROL,
+    OLLAMA_LOAD_BALANCING_STRATEGY,
+    ENABLE_OLLAMA_RESIDENCY_ROUTING,
+    OLLAMA_CIRCUIT_BREAKER_FAILURES,
+    OLLAMA_CIRCUIT_BREAKER_COOLDOWN,
 )
 from open_webui.constants import ERROR_MESSAGES
 
@@ -71,6 +73,16 @@ log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["OLLAMA"])
 
 
+# Distributes the requests for a model among the Ollama backends serving it
+OLLAMA_BALANCER = LoadBalancer(
+    strategy=OLLAMA_LOAD_BALANCING_STRATEGY,
+    residency_routing=ENABLE_OLLAMA_RESIDENCY_ROUTING,
+    failure_threshold=OLLAMA_CIRCUIT_BREAKER_FAILURES,
+    cooldown=OLLAMA_CIRCUIT_BREAKER_COOLDOWN,
+    lease_timeout=AIOHTTP_CLIENT_TIMEOUT,
+)
+
+
 ##########################################
 #
 # Utility functions
@@ -125,9 +137,26 @@ async def send_post_request(
     content_type: Optional[str] = None,
     user: UserModel = None,
     metadata: Optional[dict] = None,
+    url_idx: Optional[int] = None,
 ):
 
     r = None
+    session = None
+    streaming = False
+
+    # Track the request on its backend until the response is fully read
+    lease_id = OLLAMA_BALANCER.acquire(url_idx) if url_idx is not None else None
+
+    def release_backend():
+        if lease_id is not None:
+            OLLAMA_BALANCER.release(
+                url_idx, lease_id, failed=r is None or r.status >= 500
+            )
+
+    async def cleanup():
+        await cleanup_response(r, session)
+        release_backend()
+
     try:
         session = aiohttp.ClientSession(
             trust_env=True, timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
@@ -180,13 +209,12 @@ async def send_post_request(
             if content_type:
                 response_headers["Content-Type"] = content_type
 
+            streaming = True
             return StreamingResponse(
                 r.content,
                 status_code=r.status,
                 headers=response_headers,
-                background=BackgroundTask(
-                    cleanup_response, response=r, session=session
-                ),
+                background=BackgroundTask(cleanup),
             )
         else:
             res = await r.json()
@@ -202,8 +230,10 @@ async def send_post_request(
             detail=detail if e else "Open WebUI: Server Connection Error",
         )
     finally:
-        if not stream:
+        # A streamed response is cleaned up once it has been sent
+        if not streaming:
             await cleanup_response(r, session)
+            release_backend()
 
 
 def get_api_key(idx, url, configs):
@@ -214,6 +244,29 @@ def get_api_key(idx, url, configs):
     )  # Legacy support
 
 
+def get_ollama_url_idx(request: Request, model: str, load: bool = True) -> int:
+    """
+    Choose the backend serving the model for a request. With `load`, the
+    request loads the model on the chosen backend.
+    """
+    urls = request.app.state.OLLAMA_MODELS[model].get("urls", [])
+
+    configs = request.app.state.config.OLLAMA_API_CONFIGS
+    weights = {}
+    for idx in urls:
+        url = request.app.state.config.OLLAMA_BASE_URLS[idx]
+        api_config = configs.get(str(idx), configs.get(url, {}))  # Legacy support
+        try:
+            weights[idx] = float(api_config.get("weight", 1))
+        except (TypeError, ValueError):
+            weights[idx] = 1
+
+    url_idx = OLLAMA_BALANCER.choose(model, urls, weights)
+    if load:
+        OLLAMA_BALANCER.mark_resident(model, url_idx)
+    return url_idx
+
+
 ##########################################
 #
 # API routes
@@ -316,6 +369,8 @@ async def update_config(
         if key in keys
     }
 
+    await bump_cache_versions(request.app, "connections")
+
     return {
         "ENABLE_OLLAMA_API": request.app.state.config.ENABLE_OLLAMA_API,
         "OLLAMA_BASE_URLS": request.app.state.config.OLLAMA_BASE_URLS,
@@ -340,12 +395,44 @@ def merge_ollama_models_lists(model_lists):
     return list(merged_models.values())
 
 
-@cached(
+# Upstream model lists, shared by every user as access is filtered on top
+OLLAMA_MODELS_CACHE = SharedCache(
+    "ollama_models",
     ttl=MODELS_CACHE_TTL,
-    key=lambda _, user: f"ollama_all_models_{user.id}" if user else "ollama_all_models",
+    stale_ttl=MODELS_CACHE_STALE_TTL,
+    caches=("connections",),
+    max_size=MODELS_CACHE_MAX_SIZE,
 )
+
+
+async def fetch_shared_models(app):
+    # Scheduled refreshes of the list shared by every user only hold the app
+    return await fetch_all_models(Request({"type": "http", "app": app}), user=None)
+
+
 async def get_all_models(request: Request, user: UserModel = None):
-    log.info("get_all_models()")
+    # Upstream lists can only differ per user when user info is forwarded,
+    # those are only refreshed when the user asks for them
+    if ENABLE_FORWARD_USER_INFO_HEADERS and user:
+        models = await OLLAMA_MODELS_CACHE.get(
+            request.app, user.id, lambda: fetch_all_models(request, user=user)
+        )
+    else:
+        models = await OLLAMA_MODELS_CACHE.get(
+            request.app,
+            "all",
+            lambda: fetch_all_models(request, user=None),
+            scheduled_fetch=fetch_shared_models,
+        )
+
+    request.app.state.OLLAMA_MODELS = {
+        model["model"]: model for model in models["models"]
+    }
+    return models
+
+
+async def fetch_all_models(request: Request, user: UserModel = None):
+    log.info("fetch_all_models()")
     if request.app.state.config.ENABLE_OLLAMA_API:
         request_tasks = []
         for idx, url in enumerate(request.app.state.config.OLLAMA_BASE_URLS):
@@ -435,9 +522,6 @@ async def get_all_models(request: Request, user: UserModel = None):
     else:
         models = {"models": []}
 
-    request.app.state.OLLAMA_MODELS = {
-        model["model"]: model for model in models["models"]
-    }
     return models
 
 
@@ -507,7 +591,7 @@ async def get_ollama_tags(
             )
 
     if user.role == "user" and not BYPASS_MODEL_ACCESS_CONTROL:
-        models["models"] = await get_filtered_models(models, user)
+        models = {**models, "models": await get_filtered_models(models, user)}
 
     return models
 
@@ -544,6 +628,8 @@ async def get_ollama_loaded_models(request: Request, user=Depends(get_admin_user
 
         responses = await asyncio.gather(*request_tasks)
 
+        residency = {}
+
         for idx, response in enumerate(responses):
             if response:
                 url = request.app.state.config.OLLAMA_BASE_URLS[idx]
@@ -560,6 +646,17 @@ async def get_ollama_loaded_models(request: Request, user=Depends(get_admin_user
                     if prefix_id:
                         model["model"] = f"{prefix_id}.{model['model']}"
 
+                    # Route the requests for loaded models to the nodes holding them
+                    try:
+                        expires_at = datetime.fromisoformat(
+                            model["expires_at"]
+                        ).timestamp()
+                    except Exception:
+                        expires_at = time.time() + 300
+                    residency.setdefault(model["model"], {})[idx] = expires_at
+
+        OLLAMA_BALANCER.set_residency(residency)
+
         models = {
             "models": merge_ollama_models_lists(
                 map(
@@ -967,11 +1064,13 @@ async def show_model_info(
             detail=ERROR_MESSAGES.MODEL_NOT_FOUND(model),
         )
 
-    url_idx = random.choice(models[model]["urls"])
+    url_idx = get_ollama_url_idx(request, model, load=False)
 
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     key = get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS)
 
+    r = None
+    lease_id = OLLAMA_BALANCER.acquire(url_idx)
     try:
         r = requests.request(
             method="POST",
@@ -1011,6 +1110,10 @@ async def show_model_info(
             status_code=r.status_code if r else 500,
             detail=detail if detail else "Open WebUI: Server Connection Error",
         )
+    finally:
+        OLLAMA_BALANCER.release(
+            url_idx, lease_id, failed=r is None or r.status_code >= 500
+        )
 
 
 class GenerateEmbedForm(BaseModel):
@@ -1041,7 +1144,7 @@ async def embed(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = get_ollama_url_idx(request, model)
         else:
             raise HTTPException(
                 status_code=400,
@@ -1059,6 +1162,8 @@ async def embed(
     if prefix_id:
         form_data.model = form_data.model.replace(f"{prefix_id}.", "")
 
+    r = None
+    lease_id = OLLAMA_BALANCER.acquire(url_idx)
     try:
         r = requests.request(
             method="POST",
@@ -1099,6 +1204,10 @@ async def embed(
             status_code=r.status_code if r else 500,
             detail=detail if detail else "Open WebUI: Server Connection Error",
         )
+    finally:
+        OLLAMA_BALANCER.release(
+            url_idx, lease_id, failed=r is None or r.status_code >= 500
+        )
 
 
 class GenerateEmbeddingsForm(BaseModel):
@@ -1128,7 +1237,7 @@ async def embeddings(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = get_ollama_url_idx(request, model)
         else:
             raise HTTPException(
                 status_code=400,
@@ -1146,6 +1255,8 @@ async def embeddings(
     if prefix_id:
         form_data.model = form_data.model.replace(f"{prefix_id}.", "")
 
+    r = None
+    lease_id = OLLAMA_BALANCER.acquire(url_idx)
     try:
         r = requests.request(
             method="POST",
@@ -1186,6 +1297,10 @@ async def embeddings(
             status_code=r.status_code if r else 500,
             detail=detail if detail else "Open WebUI: Server Connection Error",
         )
+    finally:
+        OLLAMA_BALANCER.release(
+            url_idx, lease_id, failed=r is None or r.status_code >= 500
+        )
 
 
 class GenerateCompletionForm(BaseModel):
@@ -1221,7 +1336,7 @@ async def generate_completion(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = get_ollama_url_idx(request, model)
         else:
             raise HTTPException(
                 status_code=400,
@@ -1243,6 +1358,7 @@ async def generate_completion(
         payload=form_data.model_dump_json(exclude_none=True).encode(),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
+        url_idx=url_idx,
     )
 
 
@@ -1288,7 +1404,7 @@ async def get_ollama_url(request: Request, model: str, url_idx: Optional[int] =
                 status_code=400,
                 detail=ERROR_MESSAGES.MODEL_NOT_FOUND(model),
             )
-        url_idx = random.choice(models[model].get("urls", []))
+        url_idx = get_ollama_url_idx(request, model)
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     return url, url_idx
 
@@ -1376,6 +1492,7 @@ async def generate_chat_completion(
         content_type="application/x-ndjson",
         user=user,
         metadata=metadata,
+        url_idx=url_idx,
     )
 
 
@@ -1482,6 +1599,7 @@ async def generate_openai_completion(
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
         metadata=metadata,
+        url_idx=url_idx,
     )
 
 
@@ -1564,6 +1682,7 @@ async def generate_openai_chat_completion(
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
         metadata=metadata,
+        url_idx=url_idx,
     )
 
 
@@ -5,7 +5,6 @@ import logging
 from typing import Optional
 
 import aiohttp
-from aiocache import cached
 import requests
 from urllib.parse import quote
 
@@ -27,6 +26,8 @@ from open_webui.config import (
 )
 from open_webui.env import (
     MODELS_CACHE_TTL,
+    MODELS_CACHE_STALE_TTL,
+    MODELS_CACHE_MAX_SIZE,
     AIOHTTP_CLIENT_SESSION_SSL,
     AIOHTTP_CLIENT_TIMEOUT,
     AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST,
@@ -49,6 +50,7 @@ from open_webui.utils.misc import (
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_access
+from open_webui.utils.cache import SharedCache, bump_cache_versions
 
 
 log = logging.getLogger(__name__)
@@ -270,6 +272,8 @@ async def update_config(
         if key in keys
     }
 
+    await bump_cache_versions(request.app, "connections")
+
     return {
         "ENABLE_OPENAI_API": request.app.state.config.ENABLE_OPENAI_API,
         "OPENAI_API_BASE_URLS": request.app.state.config.OPENAI_API_BASE_URLS,
@@ -479,12 +483,42 @@ async def get_filtered_models(models, user):
     return filtered_models
 
 
-@cached(
+# Upstream model lists, shared by every user as access is filtered on top
+OPENAI_MODELS_CACHE = SharedCache(
+    "openai_models",
     ttl=MODELS_CACHE_TTL,
-    key=lambda _, user: f"openai_all_models_{user.id}" if user else "openai_all_models",
+    stale_ttl=MODELS_CACHE_STALE_TTL,
+    caches=("connections",),
+    max_size=MODELS_CACHE_MAX_SIZE,
 )
+
+
+async def fetch_shared_models(app):
+    # Scheduled refreshes of the list shared by every user only hold the app
+    return await fetch_all_models(Request({"type": "http", "app": app}), user=None)
+
+
 async def get_all_models(request: Request, user: UserModel) -> dict[str, list]:
-    log.info("get_all_models()")
+    # Upstream lists can only differ per user when user info is forwarded,
+    # those are only refreshed when the user asks for them
+    if ENABLE_FORWARD_USER_INFO_HEADERS and user:
+        models = await OPENAI_MODELS_CACHE.get(
+            request.app, user.id, lambda: fetch_all_models(request, user=user)
+        )
+    else:
+        models = await OPENAI_MODELS_CACHE.get(
+            request.app,
+            "all",
+            lambda: fetch_all_models(request, user=None),
+            scheduled_fetch=fetch_shared_models,
+        )
+
+    request.app.state.OPENAI_MODELS = {model["id"]: model for model in models["data"]}
+    return models
+
+
+async def fetch_all_models(request: Request, user: UserModel) -> dict[str, list]:
+    log.info("fetch_all_models()")
 
     if not request.app.state.config.ENABLE_OPENAI_API:
         return {"data": []}
@@ -540,7 +574,6 @@ async def get_all_models(request: Request, user: UserModel) -> dict[str, list]:
     models = {"data": merge_models_lists(map(extract_data, responses))}
     log.debug(f"models: {models}")
 
-    request.app.state.OPENAI_MODELS = {model["id"]: model for model in models["data"]}
     return models
 
 
@@ -628,7 +661,7 @@ async def get_models(
                 raise HTTPException(status_code=500, detail=error_detail)
 
     if user.role == "user" and not BYPASS_MODEL_ACCESS_CONTROL:
-        models["data"] = await get_filtered_models(models, user)
+        models = {**models, "data": await get_filtered_models(models, user)}
 
     return models
 
@@ -13,12 +13,17 @@ import aiohttp
 import os
 import logging
 import shutil
+import time
 import requests
 from pydantic import BaseModel
 from starlette.responses import FileResponse
 from typing import Optional
 
-from open_webui.env import SRC_LOG_LEVELS, AIOHTTP_CLIENT_SESSION_SSL
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    AIOHTTP_CLIENT_SESSION_SSL,
+    AIOHTTP_CLIENT_TIMEOUT,
+)
 from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
 
@@ -38,132 +43,215 @@ log.setLevel(SRC_LOG_LEVELS["MAIN"])
 ##################################
 
 
+# Filters of the last models dict seen, sorted by priority, along with the
+# filter chain of each model. Rebuilt whenever the models dict is replaced.
+PIPELINE_FILTERS_INDEX = {"models": None, "filters": [], "chains": {}}
+
+# Shared by all filter calls so connections to the pipelines servers are kept
+# alive between chat requests
+PIPELINES_HTTP_SESSION: Optional[aiohttp.ClientSession] = None
+
+# Pipelines servers without the batch filter endpoint, by url, with the time
+# the endpoint was found missing. They are probed again after an hour.
+PIPELINES_BATCH_UNSUPPORTED: dict[str, float] = {}
+PIPELINES_BATCH_RETRY_INTERVAL = 3600
+
+
 def get_sorted_filters(model_id, models):
-    filters = [
-        model
-        for model in models.values()
-        if "pipeline" in model
-        and "type" in model["pipeline"]
-        and model["pipeline"]["type"] == "filter"
-        and (
-            model["pipeline"]["pipelines"] == ["*"]
-            or any(
-                model_id == target_model_id
-                for target_model_id in model["pipeline"]["pipelines"]
-            )
+    global PIPELINE_FILTERS_INDEX
+
+    index = PIPELINE_FILTERS_INDEX
+    if index["models"] is not models:
+        filters = [
+            model
+            for model in models.values()
+            if "pipeline" in model
+            and "type" in model["pipeline"]
+            and model["pipeline"]["type"] == "filter"
+        ]
+        index = {
+            "models": models,
+            "filters": sorted(filters, key=lambda x: x["pipeline"]["priority"]),
+            "chains": {},
+        }
+        PIPELINE_FILTERS_INDEX = index
+
+    chain = index["chains"].get(model_id)
+    if chain is None:
+        chain = [
+            filter
+            for filter in index["filters"]
+            if filter["pipeline"]["pipelines"] == ["*"]
+            or model_id in filter["pipeline"]["pipelines"]
+        ]
+        index["chains"][model_id] = chain
+
+    return list(chain)
+
+
+async def get_pipelines_session() -> aiohttp.ClientSession:
+    global PIPELINES_HTTP_SESSION
+
+    if PIPELINES_HTTP_SESSION is None or PIPELINES_HTTP_SESSION.closed:
+        PIPELINES_HTTP_SESSION = aiohttp.ClientSession(
+            trust_env=True,
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
         )
-    ]
-    sorted_filters = sorted(filters, key=lambda x: x["pipeline"]["priority"])
-    return sorted_filters
+    return PIPELINES_HTTP_SESSION
 
 
-async def process_pipeline_inlet_filter(request, payload, user, models):
+async def close_pipelines_session():
+    global PIPELINES_HTTP_SESSION
+
+    if PIPELINES_HTTP_SESSION is not None:
+        await PIPELINES_HTTP_SESSION.close()
+        PIPELINES_HTTP_SESSION = None
+
+
+class PipelinesBatchNotSupportedError(Exception):
+    pass
+
+
+def is_pipelines_batch_supported(url) -> bool:
+    unsupported_at = PIPELINES_BATCH_UNSUPPORTED.get(url)
+    return (
+        unsupported_at is None
+        or time.time() - unsupported_at > PIPELINES_BATCH_RETRY_INTERVAL
+    )
+
+
+async def post_pipeline_filter(
+    session, url, key, filter_ids, filter_type, request_data
+):
+    """
+    Apply a single filter, or a chain of filters of the same pipelines server
+    through its batch endpoint. Returns the filtered body, or None when the
+    filter could not be applied.
+    """
+    if len(filter_ids) == 1:
+        endpoint = f"{url}/{filter_ids[0]}/filter/{filter_type}"
+    else:
+        endpoint = f"{url}/filter/{filter_type}/batch"
+        request_data = {**request_data, "filters": filter_ids}
+
+    try:
+        async with session.post(
+            endpoint,
+            headers={"Authorization": f"Bearer {key}"},
+            json=request_data,
+            ssl=AIOHTTP_CLIENT_SESSION_SSL,
+        ) as response:
+            if len(filter_ids) > 1 and response.status in (404, 405):
+                raise PipelinesBatchNotSupportedError()
+
+            if response.ok:
+                return await response.json()
+
+            status = response.status
+            res = (
+                await response.json()
+                if "application/json" in response.content_type
+                else {}
+            )
+    except PipelinesBatchNotSupportedError:
+        raise
+    except Exception as e:
+        log.exception(f"Connection error: {e}")
+        return None
+
+    # Inlet filters may reject the request, outlet filter errors are ignored
+    if filter_type == "inlet" and "detail" in res:
+        raise Exception(status, res["detail"])
+    return None
+
+
+async def process_pipeline_filters(request, payload, user, sorted_filters, filter_type):
     user = {"id": user.id, "email": user.email, "name": user.name, "role": user.role}
-    model_id = payload["model"]
-    sorted_filters = get_sorted_filters(model_id, models)
-    model = models[model_id]
 
-    if "pipeline" in model:
-        sorted_filters.append(model)
+    # Group consecutive filters of the same pipelines server, so that servers
+    # supporting it can apply them in one round trip
+    groups = []
+    for filter in sorted_filters:
+        urlIdx = filter.get("urlIdx")
 
-    async with aiohttp.ClientSession(trust_env=True) as session:
-        for filter in sorted_filters:
-            urlIdx = filter.get("urlIdx")
+        try:
+            urlIdx = int(urlIdx)
+        except:
+            continue
 
-            try:
-                urlIdx = int(urlIdx)
-            except:
-                continue
+        if not request.app.state.config.OPENAI_API_KEYS[urlIdx]:
+            continue
 
-            url = request.app.state.config.OPENAI_API_BASE_URLS[urlIdx]
-            key = request.app.state.config.OPENAI_API_KEYS[urlIdx]
+        if groups and groups[-1][0] == urlIdx:
+            groups[-1][1].append(filter["id"])
+        else:
+            groups.append((urlIdx, [filter["id"]]))
 
-            if not key:
-                continue
+    if not groups:
+        return payload
 
-            headers = {"Authorization": f"Bearer {key}"}
-            request_data = {
-                "user": user,
-                "body": payload,
-            }
+    session = await get_pipelines_session()
+    for urlIdx, filter_ids in groups:
+        url = request.app.state.config.OPENAI_API_BASE_URLS[urlIdx]
+        key = request.app.state.config.OPENAI_API_KEYS[urlIdx]
 
+        if len(filter_ids) > 1 and is_pipelines_batch_supported(url):
             try:
-                async with session.post(
-                    f"{url}/{filter['id']}/filter/inlet",
-                    headers=headers,
-                    json=request_data,
-                    ssl=AIOHTTP_CLIENT_SESSION_SSL,
-                ) as response:
-                    payload = await response.json()
-                    response.raise_for_status()
-            except aiohttp.ClientResponseError as e:
-                res = (
-                    await response.json()
-                    if response.content_type == "application/json"
-                    else {}
+                result = await post_pipeline_filter(
+                    session,
+                    url,
+                    key,
+                    filter_ids,
+                    filter_type,
+                    {"user": user, "body": payload},
                 )
-                if "detail" in res:
-                    raise Exception(response.status, res["detail"])
-            except Exception as e:
-                log.exception(f"Connection error: {e}")
+                PIPELINES_BATCH_UNSUPPORTED.pop(url, None)
+                if result is not None:
+                    payload = result
+                continue
+            except PipelinesBatchNotSupportedError:
+                log.debug(f"Pipelines server {url} does not support batch filters")
+                PIPELINES_BATCH_UNSUPPORTED[url] = time.time()
+
+        for filter_id in filter_ids:
+            result = await post_pipeline_filter(
+                session,
+                url,
+                key,
+                [filter_id],
+                filter_type,
+                {"user": user, "body": payload},
+            )
+            if result is not None:
+                payload = result
 
     return payload
 
 
-async def process_pipeline_outlet_filter(request, payload, user, models):
-    user = {"id": user.id, "email": user.email, "name": user.name, "role": user.role}
+async def process_pipeline_inlet_filter(request, payload, user, models):
     model_id = payload["model"]
     sorted_filters = get_sorted_filters(model_id, models)
     model = models[model_id]
 
     if "pipeline" in model:
-        sorted_filters = [model] + sorted_filters
-
-    async with aiohttp.ClientSession(trust_env=True) as session:
-        for filter in sorted_filters:
-            urlIdx = filter.get("urlIdx")
-
-            try:
-                urlIdx = int(urlIdx)
-            except:
-                continue
+        sorted_filters.append(model)
 
-            url = request.app.state.config.OPENAI_API_BASE_URLS[urlIdx]
-            key = request.app.state.config.OPENAI_API_KEYS[urlIdx]
+    return await process_pipeline_filters(
+        request, payload, user, sorted_filters, "inlet"
+    )
 
-            if not key:
-                continue
 
-            headers = {"Authorization": f"Bearer {key}"}
-            request_data = {
-                "user": user,
-                "body": payload,
-            }
+async def process_pipeline_outlet_filter(request, payload, user, models):
+    model_id = payload["model"]
+    sorted_filters = get_sorted_filters(model_id, models)
+    model = models[model_id]
 
-            try:
-                async with session.post(
-                    f"{url}/{filter['id']}/filter/outlet",
-                    headers=headers,
-                    json=request_data,
-                    ssl=AIOHTTP_CLIENT_SESSION_SSL,
-                ) as response:
-                    payload = await response.json()
-                    response.raise_for_status()
-            except aiohttp.ClientResponseError as e:
-                try:
-                    res = (
-                        await response.json()
-                        if "application/json" in response.content_type
-                        else {}
-                    )
-                    if "detail" in res:
-                        raise Exception(response.status, res)
-                except Exception:
-                    pass
-            except Exception as e:
-                log.exception(f"Connection error: {e}")
+    if "pipeline" in model:
+        sorted_filters = [model] + sorted_filters
 
-    return payload
+    return await process_pipeline_filters(
+        request, payload, user, sorted_filters, "outlet"
+    )
 
 
 ##################################
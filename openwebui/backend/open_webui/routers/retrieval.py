@@ -8,7 +8,7 @@ import asyncio
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Iterator, List, Optional, Sequence, Union
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Union
 
 from fastapi import (
     Depends,
@@ -24,11 +24,8 @@ from fastapi import (
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-import tiktoken
 
 
-from langchain.text_splitter import RecursiveCharacterTextSplitter, TokenTextSplitter
-from langchain_text_splitters import MarkdownHeaderTextSplitter
 from langchain_core.documents import Document
 
 from open_webui.models.files import FileModel, Files
@@ -36,15 +33,21 @@ from open_webui.models.knowledge import Knowledges
 from open_webui.storage.provider import Storage
 
 
-from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.vector.factory import (
+    VECTOR_DB_CLIENT,
+    ASYNC_VECTOR_DB_CLIENT,
+)
 
 # Document loaders
 from open_webui.retrieval.loaders.main import Loader
+from open_webui.retrieval.loaders.parser import DocumentParser
 from open_webui.retrieval.loaders.youtube import YoutubeLoader
+from open_webui.retrieval.pipeline import IngestionPipeline
+from open_webui.retrieval.splitters import SplitterPool, get_text_splitter
 
 # Web search engines
 from open_webui.retrieval.web.main import SearchResult
-from open_webui.retrieval.web.utils import get_web_loader
+from open_webui.retrieval.web.utils import asafe_validate_urls, get_web_loader
 from open_webui.retrieval.web.brave import search_brave
 from open_webui.retrieval.web.kagi import search_kagi
 from open_webui.retrieval.web.mojeek import search_mojeek
@@ -80,6 +83,7 @@ from open_webui.utils.misc import (
     calculate_sha256_string,
 )
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.cache import SharedCache
 
 from open_webui.config import (
     ENV,
@@ -88,6 +92,7 @@ from open_webui.config import (
     RAG_RERANKING_MODEL_AUTO_UPDATE,
     RAG_RERANKING_MODEL_TRUST_REMOTE_CODE,
     UPLOAD_DIR,
+    CACHE_DIR,
     DEFAULT_LOCALE,
     RAG_EMBEDDING_CONTENT_PREFIX,
     RAG_EMBEDDING_QUERY_PREFIX,
@@ -100,6 +105,16 @@ from open_webui.env import (
     SENTENCE_TRANSFORMERS_MODEL_KWARGS,
     SENTENCE_TRANSFORMERS_CROSS_ENCODER_BACKEND,
     SENTENCE_TRANSFORMERS_CROSS_ENCODER_MODEL_KWARGS,
+    WEB_SEARCH_CACHE_TTL,
+    WEB_SEARCH_CACHE_MAX_SIZE,
+    RAG_INGEST_BATCH_SIZE,
+    RAG_INGEST_QUEUE_SIZE,
+    DOCUMENT_PARSER_WORKERS,
+    DOCUMENT_PARSER_TIMEOUT,
+    DOCUMENT_PARSER_MAX_MEMORY_MB,
+    DOCUMENT_PARSER_CACHE_MAX_SIZE_MB,
+    RAG_SPLIT_WORKERS,
+    RAG_SPLIT_PARALLEL_MIN_SIZE,
 )
 
 from open_webui.constants import ERROR_MESSAGES
@@ -107,6 +122,33 @@ from open_webui.constants import ERROR_MESSAGES
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
+
+# Search results shared by every user, by engine, query and search parameters
+WEB_SEARCH_CACHE = SharedCache(
+    "web_search", ttl=WEB_SEARCH_CACHE_TTL, max_size=WEB_SEARCH_CACHE_MAX_SIZE
+)
+
+# Web search collections being built, by collection name and inputs hash
+WEB_SEARCH_COLLECTION_TASKS: dict[str, asyncio.Task] = {}
+
+# Parses uploaded documents out of process and caches them by file hash
+DOCUMENT_PARSER = DocumentParser(
+    cache_dir=CACHE_DIR / "documents",
+    cache_max_size=DOCUMENT_PARSER_CACHE_MAX_SIZE_MB * 1024 * 1024,
+    workers=DOCUMENT_PARSER_WORKERS,
+    timeout=DOCUMENT_PARSER_TIMEOUT,
+    max_memory=DOCUMENT_PARSER_MAX_MEMORY_MB * 1024 * 1024,
+)
+
+# Splits large batches of documents across processes
+SPLITTER_POOL = SplitterPool(
+    workers=RAG_SPLIT_WORKERS, min_size=RAG_SPLIT_PARALLEL_MIN_SIZE
+)
+
+# Chunks of a file looked up when replacing it, within the result window of
+# every vector database. Files with more chunks are replaced as a whole
+REPLACE_QUERY_LIMIT = 10000
+
 ##########################################
 #
 # Utility functions
@@ -1192,16 +1234,52 @@ async def update_rag_config(
 ####################################
 
 
+def get_split_settings(request: Request) -> tuple:
+    return (
+        request.app.state.config.TEXT_SPLITTER,
+        request.app.state.config.CHUNK_SIZE,
+        request.app.state.config.CHUNK_OVERLAP,
+        str(request.app.state.config.TIKTOKEN_ENCODING_NAME),
+    )
+
+
+def get_split_function(request: Request) -> Callable[[list], list[Document]]:
+    """
+    Return the configured text splitter, built once for its settings.
+    """
+    if request.app.state.config.TEXT_SPLITTER == "token":
+        log.info(
+            f"Using token text splitter: {request.app.state.config.TIKTOKEN_ENCODING_NAME}"
+        )
+    elif request.app.state.config.TEXT_SPLITTER == "markdown_header":
+        log.info("Using markdown header text splitter")
+
+    return get_text_splitter(*get_split_settings(request))
+
+
 def save_docs_to_vector_db(
     request: Request,
-    docs,
+    docs: Iterable[Document],
     collection_name,
     metadata: Optional[dict] = None,
     overwrite: bool = False,
     split: bool = True,
     add: bool = False,
     user=None,
+    replace: bool = False,
 ) -> bool:
+    """
+    Split, embed and insert the documents into the collection.
+
+    `docs` may be a generator, the documents are then streamed into the
+    collection while they are loaded.
+
+    With `replace`, the documents replace the chunks of their file
+    (`metadata["file_id"]`) in the collection. Chunks are identified by their
+    content, so the ones that didn't change keep their vectors, only new
+    chunks are embedded and inserted, and the ones gone are deleted.
+    """
+
     def _get_docs_info(docs: list[Document]) -> str:
         docs_info = set()
 
@@ -1218,122 +1296,126 @@ def save_docs_to_vector_db(
 
         return ", ".join(docs_info)
 
-    log.info(
-        f"save_docs_to_vector_db: document {_get_docs_info(docs)} {collection_name}"
-    )
-
-    # Check if entries with the same hash (metadata.hash) already exist
-    if metadata and "hash" in metadata:
+    def _check_duplicate(hash: str):
+        # Check if entries with the same hash (metadata.hash) already exist
         result = VECTOR_DB_CLIENT.query(
             collection_name=collection_name,
-            filter={"hash": metadata["hash"]},
+            filter={"hash": hash},
         )
 
-        if result is not None:
-            existing_doc_ids = result.ids[0]
-            if existing_doc_ids:
-                log.info(f"Document with hash {metadata['hash']} already exists")
-                raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
-
-    if split:
-        if request.app.state.config.TEXT_SPLITTER in ["", "character"]:
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=request.app.state.config.CHUNK_SIZE,
-                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                add_start_index=True,
-            )
-            docs = text_splitter.split_documents(docs)
-        elif request.app.state.config.TEXT_SPLITTER == "token":
-            log.info(
-                f"Using token text splitter: {request.app.state.config.TIKTOKEN_ENCODING_NAME}"
-            )
-
-            tiktoken.get_encoding(str(request.app.state.config.TIKTOKEN_ENCODING_NAME))
-            text_splitter = TokenTextSplitter(
-                encoding_name=str(request.app.state.config.TIKTOKEN_ENCODING_NAME),
-                chunk_size=request.app.state.config.CHUNK_SIZE,
-                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                add_start_index=True,
-            )
-            docs = text_splitter.split_documents(docs)
-        elif request.app.state.config.TEXT_SPLITTER == "markdown_header":
-            log.info("Using markdown header text splitter")
-
-            # Define headers to split on - covering most common markdown header levels
-            headers_to_split_on = [
-                ("#", "Header 1"),
-                ("##", "Header 2"),
-                ("###", "Header 3"),
-                ("####", "Header 4"),
-                ("#####", "Header 5"),
-                ("######", "Header 6"),
-            ]
+        if result is None or not result.ids[0]:
+            return
 
-            markdown_splitter = MarkdownHeaderTextSplitter(
-                headers_to_split_on=headers_to_split_on,
-                strip_headers=False,  # Keep headers in content for context
-            )
+        file_ids = {(meta or {}).get("file_id") for meta in result.metadatas[0]}
+        if replace:
+            # The chunks being replaced aren't duplicates
+            file_ids.discard(metadata.get("file_id"))
 
-            md_split_docs = []
-            for doc in docs:
-                md_header_splits = markdown_splitter.split_text(doc.page_content)
-                text_splitter = RecursiveCharacterTextSplitter(
-                    chunk_size=request.app.state.config.CHUNK_SIZE,
-                    chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                    add_start_index=True,
-                )
-                md_header_splits = text_splitter.split_documents(md_header_splits)
-
-                # Convert back to Document objects, preserving original metadata
-                for split_chunk in md_header_splits:
-                    headings_list = []
-                    # Extract header values in order based on headers_to_split_on
-                    for _, header_meta_key_name in headers_to_split_on:
-                        if header_meta_key_name in split_chunk.metadata:
-                            headings_list.append(
-                                split_chunk.metadata[header_meta_key_name]
-                            )
+        for file_id in file_ids:
+            # Chunks kept across updates of a file carry the hash of the
+            # content they were added with, only the current content counts
+            if file_id is not None:
+                file = Files.get_file_by_id(file_id)
+                if file is None or file.hash != hash:
+                    continue
 
-                    md_split_docs.append(
-                        Document(
-                            page_content=split_chunk.page_content,
-                            metadata={**doc.metadata, "headings": headings_list},
-                        )
-                    )
+            log.info(f"Document with hash {hash} already exists")
+            raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
 
-            docs = md_split_docs
-        else:
-            raise ValueError(ERROR_MESSAGES.DEFAULT("Invalid text splitter"))
-
-    if len(docs) == 0:
-        raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+    log.info(
+        f"save_docs_to_vector_db: document {_get_docs_info(docs) if isinstance(docs, list) else ''} {collection_name}"
+    )
 
-    texts = [doc.page_content for doc in docs]
-    metadatas = [
-        {
-            **doc.metadata,
-            **(metadata if metadata else {}),
-            "embedding_config": {
-                "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
-                "model": request.app.state.config.RAG_EMBEDDING_MODEL,
-            },
-        }
-        for doc in docs
-    ]
+    metadata = dict(metadata or {})
+    if "hash" in metadata:
+        _check_duplicate(metadata["hash"])
+
+    split_function = get_split_function(request) if split else list
+    if split and isinstance(docs, list):
+        # Large batches are split across processes ahead of the pipeline
+        docs = SPLITTER_POOL.split(get_split_settings(request), docs)
+        split_function = list
+    embedding_config = {
+        "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
+        "model": request.app.state.config.RAG_EMBEDDING_MODEL,
+    }
+    collection_exists = False
+    inserted_ids = []
+    # Chunks of the replaced file already in the collection, and the ones
+    # among them that are kept
+    existing_ids = set()
+    kept_ids = set()
 
     try:
-        if VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
+        collection_exists = VECTOR_DB_CLIENT.has_collection(
+            collection_name=collection_name
+        )
+        if collection_exists:
             log.info(f"collection {collection_name} already exists")
 
-            if overwrite:
-                VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
-                log.info(f"deleting existing collection {collection_name}")
-            elif add is False:
+            if not overwrite and add is False and not replace:
                 log.info(
                     f"collection {collection_name} already exists, overwrite is False and add is False"
                 )
                 return True
 
+        if replace:
+            if collection_exists:
+                result = VECTOR_DB_CLIENT.query(
+                    collection_name=collection_name,
+                    filter={"file_id": metadata["file_id"]},
+                    limit=REPLACE_QUERY_LIMIT,
+                )
+                if result is not None and result.ids:
+                    existing_ids = set(result.ids[0])
+
+                if len(existing_ids) >= REPLACE_QUERY_LIMIT:
+                    # Some chunks may be missing from the results, none can
+                    # be told stale, so all of them are replaced
+                    log.info(
+                        f"replacing all items of file {metadata['file_id']} in collection {collection_name}"
+                    )
+                    VECTOR_DB_CLIENT.delete(
+                        collection_name=collection_name,
+                        filter={"file_id": metadata["file_id"]},
+                    )
+                    existing_ids = set()
+
+            base_split_function = split_function
+            occurrences = {}
+
+            def split_function(docs: list[Document]) -> list[Document]:
+                chunks = []
+                for chunk in base_split_function(docs):
+                    # Identified by their content and by what their vector
+                    # depends on, repeated chunks by their occurrence
+                    text_hash = calculate_sha256_string(chunk.page_content)
+                    occurrence = occurrences[text_hash] = (
+                        occurrences.get(text_hash, -1) + 1
+                    )
+                    chunk.id = str(
+                        uuid.uuid5(
+                            uuid.NAMESPACE_OID,
+                            json.dumps(
+                                [
+                                    collection_name,
+                                    metadata["file_id"],
+                                    embedding_config,
+                                    RAG_EMBEDDING_CONTENT_PREFIX,
+                                    text_hash,
+                                    occurrence,
+                                ],
+                                sort_keys=True,
+                            ),
+                        )
+                    )
+
+                    if chunk.id in existing_ids:
+                        kept_ids.add(chunk.id)
+                    else:
+                        chunks.append(chunk)
+                return chunks
+
         log.info(f"generating embeddings for {collection_name}")
         embedding_function = get_embedding_function(
             request.app.state.config.RAG_EMBEDDING_ENGINE,
@@ -1365,35 +1447,87 @@ def save_docs_to_vector_db(
             ),
         )
 
-        embeddings = embedding_function(
-            list(map(lambda x: x.replace("\n", " "), texts)),
-            prefix=RAG_EMBEDDING_CONTENT_PREFIX,
-            user=user,
-        )
-        log.info(f"embeddings generated {len(embeddings)} for {len(texts)} items")
+        def embed(chunks: list[Document]) -> list:
+            return embedding_function(
+                [chunk.page_content.replace("\n", " ") for chunk in chunks],
+                prefix=RAG_EMBEDDING_CONTENT_PREFIX,
+                user=user,
+            )
 
-        items = [
-            {
-                "id": str(uuid.uuid4()),
-                "text": text,
-                "vector": embeddings[idx],
-                "metadata": metadatas[idx],
-            }
-            for idx, text in enumerate(texts)
-        ]
+        def insert(chunks: list[Document], vectors: list):
+            if not inserted_ids:
+                # Only replaced once there is something to replace it with
+                if collection_exists and overwrite:
+                    VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
+                    log.info(f"deleting existing collection {collection_name}")
+
+            items = [
+                {
+                    "id": chunk.id if replace else str(uuid.uuid4()),
+                    "text": chunk.page_content,
+                    "vector": vectors[idx],
+                    "metadata": {
+                        **chunk.metadata,
+                        **metadata,
+                        "embedding_config": embedding_config,
+                    },
+                }
+                for idx, chunk in enumerate(chunks)
+            ]
 
-        log.info(f"adding to collection {collection_name}")
-        VECTOR_DB_CLIENT.insert(
-            collection_name=collection_name,
-            items=items,
+            VECTOR_DB_CLIENT.insert(
+                collection_name=collection_name,
+                items=items,
+            )
+            inserted_ids.extend(item["id"] for item in items)
+
+        pipeline = IngestionPipeline(
+            split=split_function,
+            embed=embed,
+            insert=insert,
+            batch_size=RAG_INGEST_BATCH_SIZE,
+            queue_size=RAG_INGEST_QUEUE_SIZE,
+        )
+        count = pipeline.run(docs)
+        log.info(
+            f"added {count} items to collection {collection_name} "
+            f"({', '.join(str(stage) for stage in pipeline.metrics.values())})"
         )
 
-        log.info(f"added {len(items)} items to collection {collection_name}")
-        return True
+        # Removed once their replacements are in, so the file never goes
+        # missing from the collection
+        stale_ids = existing_ids - kept_ids
+        if stale_ids:
+            VECTOR_DB_CLIENT.delete(
+                collection_name=collection_name, ids=list(stale_ids)
+            )
+        if replace:
+            log.info(
+                f"kept {len(kept_ids)} unchanged items and removed {len(stale_ids)} from collection {collection_name}"
+            )
     except Exception as e:
         log.exception(e)
+
+        # Don't leave a partially ingested document behind
+        if inserted_ids:
+            try:
+                if collection_exists and not overwrite:
+                    VECTOR_DB_CLIENT.delete(
+                        collection_name=collection_name, ids=inserted_ids
+                    )
+                else:
+                    VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
+            except Exception as cleanup_error:
+                log.warning(
+                    f"Failed to remove the items added to {collection_name}: {cleanup_error}"
+                )
         raise e
 
+    if count == 0 and not kept_ids:
+        raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+
+    return True
+
 
 class ProcessFileForm(BaseModel):
     file_id: str
@@ -1415,16 +1549,14 @@ def process_file(
         if collection_name is None:
             collection_name = f"file-{file.id}"
 
+        # Whether the file's chunks already in the collection are replaced,
+        # keeping the vectors of the unchanged ones
+        replace = False
+
         if form_data.content:
             # Update the content in the file
             # Usage: /files/{file_id}/data/content/update, /files/ (audio file upload pipeline)
-
-            try:
-                # /files/{file_id}/data/content/update
-                VECTOR_DB_CLIENT.delete_collection(collection_name=f"file-{file.id}")
-            except:
-                # Audio file upload pipeline
-                pass
+            replace = True
 
             docs = [
                 Document(
@@ -1443,6 +1575,7 @@ def process_file(
         elif form_data.collection_name:
             # Check if the file has already been processed and save the content
             # Usage: /knowledge/{id}/file/add, /knowledge/{id}/file/update
+            replace = True
 
             result = VECTOR_DB_CLIENT.query(
                 collection_name=f"file-{file.id}", filter={"file_id": file.id}
@@ -1479,6 +1612,7 @@ def process_file(
                 file_path = Storage.get_file(file_path)
                 loader = Loader(
                     engine=request.app.state.config.CONTENT_EXTRACTION_ENGINE,
+                    parser=DOCUMENT_PARSER,
                     DATALAB_MARKER_API_KEY=request.app.state.config.DATALAB_MARKER_API_KEY,
                     DATALAB_MARKER_API_BASE_URL=request.app.state.config.DATALAB_MARKER_API_BASE_URL,
                     DATALAB_MARKER_ADDITIONAL_CONFIG=request.app.state.config.DATALAB_MARKER_ADDITIONAL_CONFIG,
@@ -1512,23 +1646,27 @@ def process_file(
                     DOCUMENT_INTELLIGENCE_KEY=request.app.state.config.DOCUMENT_INTELLIGENCE_KEY,
                     MISTRAL_OCR_API_KEY=request.app.state.config.MISTRAL_OCR_API_KEY,
                 )
-                docs = loader.load(
-                    file.filename, file.meta.get("content_type"), file_path
-                )
 
-                docs = [
-                    Document(
-                        page_content=doc.page_content,
-                        metadata={
-                            **doc.metadata,
-                            "name": file.filename,
-                            "created_by": file.user_id,
-                            "file_id": file.id,
-                            "source": file.filename,
-                        },
+                def load_docs():
+                    return (
+                        Document(
+                            page_content=doc.page_content,
+                            metadata={
+                                **doc.metadata,
+                                "name": file.filename,
+                                "created_by": file.user_id,
+                                "file_id": file.id,
+                                "source": file.filename,
+                            },
+                        )
+                        for doc in loader.lazy_load(
+                            file.filename, file.meta.get("content_type"), file_path
+                        )
                     )
-                    for doc in docs
-                ]
+
+                docs = load_docs()
+                # Known once the file is loaded
+                text_content = None
             else:
                 docs = [
                     Document(
@@ -1542,15 +1680,37 @@ def process_file(
                         },
                     )
                 ]
+                text_content = " ".join([doc.page_content for doc in docs])
+
+        # The pages of a file are streamed into its new collection while it is
+        # parsed, its content and hash are stored once all of them were loaded.
+        # Its chunks are inserted without the hash, which only serves to find
+        # duplicates within a collection and the collection is new
+        stream = (
+            text_content is None
+            and not request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL
+            and not VECTOR_DB_CLIENT.has_collection(collection_name=collection_name)
+        )
+        if text_content is None and not stream:
+            docs = list(docs)
             text_content = " ".join([doc.page_content for doc in docs])
 
-        log.debug(f"text_content: {text_content}")
-        Files.update_file_data_by_id(
-            file.id,
-            {"content": text_content},
-        )
-        hash = calculate_sha256_string(text_content)
-        Files.update_file_hash_by_id(file.id, hash)
+        def update_file_content(text_content: str) -> str:
+            log.debug(f"text_content: {text_content}")
+            Files.update_file_data_by_id(
+                file.id,
+                {"content": text_content},
+            )
+            hash = calculate_sha256_string(text_content)
+            Files.update_file_hash_by_id(file.id, hash)
+            return hash
+
+        metadata = {
+            "file_id": file.id,
+            "name": file.filename,
+        }
+        if not stream:
+            metadata["hash"] = update_file_content(text_content)
 
         if request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL:
             Files.update_file_data_by_id(file.id, {"status": "completed"})
@@ -1561,20 +1721,48 @@ def process_file(
                 "content": text_content,
             }
         else:
+            text_parts = []
+            # Whether loading the file finished, or failed on its own
+            loaded = False
+            load_failed = False
+
+            def read_docs():
+                nonlocal loaded, load_failed
+                try:
+                    for doc in docs:
+                        text_parts.append(doc.page_content)
+                        yield doc
+                except Exception:
+                    load_failed = True
+                    raise
+                loaded = True
+
             try:
-                result = save_docs_to_vector_db(
-                    request,
-                    docs=docs,
-                    collection_name=collection_name,
-                    metadata={
-                        "file_id": file.id,
-                        "name": file.filename,
-                        "hash": hash,
-                    },
-                    add=(True if form_data.collection_name else False),
-                    user=user,
-                )
-                log.info(f"added {len(docs)} items to collection {collection_name}")
+                try:
+                    result = save_docs_to_vector_db(
+                        request,
+                        docs=read_docs() if stream else docs,
+                        collection_name=collection_name,
+                        metadata=metadata,
+                        add=(True if form_data.collection_name else False),
+                        user=user,
+                        replace=replace,
+                    )
+                finally:
+                    # Stored even when embedding failed, as it was before
+                    # streaming, so that full context mode and retries have it
+                    if stream and not load_failed:
+                        try:
+                            if not loaded:
+                                # Ingestion stopped loading the file early
+                                text_parts = [doc.page_content for doc in load_docs()]
+                            text_content = " ".join(text_parts)
+                            update_file_content(text_content)
+                        except Exception as content_error:
+                            log.warning(
+                                f"Failed to store the content of {file.filename}: {content_error}"
+                            )
+                log.info(f"added {file.filename} to collection {collection_name}")
 
                 if result:
                     Files.update_file_metadata_by_id(
@@ -1994,6 +2182,99 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
         raise Exception("No search engine API key found in environment variables")
 
 
+async def search_web_cached(
+    request: Request, engine: str, query: str
+) -> list[SearchResult]:
+    """
+    Search the web, reusing the results of identical searches made in the
+    last WEB_SEARCH_CACHE_TTL seconds. Concurrent identical searches share a
+    single request to the engine.
+    """
+    query = " ".join(query.split())
+    if not WEB_SEARCH_CACHE_TTL:
+        return await run_in_threadpool(search_web, request, engine, query)
+
+    key = calculate_sha256_string(
+        json.dumps(
+            [
+                engine,
+                query.lower(),
+                request.app.state.config.WEB_SEARCH_RESULT_COUNT,
+                request.app.state.config.WEB_SEARCH_DOMAIN_FILTER_LIST,
+            ]
+        )
+    )
+
+    async def fetch():
+        results = await run_in_threadpool(search_web, request, engine, query)
+        return [result.model_dump() for result in results or []]
+
+    results = await WEB_SEARCH_CACHE.get(request.app, key, fetch)
+    return [SearchResult(**result) for result in results]
+
+
+def get_web_search_inputs_hash(request: Request, docs: list[Document]) -> str:
+    # Everything the embedded chunks of a web search collection depend on
+    return calculate_sha256_string(
+        json.dumps(
+            {
+                "embedding": [
+                    request.app.state.config.RAG_EMBEDDING_ENGINE,
+                    request.app.state.config.RAG_EMBEDDING_MODEL,
+                ],
+                "splitter": [
+                    request.app.state.config.TEXT_SPLITTER,
+                    request.app.state.config.CHUNK_SIZE,
+                    request.app.state.config.CHUNK_OVERLAP,
+                ],
+                "docs": [[doc.metadata, doc.page_content] for doc in docs],
+            },
+            sort_keys=True,
+            default=str,
+        )
+    )
+
+
+async def save_web_search_docs(
+    request: Request, docs: list[Document], collection_name: str, user=None
+):
+    """
+    Embed the documents of a web search into its collection, unless the
+    collection already holds the same documents.
+    """
+    inputs_hash = get_web_search_inputs_hash(request, docs)
+
+    try:
+        result = await ASYNC_VECTOR_DB_CLIENT.query(
+            collection_name=collection_name, filter={"hash": inputs_hash}, limit=1
+        )
+        if result is not None and result.ids and result.ids[0]:
+            log.info(f"reusing web search collection {collection_name}")
+            return
+    except Exception as e:
+        log.debug(f"failed to check web search collection {collection_name}: {e}")
+
+    # Identical searches running at once embed the documents a single time
+    key = f"{collection_name}:{inputs_hash}"
+    task = WEB_SEARCH_COLLECTION_TASKS.get(key)
+    if task is None:
+        task = asyncio.create_task(
+            run_in_threadpool(
+                save_docs_to_vector_db,
+                request,
+                docs,
+                collection_name,
+                metadata={"hash": inputs_hash},
+                overwrite=True,
+                user=user,
+            )
+        )
+        WEB_SEARCH_COLLECTION_TASKS[key] = task
+        task.add_done_callback(lambda _: WEB_SEARCH_COLLECTION_TASKS.pop(key, None))
+
+    await asyncio.shield(task)
+
+
 @router.post("/process/web/search")
 async def process_web_search(
     request: Request, form_data: SearchForm, user=Depends(get_verified_user)
@@ -2008,8 +2289,7 @@ async def process_web_search(
         )
 
         search_tasks = [
-            run_in_threadpool(
-                search_web,
+            search_web_cached(
                 request,
                 request.app.state.config.WEB_SEARCH_ENGINE,
                 query,
@@ -2057,6 +2337,8 @@ async def process_web_search(
                 if hasattr(result, "snippet") and result.snippet is not None
             ]
         else:
+            # Resolved concurrently here, get_web_loader then hits the DNS cache
+            urls = await asafe_validate_urls(urls)
             loader = get_web_loader(
                 urls,
                 verify_ssl=request.app.state.config.ENABLE_WEB_LOADER_SSL_VERIFICATION,
@@ -2096,14 +2378,7 @@ async def process_web_search(
             )
 
             try:
-                await run_in_threadpool(
-                    save_docs_to_vector_db,
-                    request,
-                    docs,
-                    collection_name,
-                    overwrite=True,
-                    user=user,
-                )
+                await save_web_search_docs(request, docs, collection_name, user=user)
             except Exception as e:
                 log.debug(f"error saving docs: {e}")
 
@@ -197,4 +197,5 @@ class TestAuths(AbstractPostgresTest):
         with mock_webui_user(id=user.id):
             response = self.fast_api_client.get(self.create_url("/api_key"))
         assert response.status_code == 200
-        assert response.json() == {"api_key": "abc"}
+        # Only the hash is stored, the key is shown by its prefix
+        assert response.json() == {"api_key": "abc..."}
@@ -0,0 +1,138 @@
+import asyncio
+import time
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+from open_webui.utils.cache import (
+    SharedCache,
+    get_cache_versions,
+    bump_cache_versions,
+    bump_cache_versions_nowait,
+)
+
+
+def make_app(redis=None):
+    return SimpleNamespace(state=SimpleNamespace(redis=redis))
+
+
+class TestCacheVersions:
+    """Test version stamps used to invalidate shared caches"""
+
+    @pytest.mark.asyncio
+    async def test_local_versions(self):
+        """Test version stamps without redis"""
+        app = make_app()
+
+        assert await get_cache_versions(app, "models", "functions") == (0, 0)
+
+        await bump_cache_versions(app, "models")
+        await bump_cache_versions(app, "models", "functions")
+
+        assert await get_cache_versions(app, "models", "functions") == (2, 1)
+
+    @pytest.mark.asyncio
+    async def test_redis_versions(self):
+        """Test version stamps are read from and written to redis"""
+        pipe = Mock()
+        pipe.execute = AsyncMock()
+
+        redis = Mock()
+        redis.hmget = AsyncMock(return_value=["3", None])
+        redis.pipeline = Mock(return_value=pipe)
+
+        app = make_app(redis)
+
+        assert await get_cache_versions(app, "models", "functions") == (3, 0)
+
+        await bump_cache_versions(app, "models")
+        pipe.hincrby.assert_called_once()
+        pipe.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_nowait_versions(self):
+        """Test version stamps bumped from synchronous code reach redis"""
+        pipe = Mock()
+        pipe.execute = AsyncMock()
+
+        redis = Mock()
+        redis.pipeline = Mock(return_value=pipe)
+
+        app = make_app(redis)
+        bump_cache_versions_nowait(app, "functions")
+
+        assert app.state.CACHE_VERSIONS == {"functions": 1}
+        await asyncio.sleep(0)
+        pipe.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_redis_failure_falls_back_to_local(self):
+        """Test local version stamps are used when redis is unavailable"""
+        redis = Mock()
+        redis.hmget = AsyncMock(side_effect=Exception("connection refused"))
+
+        app = make_app(redis)
+        app.state.CACHE_VERSIONS = {"models": 5}
+
+        assert await get_cache_versions(app, "models") == (5,)
+
+
+class TestSharedCache:
+    """Test the stale-while-revalidate cache of upstream model lists"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_fetch_once(self):
+        """Test concurrent callers share a single fetch"""
+        app = make_app()
+        cache = SharedCache("test", ttl=60)
+        fetch = AsyncMock(return_value={"models": []})
+
+        results = await asyncio.gather(
+            *[cache.get(app, "all", fetch) for _ in range(10)]
+        )
+
+        assert all(result == {"models": []} for result in results)
+        fetch.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_stale_value_served_while_refreshing(self):
+        """Test a stale value is served and refreshed in the background"""
+        app = make_app()
+        cache = SharedCache("test", ttl=60, stale_ttl=300)
+
+        await cache.get(app, "all", AsyncMock(return_value="old"))
+        version, _, value = cache._entries["all"]
+        cache._entries["all"] = (version, time.time() - 120, value)
+
+        fetch = AsyncMock(return_value="new")
+        assert await cache.get(app, "all", fetch) == "old"
+
+        await asyncio.sleep(0)
+        assert await cache.get(app, "all", fetch) == "new"
+        fetch.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_refresh_only_scheduled_keys(self):
+        """Test scheduled refreshes only fetch the keys given a scheduled fetch"""
+        app = make_app()
+        cache = SharedCache("test", ttl=0)
+
+        scheduled_fetch = AsyncMock(return_value="shared")
+        await cache.get(app, "all", AsyncMock(return_value="shared"), scheduled_fetch)
+        await cache.get(app, "user", AsyncMock(return_value="user"))
+
+        await cache.refresh(app)
+        scheduled_fetch.assert_awaited_once_with(app)
+        assert list(cache._fetchers) == ["all"]
+
+    @pytest.mark.asyncio
+    async def test_version_bump_invalidates(self):
+        """Test bumping a cache version drops the cached values"""
+        app = make_app()
+        cache = SharedCache("test", ttl=60, caches=("connections",))
+
+        await cache.get(app, "all", AsyncMock(return_value="old"))
+        await bump_cache_versions(app, "connections")
+
+        assert await cache.get(app, "all", AsyncMock(return_value="new")) == "new"
@@ -0,0 +1,50 @@
+from langchain_core.documents import Document
+
+from open_webui.retrieval.loaders.parser import DocumentParser
+
+
+class TestDocumentParser:
+    """Test the parsed document cache"""
+
+    def test_cache_keyed_by_file_and_settings(self, tmp_path):
+        """Test cached pages are only reused for the same file and settings"""
+        parser = DocumentParser(tmp_path / "cache", workers=0)
+        file_path = tmp_path / "doc.txt"
+        file_path.write_text("hello")
+
+        key = parser.get_cache_key(str(file_path), ["", {"PDF_EXTRACT_IMAGES": False}])
+        parser.set_cached(key, [Document(page_content="hello", metadata={"page": 0})])
+
+        cached = parser.get_cached(key)
+        assert [(doc.page_content, doc.metadata) for doc in cached] == [
+            ("hello", {"page": 0})
+        ]
+        assert key != parser.get_cache_key(
+            str(file_path), ["", {"PDF_EXTRACT_IMAGES": True}]
+        )
+
+        file_path.write_text("changed")
+        assert (
+            parser.get_cached(
+                parser.get_cache_key(
+                    str(file_path), ["", {"PDF_EXTRACT_IMAGES": False}]
+                )
+            )
+            is None
+        )
+
+    def test_cache_evicts_least_recently_used(self, tmp_path):
+        """Test the cache is pruned down to its maximum size"""
+        parser = DocumentParser(tmp_path, cache_max_size=1000, workers=0)
+
+        for name in ("a", "b", "c", "d"):
+            parser.set_cached(name * 64, [Document(page_content="x" * 300)])
+
+        assert parser.get_cached("a" * 64) is None
+        assert parser.get_cached("d" * 64) is not None
+
+    def test_runs_in_thread_without_workers(self):
+        """Test documents are parsed in the calling thread without workers"""
+        parser = DocumentParser(None, workers=0)
+        docs = parser.run(lambda name: [Document(page_content=name)], "doc")
+        assert docs[0].page_content == "doc"
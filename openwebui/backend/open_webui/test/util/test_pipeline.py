@@ -0,0 +1,59 @@
+import pytest
+from langchain_core.documents import Document
+
+from open_webui.retrieval.pipeline import IngestionPipeline
+
+
+def split_words(docs):
+    return [
+        Document(page_content=word) for doc in docs for word in doc.page_content.split()
+    ]
+
+
+def embed(chunks):
+    return [[float(len(chunk.page_content))] for chunk in chunks]
+
+
+class TestIngestionPipeline:
+    """Test the streaming document ingestion pipeline"""
+
+    def test_chunks_inserted_in_order_and_batched(self):
+        """Test every chunk is inserted once, in order, in bounded batches"""
+        batches = []
+
+        def insert(chunks, vectors):
+            batches.append([(c.page_content, v) for c, v in zip(chunks, vectors)])
+
+        docs = (Document(page_content=f"a{i} b{i} c{i}") for i in range(10))
+        pipeline = IngestionPipeline(
+            split_words, embed, insert, batch_size=4, queue_size=1
+        )
+
+        assert pipeline.run(docs) == 30
+        assert all(len(batch) <= 4 for batch in batches)
+        assert [text for batch in batches for text, _ in batch][:3] == [
+            "a0",
+            "b0",
+            "c0",
+        ]
+        assert pipeline.metrics["load"].items == 10
+        assert pipeline.metrics["embed"].items == 30
+
+    def test_failure_stops_pipeline(self):
+        """Test an error in a stage is raised and stops loading"""
+        loaded = []
+
+        def docs():
+            for i in range(1000):
+                loaded.append(i)
+                yield Document(page_content=f"word{i}")
+
+        def failing_embed(chunks):
+            raise RuntimeError("embedding failed")
+
+        pipeline = IngestionPipeline(
+            split_words, failing_embed, lambda *_: None, batch_size=1, queue_size=1
+        )
+        with pytest.raises(RuntimeError):
+            pipeline.run(docs())
+        assert len(loaded) < 1000
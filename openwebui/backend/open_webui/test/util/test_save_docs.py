@@ -0,0 +1,134 @@
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.documents import Document
+
+from open_webui.retrieval.vector.main import GetResult
+import open_webui.routers.retrieval as retrieval
+
+
+class FakeVectorDB:
+    def __init__(self):
+        self.collections = {}
+
+    def has_collection(self, collection_name):
+        return collection_name in self.collections
+
+    def query(self, collection_name, filter, limit=None):
+        items = [
+            item
+            for item in self.collections.get(collection_name, {}).values()
+            if all(item["metadata"].get(k) == v for k, v in filter.items())
+        ][:limit]
+        if not items:
+            return None
+        return GetResult(
+            ids=[[item["id"] for item in items]],
+            documents=[[item["text"] for item in items]],
+            metadatas=[[item["metadata"] for item in items]],
+        )
+
+    def insert(self, collection_name, items):
+        collection = self.collections.setdefault(collection_name, {})
+        for item in items:
+            collection[item["id"]] = item
+
+    def delete(self, collection_name, ids=None, filter=None):
+        collection = self.collections.get(collection_name, {})
+        for id, item in list(collection.items()):
+            if (ids and id in ids) or (
+                filter and all(item["metadata"].get(k) == v for k, v in filter.items())
+            ):
+                del collection[id]
+
+    def delete_collection(self, collection_name):
+        self.collections.pop(collection_name, None)
+
+
+@pytest.fixture
+def vector_db(monkeypatch):
+    vector_db = FakeVectorDB()
+    monkeypatch.setattr(retrieval, "VECTOR_DB_CLIENT", vector_db)
+    return vector_db
+
+
+@pytest.fixture
+def embedded(monkeypatch):
+    embedded = []
+
+    def embedding_function(texts, prefix=None, user=None):
+        embedded.extend(texts)
+        return [[float(len(text))] for text in texts]
+
+    monkeypatch.setattr(
+        retrieval,
+        "get_embedding_function",
+        lambda *args, **kwargs: embedding_function,
+    )
+    return embedded
+
+
+def make_request():
+    config = SimpleNamespace(
+        RAG_EMBEDDING_ENGINE="",
+        RAG_EMBEDDING_MODEL="test",
+        RAG_OPENAI_API_BASE_URL="",
+        RAG_OLLAMA_BASE_URL="",
+        RAG_AZURE_OPENAI_BASE_URL="",
+        RAG_OPENAI_API_KEY="",
+        RAG_OLLAMA_API_KEY="",
+        RAG_AZURE_OPENAI_API_KEY="",
+        RAG_EMBEDDING_BATCH_SIZE=1,
+        RAG_AZURE_OPENAI_API_VERSION="",
+    )
+    return SimpleNamespace(
+        app=SimpleNamespace(state=SimpleNamespace(config=config, ef=None))
+    )
+
+
+def save_file(texts):
+    retrieval.save_docs_to_vector_db(
+        make_request(),
+        [Document(page_content=text) for text in texts],
+        "knowledge",
+        metadata={"file_id": "file"},
+        split=False,
+        add=True,
+        replace=True,
+    )
+
+
+def get_ids(vector_db):
+    return {item["text"]: id for id, item in vector_db.collections["knowledge"].items()}
+
+
+class TestReplaceFileChunks:
+    """Test updated files only re-embed the chunks that changed"""
+
+    def test_update_keeps_unchanged_chunks(self, vector_db, embedded):
+        """Test unchanged chunks keep their ids and the ones gone are removed"""
+        save_file(["a", "b", "c"])
+        ids = get_ids(vector_db)
+
+        embedded.clear()
+        save_file(["a", "c", "d"])
+        updated_ids = get_ids(vector_db)
+
+        assert embedded == ["d"]
+        assert set(updated_ids) == {"a", "c", "d"}
+        assert updated_ids["a"] == ids["a"]
+        assert updated_ids["c"] == ids["c"]
+
+    def test_update_past_query_limit_replaces_all(
+        self, vector_db, embedded, monkeypatch
+    ):
+        """Test files with more chunks than can be looked up are fully replaced"""
+        monkeypatch.setattr(retrieval, "REPLACE_QUERY_LIMIT", 2)
+
+        save_file(["a", "b", "c"])
+
+        embedded.clear()
+        save_file(["a", "c", "d"])
+
+        assert embedded == ["a", "c", "d"]
+        assert set(get_ids(vector_db)) == {"a", "c", "d"}
@@ -0,0 +1,54 @@
+from langchain_core.documents import Document
+from langchain_text_splitters import TokenTextSplitter
+
+from open_webui.retrieval.splitters import (
+    BatchTokenTextSplitter,
+    SplitterPool,
+    get_text_splitter,
+)
+
+DOCS = [
+    Document(
+        page_content=" ".join(f"word{i}-{j}" for j in range(400)),
+        metadata={"page": i},
+    )
+    for i in range(6)
+]
+
+
+def get_chunks(docs):
+    return [(doc.page_content, doc.metadata) for doc in docs]
+
+
+class TestSplitters:
+    """Test the cached and batched text splitters"""
+
+    def test_batch_token_splitter_matches_token_splitter(self):
+        """Test batch encoding yields the chunks of the token splitter"""
+        settings = dict(
+            encoding_name="cl100k_base",
+            chunk_size=50,
+            chunk_overlap=10,
+            add_start_index=True,
+        )
+
+        assert get_chunks(
+            BatchTokenTextSplitter(**settings).split_documents(DOCS)
+        ) == get_chunks(TokenTextSplitter(**settings).split_documents(DOCS))
+
+    def test_splitters_are_cached(self):
+        """Test splitters are built once per settings"""
+        assert get_text_splitter("token", 50, 10, "cl100k_base") is get_text_splitter(
+            "token", 50, 10, "cl100k_base"
+        )
+
+    def test_pool_split_matches_single_split(self):
+        """Test splitting in slices across processes keeps the chunks and order"""
+        settings = ("character", 200, 20, "cl100k_base")
+        pool = SplitterPool(workers=2, min_size=0)
+        try:
+            assert get_chunks(pool.split(settings, DOCS)) == get_chunks(
+                get_text_splitter(*settings)(DOCS)
+            )
+        finally:
+            pool.close()
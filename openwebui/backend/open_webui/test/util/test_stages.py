@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from open_webui.utils.stages import Stage, run_stages
+
+
+class TestRunStages:
+    """Test the dependency-aware stage scheduler"""
+
+    @pytest.mark.asyncio
+    async def test_independent_stages_run_concurrently(self):
+        """Test stages without dependencies overlap"""
+
+        async def sleep(results):
+            await asyncio.sleep(0.1)
+            return True
+
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        results, timings = await run_stages(
+            [Stage("a", sleep), Stage("b", sleep), Stage("c", sleep)]
+        )
+
+        assert results == {"a": True, "b": True, "c": True}
+        assert loop.time() - started_at < 0.25
+        assert set(timings) == {"a", "b", "c"}
+
+    @pytest.mark.asyncio
+    async def test_dependencies_receive_results(self):
+        """Test a stage starts after its dependencies and sees their results"""
+
+        async def first(results):
+            await asyncio.sleep(0.05)
+            return 1
+
+        async def second(results):
+            return results["first"] + 1
+
+        results, _ = await run_stages(
+            [Stage("second", second, depends_on=("first",)), Stage("first", first)]
+        )
+
+        assert results == {"first": 1, "second": 2}
+
+    @pytest.mark.asyncio
+    async def test_timeout_and_failure_use_default(self):
+        """Test failing and slow stages fall back to their default"""
+
+        async def slow(results):
+            await asyncio.sleep(1)
+
+        async def broken(results):
+            raise RuntimeError("broken")
+
+        results, timings = await run_stages(
+            [
+                Stage("slow", slow, timeout=0.05, default="late"),
+                Stage("broken", broken, default=[]),
+            ]
+        )
+
+        assert results == {"slow": "late", "broken": []}
+        assert timings["slow"]["status"] == "timeout"
+        assert timings["broken"]["status"] == "error"
+
+    @pytest.mark.asyncio
+    async def test_budget_applies_to_all_stages(self):
+        """Test the overall budget bounds dependent stages"""
+
+        async def slow(results):
+            await asyncio.sleep(0.1)
+            return True
+
+        results, timings = await run_stages(
+            [Stage("a", slow), Stage("b", slow, depends_on=("a",))], timeout=0.15
+        )
+
+        assert results["a"] is True
+        assert results["b"] is None
+        assert timings["b"]["status"] == "timeout"
+
+    @pytest.mark.asyncio
+    async def test_invalid_dependencies(self):
+        """Test unknown and cyclic dependencies are rejected"""
+
+        async def noop(results):
+            return None
+
+        with pytest.raises(ValueError):
+            await run_stages([Stage("a", noop, depends_on=("missing",))])
+
+        with pytest.raises(ValueError):
+            await run_stages(
+                [
+                    Stage("a", noop, depends_on=("b",)),
+                    Stage("b", noop, depends_on=("a",)),
+                ]
+            )
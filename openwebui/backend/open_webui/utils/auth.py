@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import uuid
 import jwt
@@ -21,6 +22,7 @@ from typing import Optional, Union, List, Dict
 
 from opentelemetry import trace
 
+from open_webui.models.api_keys import ApiKeys
 from open_webui.models.users import Users
 
 from open_webui.constants import ERROR_MESSAGES
@@ -34,6 +36,7 @@ from open_webui.env import (
     STATIC_DIR,
     SRC_LOG_LEVELS,
     WEBUI_AUTH_TRUSTED_EMAIL_HEADER,
+    USER_LAST_ACTIVE_FLUSH_INTERVAL,
 )
 
 from fastapi import BackgroundTasks, Depends, HTTPException, Request, Response, status
@@ -272,7 +275,7 @@ def get_current_user(
             )
 
         if data is not None and "id" in data:
-            user = Users.get_user_by_id(data["id"])
+            user = Users.get_user_by_id_cached(data["id"])
             if user is None:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
@@ -297,12 +300,9 @@ def get_current_user(
                     current_span.set_attribute("client.user.role", user.role)
                     current_span.set_attribute("client.auth.type", "jwt")
 
-                # Refresh the user's last active timestamp asynchronously
-                # to prevent blocking the request
-                if background_tasks:
-                    background_tasks.add_task(
-                        Users.update_user_last_active_by_id, user.id
-                    )
+                # Refresh the user's last active timestamp with the next
+                # periodic bulk update to prevent blocking the request
+                Users.touch_user_last_active_by_id(user.id)
             return user
         else:
             raise HTTPException(
@@ -324,6 +324,24 @@ def get_current_user(
         raise e
 
 
+def flush_last_active():
+    Users.flush_users_last_active()
+    ApiKeys.flush_api_keys_last_used()
+
+
+async def periodic_users_last_active_flush():
+    """
+    Write the last active and last used timestamps recorded while
+    authenticating requests to the database, in bulk updates per interval.
+    """
+    while True:
+        await asyncio.sleep(USER_LAST_ACTIVE_FLUSH_INTERVAL)
+        try:
+            await asyncio.to_thread(flush_last_active)
+        except Exception as e:
+            log.exception(f"Error flushing the last active timestamps: {e}")
+
+
 def get_current_user_by_api_key(api_key: str):
     user = Users.get_user_by_api_key(api_key)
 
@@ -341,7 +359,7 @@ def get_current_user_by_api_key(api_key: str):
             current_span.set_attribute("client.user.role", user.role)
             current_span.set_attribute("client.auth.type", "api_key")
 
-        Users.update_user_last_active_by_id(user.id)
+        Users.touch_user_last_active_by_id(user.id)
 
     return user
 
@@ -0,0 +1,186 @@
+import itertools
+import logging
+import random
+import threading
+import time
+from typing import Callable, Optional
+
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class Backend:
+    def __init__(self):
+        # Requests in flight by lease id, with the time they were started
+        self.leases: dict[int, float] = {}
+        self.failures = 0
+        self.open_until = 0.0
+        # Running weight of the smooth weighted round robin
+        self.current_weight = 0.0
+
+
+def choose_random(balancer, candidates, weights):
+    return random.choice(candidates)
+
+
+def choose_round_robin(balancer, candidates, weights):
+    # Smooth weighted round robin, spreads the picks of heavier backends
+    # instead of sending them in bursts
+    backends = {idx: balancer.get_backend(idx) for idx in candidates}
+
+    total = sum(weights[idx] for idx in candidates)
+    for idx, backend in backends.items():
+        backend.current_weight += weights[idx]
+
+    chosen = max(candidates, key=lambda idx: backends[idx].current_weight)
+    backends[chosen].current_weight -= total
+    return chosen
+
+
+def choose_least_outstanding(balancer, candidates, weights):
+    loads = {
+        idx: balancer.get_outstanding(idx) / max(weights[idx], 0.001)
+        for idx in candidates
+    }
+    lowest = min(loads.values())
+    return random.choice([idx for idx in candidates if loads[idx] == lowest])
+
+
+STRATEGIES: dict[str, Callable] = {
+    "random": choose_random,
+    "round_robin": choose_round_robin,
+    "weighted_round_robin": choose_round_robin,
+    "least_outstanding": choose_least_outstanding,
+}
+
+
+class LoadBalancer:
+    """
+    Chooses a backend for a model among the backends serving it.
+
+    Backends that failed `failure_threshold` times in a row are skipped for
+    `cooldown` seconds, after which requests are let through again and the
+    first success closes the circuit. With `residency_routing`, backends that
+    have the model loaded are preferred unless they are all busier than
+    `residency_max_outstanding` requests.
+    """
+
+    def __init__(
+        self,
+        strategy: str = "least_outstanding",
+        residency_routing: bool = True,
+        failure_threshold: int = 3,
+        cooldown: float = 30,
+        residency_max_outstanding: int = 4,
+        lease_timeout: Optional[float] = None,
+    ):
+        if strategy not in STRATEGIES:
+            log.warning(f"Unknown load balancing strategy {strategy}, using random")
+            strategy = "random"
+
+        self.strategy = STRATEGIES[strategy]
+        self.residency_routing = residency_routing
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.residency_max_outstanding = residency_max_outstanding
+        # Leases not released within this time are not counted as outstanding,
+        # so a lost release can't keep a backend looking busy forever
+        self.lease_timeout = lease_timeout or 600
+
+        self.backends: dict[int, Backend] = {}
+        # Expiry of the loaded models by model and backend
+        self.residency: dict[str, dict[int, float]] = {}
+
+        self._lease_ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def get_backend(self, idx) -> Backend:
+        backend = self.backends.get(idx)
+        if backend is None:
+            backend = self.backends.setdefault(idx, Backend())
+        return backend
+
+    def get_outstanding(self, idx) -> int:
+        backend = self.get_backend(idx)
+        started_after = time.time() - self.lease_timeout
+        return sum(
+            1 for started_at in backend.leases.values() if started_at > started_after
+        )
+
+    def is_available(self, idx) -> bool:
+        return self.get_backend(idx).open_until <= time.time()
+
+    def is_resident(self, model: str, idx) -> bool:
+        return self.residency.get(model, {}).get(idx, 0) > time.time()
+
+    def choose(
+        self, model: str, candidates: list, weights: Optional[dict] = None
+    ) -> int:
+        if not candidates:
+            raise ValueError(f"No backend serves the model {model}")
+
+        weights = {idx: (weights or {}).get(idx, 1) for idx in candidates}
+
+        with self._lock:
+            # When every circuit is open, trying one beats failing outright
+            available = [idx for idx in candidates if self.is_available(idx)]
+            candidates = available or candidates
+
+            if self.residency_routing:
+                resident = [
+                    idx
+                    for idx in candidates
+                    if self.is_resident(model, idx)
+                    and self.get_outstanding(idx) < self.residency_max_outstanding
+                ]
+                candidates = resident or candidates
+
+            return self.strategy(self, candidates, weights)
+
+    def acquire(self, idx) -> int:
+        lease_id = next(self._lease_ids)
+        with self._lock:
+            backend = self.get_backend(idx)
+
+            # Drop the leases that were never released
+            started_after = time.time() - self.lease_timeout
+            for expired_id in [
+                id
+                for id, started_at in backend.leases.items()
+                if started_at <= started_after
+            ]:
+                backend.leases.pop(expired_id, None)
+
+            backend.leases[lease_id] = time.time()
+        return lease_id
+
+    def release(self, idx, lease_id: int, failed: bool = False):
+        with self._lock:
+            backend = self.get_backend(idx)
+            if backend.leases.pop(lease_id, None) is None:
+                # Already released, or expired and dropped
+                return
+
+            if not failed:
+                backend.failures = 0
+                return
+
+            backend.failures += 1
+            if backend.failures >= self.failure_threshold:
+                backend.open_until = time.time() + self.cooldown
+                log.warning(
+                    f"Backend {idx} failed {backend.failures} times in a row, "
+                    f"skipping it for {self.cooldown}s"
+                )
+
+    def set_residency(self, residency: dict[str, dict[int, float]]):
+        self.residency = residency
+
+    def mark_resident(self, model: str, idx, keep_alive: float = 300):
+        # The backend loads the model to serve the request and keeps it for
+        # keep_alive seconds, until the loaded models are listed again
+        with self._lock:
+            models = self.residency.setdefault(model, {})
+            models[idx] = max(models.get(idx, 0), time.time() + keep_alive)
@@ -0,0 +1,264 @@
+import asyncio
+import functools
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from open_webui.env import SRC_LOG_LEVELS, REDIS_KEY_PREFIX
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+REDIS_CACHE_VERSION_KEY = f"{REDIS_KEY_PREFIX}:cache:version"
+
+
+def _get_local_versions(app) -> dict:
+    if not hasattr(app.state, "CACHE_VERSIONS"):
+        app.state.CACHE_VERSIONS = {}
+    return app.state.CACHE_VERSIONS
+
+
+async def get_cache_versions(app, *names: str) -> tuple:
+    """
+    Get the current version stamps for the given cache names.
+
+    Version stamps are stored in Redis when available so that every worker
+    observes invalidations made by any other worker, otherwise they are kept
+    in the app state of the current process.
+    """
+    redis = getattr(app.state, "redis", None)
+    if redis is not None:
+        try:
+            values = await redis.hmget(REDIS_CACHE_VERSION_KEY, list(names))
+            return tuple(int(value or 0) for value in values)
+        except Exception as e:
+            log.warning(f"Failed to read cache versions from redis: {e}")
+
+    versions = _get_local_versions(app)
+    return tuple(versions.get(name, 0) for name in names)
+
+
+def _bump_local_versions(app, names: tuple):
+    versions = _get_local_versions(app)
+    for name in names:
+        versions[name] = versions.get(name, 0) + 1
+
+
+async def _bump_redis_versions(redis, names: tuple):
+    try:
+        pipe = redis.pipeline()
+        for name in names:
+            pipe.hincrby(REDIS_CACHE_VERSION_KEY, name, 1)
+        await pipe.execute()
+    except Exception as e:
+        log.warning(f"Failed to bump cache versions in redis: {e}")
+
+
+async def bump_cache_versions(app, *names: str):
+    """
+    Invalidate the given caches by incrementing their version stamps.
+    """
+    _bump_local_versions(app, names)
+
+    redis = getattr(app.state, "redis", None)
+    if redis is not None:
+        await _bump_redis_versions(redis, names)
+
+
+# Keeps the background bumps referenced until they are done
+_bump_tasks: set[asyncio.Task] = set()
+
+
+def bump_cache_versions_nowait(app, *names: str):
+    """
+    Invalidate the given caches from synchronous code. The local stamps are
+    bumped right away, the Redis ones in the background on the running loop.
+    """
+    _bump_local_versions(app, names)
+
+    redis = getattr(app.state, "redis", None)
+    if redis is None:
+        return
+
+    try:
+        task = asyncio.get_running_loop().create_task(
+            _bump_redis_versions(redis, names)
+        )
+    except RuntimeError:
+        log.warning(f"No event loop to bump cache versions in redis: {names}")
+        return
+
+    _bump_tasks.add(task)
+    task.add_done_callback(_bump_tasks.discard)
+
+
+class SharedCache:
+    """
+    Cache shared by every user, and by every worker through Redis when
+    available, with stale-while-revalidate semantics.
+
+    Values younger than `ttl` seconds are served as is. Older values are
+    still served for `stale_ttl` more seconds while a single background task
+    per key refreshes them, after which callers wait for the refresh. Entries
+    are tied to the version stamps of `caches`, so bumping one of them drops
+    every entry at once.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: Optional[float],
+        stale_ttl: float = 0,
+        caches: tuple = (),
+        max_size: Optional[int] = None,
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.caches = caches
+        self.max_size = max_size
+
+        # (version, fetched at, value) by key
+        self._entries: dict[str, tuple[str, float, Any]] = {}
+        # Fetch function of the keys refreshed on a schedule, called with the
+        # app alone so that they don't hold on to a request
+        self._fetchers: dict[str, Callable[[Any], Awaitable[Any]]] = {}
+        self._tasks: dict[tuple[str, str], asyncio.Task] = {}
+
+    def _get_redis_key(self, key: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:cache:{self.name}:{key}"
+
+    async def _get_version(self, app) -> str:
+        if not self.caches:
+            return ""
+        versions = await get_cache_versions(app, *self.caches)
+        return ":".join(str(version) for version in versions)
+
+    def _store(self, key: str, entry: tuple):
+        self._entries.pop(key, None)
+        self._entries[key] = entry
+
+        # Evict the least recently stored keys
+        while self.max_size and len(self._entries) > self.max_size:
+            oldest = next(iter(self._entries))
+            self._entries.pop(oldest, None)
+            self._fetchers.pop(oldest, None)
+
+    def _is_fresh(self, fetched_at: float, grace: float = 0) -> bool:
+        return self.ttl is None or time.time() - fetched_at < self.ttl + grace
+
+    async def _load(self, app, key: str, version: str) -> Optional[tuple]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] != version:
+            entry = None
+
+        if entry is not None and self._is_fresh(entry[1]):
+            return entry
+
+        # Another worker may have refreshed the value in the meantime
+        redis = getattr(app.state, "redis", None)
+        if redis is not None:
+            try:
+                data = await redis.get(self._get_redis_key(key))
+                shared = json.loads(data) if data else None
+                if (
+                    shared
+                    and shared.get("version") == version
+                    and (entry is None or shared["fetched_at"] > entry[1])
+                ):
+                    entry = (version, shared["fetched_at"], shared["value"])
+                    self._store(key, entry)
+            except Exception as e:
+                log.warning(f"Failed to load {self.name} cache from redis: {e}")
+
+        return entry
+
+    async def _refresh(self, app, key: str, version: str, fetch) -> Any:
+        value = await fetch()
+        fetched_at = time.time()
+
+        self._store(key, (version, fetched_at, value))
+
+        redis = getattr(app.state, "redis", None)
+        if redis is not None:
+            try:
+                await redis.set(
+                    self._get_redis_key(key),
+                    json.dumps(
+                        {"version": version, "fetched_at": fetched_at, "value": value}
+                    ),
+                    ex=(
+                        int(self.ttl + self.stale_ttl) + 1
+                        if self.ttl is not None
+                        else None
+                    ),
+                )
+            except Exception as e:
+                log.warning(f"Failed to store {self.name} cache in redis: {e}")
+
+        return value
+
+    def _refresh_once(self, app, key: str, version: str, fetch) -> asyncio.Task:
+        # Concurrent callers share the refresh in flight
+        task = self._tasks.get((key, version))
+        if task is None:
+            task = asyncio.create_task(self._refresh(app, key, version, fetch))
+            self._tasks[(key, version)] = task
+
+            def on_done(task):
+                self._tasks.pop((key, version), None)
+                if not task.cancelled() and task.exception() is not None:
+                    log.warning(
+                        f"Failed to refresh {self.name} cache: {task.exception()}"
+                    )
+
+            task.add_done_callback(on_done)
+        return task
+
+    async def get(
+        self,
+        app,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        scheduled_fetch: Optional[Callable[[Any], Awaitable[Any]]] = None,
+    ) -> Any:
+        """
+        Get the cached value for the key, fetching it when missing. The value
+        is shared, callers must copy it before modifying it.
+
+        Keys given a `scheduled_fetch`, called with the app, are also kept
+        fresh by `refresh`.
+        """
+        if scheduled_fetch is not None:
+            self._fetchers[key] = scheduled_fetch
+
+        version = await self._get_version(app)
+        entry = await self._load(app, key, version)
+        if entry is not None:
+            _, fetched_at, value = entry
+            if self._is_fresh(fetched_at):
+                return value
+            if self._is_fresh(fetched_at, self.stale_ttl):
+                self._refresh_once(app, key, version, fetch)
+                return value
+
+        # Shielded so a cancelled request doesn't cancel the fetch of others
+        return await asyncio.shield(self._refresh_once(app, key, version, fetch))
+
+    async def refresh(self, app):
+        """
+        Refresh the values that are no longer fresh, so that the next callers
+        don't have to wait for them.
+        """
+        version = await self._get_version(app)
+        for key, fetch in list(self._fetchers.items()):
+            try:
+                entry = await self._load(app, key, version)
+                if entry is None or not self._is_fresh(entry[1]):
+                    await self._refresh_once(
+                        app, key, version, functools.partial(fetch, app)
+                    )
+            except Exception as e:
+                log.warning(f"Failed to refresh {self.name} cache: {e}")
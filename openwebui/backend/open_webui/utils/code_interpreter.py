@@ -1,6 +1,7 @@
 import asyncio
 import json
 import logging
+import time
 import uuid
 from typing import Optional
 
@@ -8,7 +9,13 @@ import aiohttp
 import websockets
 from pydantic import BaseModel
 
-from open_webui.env import SRC_LOG_LEVELS
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    JUPYTER_KERNEL_POOL_SIZE,
+    JUPYTER_KERNEL_POOL_MAX_KERNELS,
+    JUPYTER_KERNEL_IDLE_TIMEOUT,
+    ENABLE_JUPYTER_KERNEL_PERSISTENCE,
+)
 
 logger = logging.getLogger(__name__)
 logger.setLevel(SRC_LOG_LEVELS["MAIN"])
@@ -36,6 +43,8 @@ class JupyterCodeExecuter:
         token: str = "",
         password: str = "",
         timeout: int = 60,
+        session: Optional[aiohttp.ClientSession] = None,
+        kernel_id: str = "",
     ):
         """
         :param base_url: Jupyter server URL (e.g., "http://localhost:8888")
@@ -43,24 +52,32 @@ class JupyterCodeExecuter:
         :param token: Jupyter authentication token (optional)
         :param password: Jupyter password (optional)
         :param timeout: WebSocket timeout in seconds (default: 60s)
+        :param session: Signed in session to use instead of a new one (optional)
+        :param kernel_id: Running kernel to use instead of a new one (optional)
         """
         self.base_url = base_url
         self.code = code
         self.token = token
         self.password = password
         self.timeout = timeout
-        self.kernel_id = ""
+        self.timed_out = False
+        self.kernel_id = kernel_id
         if self.base_url[-1] != "/":
             self.base_url += "/"
-        self.session = aiohttp.ClientSession(trust_env=True, base_url=self.base_url)
-        self.params = {}
+        # Sessions and kernels handed in are owned by the caller
+        self.owns_session = session is None
+        self.owns_kernel = not kernel_id
+        self.session = session or aiohttp.ClientSession(
+            trust_env=True, base_url=self.base_url
+        )
+        self.params = {"token": self.token} if self.token else {}
         self.result = ResultModel()
 
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.kernel_id:
+        if self.kernel_id and self.owns_kernel:
             try:
                 async with self.session.delete(
                     f"api/kernels/{self.kernel_id}", params=self.params
@@ -68,12 +85,15 @@ class JupyterCodeExecuter:
                     response.raise_for_status()
             except Exception as err:
                 logger.exception("close kernel failed, %s", err)
-        await self.session.close()
+        if self.owns_session:
+            await self.session.close()
 
     async def run(self) -> ResultModel:
         try:
-            await self.sign_in()
-            await self.init_kernel()
+            if self.owns_session:
+                await self.sign_in()
+            if not self.kernel_id:
+                await self.init_kernel()
             await self.execute_code()
         except Exception as err:
             logger.exception("execute code failed, %s", err)
@@ -194,15 +214,352 @@ class JupyterCodeExecuter:
 
             except asyncio.TimeoutError:
                 stderr += "\nExecution timed out."
+                self.timed_out = True
                 break
         self.result.stdout = stdout.strip()
         self.result.stderr = stderr.strip()
         self.result.result = "\n".join(result).strip() if result else ""
 
 
+class JupyterKernelPool:
+    """
+    Keeps one signed in session and a few started kernels per Jupyter server
+    so that executions do not pay for the login and kernel startup.
+
+    Kernels are never shared between sessions (chats). Without persistence a
+    kernel is shut down after its execution and replaced in the background;
+    with persistence it stays leased to its session until it has been idle
+    for `idle_timeout` seconds, so state carries over between turns.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        token: str = "",
+        password: str = "",
+        size: int = 1,
+        max_kernels: int = 10,
+        idle_timeout: int = 600,
+        persist: bool = False,
+    ):
+        self.base_url = base_url if base_url.endswith("/") else f"{base_url}/"
+        self.token = token
+        self.password = password
+        self.size = size
+        self.max_kernels = max(max_kernels, 1)
+        self.idle_timeout = idle_timeout
+        self.persist = persist
+
+        self.params = {"token": token} if token else {}
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.session_lock = asyncio.Lock()
+
+        self.lock = asyncio.Lock()
+        # Started kernels not leased to any session yet
+        self.ready: list[str] = []
+        # session id -> {"kernel_id", "last_used", "active"}
+        self.leases: dict[str, dict] = {}
+        # Kernels started or starting, bounded by max_kernels
+        self.kernels = 0
+
+        self.wakeup = asyncio.Event()
+        self.maintenance_task: Optional[asyncio.Task] = None
+        self.tasks = set()
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        async with self.session_lock:
+            if self.session is None or self.session.closed:
+                session = aiohttp.ClientSession(trust_env=True, base_url=self.base_url)
+                try:
+                    await JupyterCodeExecuter(
+                        self.base_url,
+                        "",
+                        self.token,
+                        self.password,
+                        session=session,
+                    ).sign_in()
+                except Exception:
+                    await session.close()
+                    raise
+                self.session = session
+            return self.session
+
+    async def reset_session(self):
+        async with self.session_lock:
+            if self.session is not None:
+                await self.session.close()
+                self.session = None
+
+    async def start_kernel(self) -> str:
+        session = await self.get_session()
+        async with session.post("api/kernels", params=self.params) as response:
+            response.raise_for_status()
+            return (await response.json())["id"]
+
+    async def shutdown_kernel(self, kernel_id: str):
+        try:
+            session = await self.get_session()
+            async with session.delete(
+                f"api/kernels/{kernel_id}", params=self.params
+            ) as response:
+                if response.status != 404:
+                    response.raise_for_status()
+        except Exception as err:
+            logger.warning("close kernel %s failed, %s", kernel_id, err)
+
+    async def interrupt_kernel(self, kernel_id: str):
+        try:
+            session = await self.get_session()
+            async with session.post(
+                f"api/kernels/{kernel_id}/interrupt", params=self.params
+            ) as response:
+                response.raise_for_status()
+        except Exception as err:
+            logger.warning("interrupt kernel %s failed, %s", kernel_id, err)
+
+    async def is_alive(self, kernel_id: str) -> bool:
+        try:
+            session = await self.get_session()
+            async with session.get(
+                f"api/kernels/{kernel_id}", params=self.params
+            ) as response:
+                if response.status != 200:
+                    return False
+                kernel = await response.json()
+                return kernel.get("execution_state") != "dead"
+        except Exception:
+            return False
+
+    def discard(self, kernel_id: str):
+        self.kernels -= 1
+        self.spawn(self.shutdown_kernel(kernel_id))
+
+    def spawn(self, coroutine):
+        task = asyncio.create_task(coroutine)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    def expire_leases(self):
+        now = time.monotonic()
+        for session_id, lease in list(self.leases.items()):
+            if not lease["active"] and now - lease["last_used"] > self.idle_timeout:
+                del self.leases[session_id]
+                self.discard(lease["kernel_id"])
+
+    def evict_lease(self) -> bool:
+        idle = [
+            (lease["last_used"], session_id)
+            for session_id, lease in self.leases.items()
+            if not lease["active"]
+        ]
+        if not idle:
+            return False
+
+        _, session_id = min(idle)
+        self.discard(self.leases.pop(session_id)["kernel_id"])
+        return True
+
+    async def acquire(self, session_id: Optional[str] = None) -> str:
+        self.ensure_maintenance()
+
+        while True:
+            start = False
+            async with self.lock:
+                self.expire_leases()
+
+                lease = self.leases.get(session_id) if session_id else None
+                if lease is not None:
+                    lease["active"] += 1
+                    kernel_id = lease["kernel_id"]
+                elif self.ready:
+                    kernel_id = self.ready.pop()
+                elif self.kernels < self.max_kernels or self.evict_lease():
+                    self.kernels += 1
+                    start = True
+                else:
+                    raise RuntimeError("Maximum number of Jupyter kernels reached")
+
+            if start:
+                try:
+                    kernel_id = await self.start_kernel()
+                except Exception:
+                    self.kernels -= 1
+                    raise
+            elif not await self.is_alive(kernel_id):
+                # Culled by the server or crashed, replace it
+                async with self.lock:
+                    if lease is not None and self.leases.get(session_id) is lease:
+                        del self.leases[session_id]
+                    self.discard(kernel_id)
+                continue
+
+            if lease is None and self.persist and session_id:
+                async with self.lock:
+                    self.leases[session_id] = {
+                        "kernel_id": kernel_id,
+                        "last_used": time.monotonic(),
+                        "active": 1,
+                    }
+
+            self.wakeup.set()
+            return kernel_id
+
+    async def release(
+        self, session_id: Optional[str], kernel_id: str, failed: bool = False
+    ):
+        async with self.lock:
+            lease = self.leases.get(session_id) if session_id else None
+            if lease is not None and lease["kernel_id"] == kernel_id:
+                lease["active"] -= 1
+                lease["last_used"] = time.monotonic()
+                if failed:
+                    del self.leases[session_id]
+                    self.discard(kernel_id)
+            else:
+                self.discard(kernel_id)
+
+        self.wakeup.set()
+
+    async def refill(self):
+        while True:
+            async with self.lock:
+                if len(self.ready) >= self.size or self.kernels >= self.max_kernels:
+                    return
+                self.kernels += 1
+
+            try:
+                kernel_id = await self.start_kernel()
+            except Exception as err:
+                self.kernels -= 1
+                logger.warning("start kernel failed, %s", err)
+                return
+
+            async with self.lock:
+                self.ready.append(kernel_id)
+
+    def ensure_maintenance(self):
+        if self.maintenance_task is None or self.maintenance_task.done():
+            self.maintenance_task = asyncio.create_task(self.maintain())
+
+    async def maintain(self):
+        # Start spare kernels after each lease and shut down idle ones
+        while True:
+            async with self.lock:
+                self.expire_leases()
+            await self.refill()
+
+            try:
+                await asyncio.wait_for(
+                    self.wakeup.wait(), timeout=min(max(self.idle_timeout, 1), 60)
+                )
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+
+    async def execute(
+        self, code: str, session_id: Optional[str] = None, timeout: int = 60
+    ) -> dict:
+        kernel_id = None
+        failed = False
+        try:
+            kernel_id = await self.acquire(session_id)
+            executor = JupyterCodeExecuter(
+                self.base_url,
+                code,
+                self.token,
+                self.password,
+                timeout,
+                session=await self.get_session(),
+                kernel_id=kernel_id,
+            )
+            await executor.execute_code()
+            if executor.timed_out:
+                await self.interrupt_kernel(kernel_id)
+            return executor.result.model_dump()
+        except Exception as err:
+            logger.exception("execute code failed, %s", err)
+            failed = True
+            if isinstance(err, aiohttp.ClientResponseError) and err.status in (
+                401,
+                403,
+            ):
+                # The login expired, sign in again on the next call
+                await self.reset_session()
+            return ResultModel(stderr=f"Error: {err}").model_dump()
+        finally:
+            if kernel_id:
+                await self.release(session_id, kernel_id, failed)
+
+    async def close(self):
+        if self.maintenance_task is not None:
+            self.maintenance_task.cancel()
+
+        async with self.lock:
+            kernel_ids = self.ready + [
+                lease["kernel_id"] for lease in self.leases.values()
+            ]
+            self.ready = []
+            self.leases = {}
+
+        await asyncio.gather(
+            *[self.shutdown_kernel(kernel_id) for kernel_id in kernel_ids],
+            *self.tasks,
+            return_exceptions=True,
+        )
+        await self.reset_session()
+
+
+# Kernel pools by Jupyter server URL
+JUPYTER_KERNEL_POOLS: dict[str, JupyterKernelPool] = {}
+# Pools being closed after a credentials change
+RETIRED_JUPYTER_KERNEL_POOLS = set()
+
+
+def get_jupyter_kernel_pool(
+    base_url: str, token: str = "", password: str = ""
+) -> JupyterKernelPool:
+    token, password = token or "", password or ""
+
+    pool = JUPYTER_KERNEL_POOLS.get(base_url)
+    if pool is not None and (pool.token, pool.password) != (token, password):
+        # Credentials changed, retire the kernels started with the old ones
+        task = asyncio.create_task(pool.close())
+        RETIRED_JUPYTER_KERNEL_POOLS.add(task)
+        task.add_done_callback(RETIRED_JUPYTER_KERNEL_POOLS.discard)
+        pool = None
+
+    if pool is None:
+        pool = JupyterKernelPool(
+            base_url,
+            token,
+            password,
+            size=JUPYTER_KERNEL_POOL_SIZE,
+            max_kernels=JUPYTER_KERNEL_POOL_MAX_KERNELS,
+            idle_timeout=JUPYTER_KERNEL_IDLE_TIMEOUT,
+            persist=ENABLE_JUPYTER_KERNEL_PERSISTENCE,
+        )
+        JUPYTER_KERNEL_POOLS[base_url] = pool
+    return pool
+
+
+async def close_jupyter_kernel_pools():
+    pools = list(JUPYTER_KERNEL_POOLS.values())
+    JUPYTER_KERNEL_POOLS.clear()
+    await asyncio.gather(*[pool.close() for pool in pools], return_exceptions=True)
+
+
 async def execute_code_jupyter(
-    base_url: str, code: str, token: str = "", password: str = "", timeout: int = 60
+    base_url: str,
+    code: str,
+    token: str = "",
+    password: str = "",
+    timeout: int = 60,
+    session_id: Optional[str] = None,
 ) -> dict:
+    if JUPYTER_KERNEL_POOL_SIZE > 0:
+        pool = get_jupyter_kernel_pool(base_url, token, password)
+        return await pool.execute(code, session_id, timeout)
+
     async with JupyterCodeExecuter(
         base_url, code, token, password, timeout
     ) as executor:
@@ -1,17 +1,32 @@
 import inspect
 import logging
+import time
 
 from open_webui.utils.plugin import (
     load_function_module_by_id,
     get_function_module_from_cache,
 )
 from open_webui.models.functions import Functions
+from open_webui.utils.cache import get_cache_versions
 from open_webui.env import SRC_LOG_LEVELS
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
 
+# Resolved filter chains are dropped when any of these caches changes
+FILTER_CHAIN_CACHES = ("models", "functions")
+
+# Maximum number of resolved filter chains kept per worker
+FILTER_CHAIN_CACHE_SIZE = 1000
+
+# Prepared filter pipelines are invalidated when any of these caches changes
+FILTER_PIPELINE_CACHES = ("functions", "valves")
+
+# Minimum number of seconds between valve change checks of a prepared pipeline
+FILTER_PIPELINE_REFRESH_INTERVAL = 1
+
+
 def get_function_module(request, function_id, load_from_db=True):
     """
     Get the function module by its ID.
@@ -22,22 +37,22 @@ def get_function_module(request, function_id, load_from_db=True):
     return function_module
 
 
-def get_sorted_filter_ids(request, model: dict, enabled_filter_ids: list = None):
+def resolve_sorted_filter_functions(request, model: dict, enabled_filter_ids=None):
+    # Load all active filters and their valves at once
+    functions = {
+        function.id: function
+        for function in Functions.get_functions(active_only=True, include_valves=True)
+        if function.type == "filter"
+    }
+
     def get_priority(function_id):
-        function = Functions.get_function_by_id(function_id)
-        if function is not None:
-            valves = Functions.get_function_valves_by_id(function_id)
-            return valves.get("priority", 0) if valves else 0
-        return 0
+        valves = functions[function_id].valves
+        return valves.get("priority", 0) if valves else 0
 
-    filter_ids = [function.id for function in Functions.get_global_filter_functions()]
+    filter_ids = [function.id for function in functions.values() if function.is_global]
     if "info" in model and "meta" in model["info"]:
         filter_ids.extend(model["info"]["meta"].get("filterIds", []))
         filter_ids = list(set(filter_ids))
-    active_filter_ids = [
-        function.id
-        for function in Functions.get_functions_by_type("filter", active_only=True)
-    ]
 
     def get_active_status(filter_id):
         function_module = get_function_module(request, filter_id)
@@ -47,58 +62,121 @@ def get_sorted_filter_ids(request, model: dict, enabled_filter_ids: list = None)
 
         return True
 
-    active_filter_ids = [
-        filter_id for filter_id in active_filter_ids if get_active_status(filter_id)
+    filter_ids = [
+        filter_id
+        for filter_id in filter_ids
+        if filter_id in functions and get_active_status(filter_id)
     ]
-
-    filter_ids = [fid for fid in filter_ids if fid in active_filter_ids]
     filter_ids.sort(key=get_priority)
 
-    return filter_ids
+    return [functions[filter_id] for filter_id in filter_ids]
 
 
-async def process_filter_functions(
-    request, filter_functions, filter_type, form_data, extra_params
+async def get_sorted_filter_functions(
+    request, model: dict, enabled_filter_ids: list = None
 ):
-    skip_files = None
+    """
+    Get the filter functions that apply to a model, sorted by priority.
+
+    Resolved filter chains are cached per model and enabled filter set, and
+    dropped whenever models or functions (including their valves) change.
+    """
+    version = await get_cache_versions(request.app, *FILTER_CHAIN_CACHES)
+
+    cache = getattr(request.app.state, "FILTER_CHAINS", None)
+    if (
+        cache is None
+        or cache["version"] != version
+        or len(cache["chains"]) >= FILTER_CHAIN_CACHE_SIZE
+    ):
+        cache = {"version": version, "chains": {}}
+        request.app.state.FILTER_CHAINS = cache
+
+    key = (
+        model.get("id"),
+        tuple(((model.get("info") or {}).get("meta") or {}).get("filterIds", [])),
+        tuple(sorted(set(enabled_filter_ids or []))),
+    )
+    if key not in cache["chains"]:
+        cache["chains"][key] = resolve_sorted_filter_functions(
+            request, model, enabled_filter_ids
+        )
+
+    return cache["chains"][key]
+
+
+async def get_sorted_filter_ids(request, model: dict, enabled_filter_ids: list = None):
+    return [
+        function.id
+        for function in await get_sorted_filter_functions(
+            request, model, enabled_filter_ids
+        )
+    ]
+
+
+class FilterPipeline:
+    """
+    Filter functions prepared once per request.
+
+    Modules, valves, handler signatures and all parameters other than the
+    payload are resolved up front, so running the pipeline (e.g. for every
+    streamed chunk) only calls the handlers. The pipeline is prepared again
+    when function or user valves change.
+    """
+
+    def __init__(self, request, filter_functions, filter_type, extra_params):
+        self.request = request
+        self.filter_functions = filter_functions
+        self.filter_type = filter_type
+        self.extra_params = extra_params
 
-    for function in filter_functions:
-        filter = function
-        filter_id = function.id
-        if not filter:
-            continue
+        self.filters = []
+        self.skip_files = None
+        self.version = None
+        self.checked_at = 0
 
-        function_module = get_function_module(
-            request, filter_id, load_from_db=(filter_type != "stream")
+    async def prepare(self):
+        self.version = await get_cache_versions(
+            self.request.app, *FILTER_PIPELINE_CACHES
         )
-        # Prepare handler function
-        handler = getattr(function_module, filter_type, None)
-        if not handler:
-            continue
-
-        # Check if the function has a file_handler variable
-        if filter_type == "inlet" and hasattr(function_module, "file_handler"):
-            skip_files = function_module.file_handler
-
-        # Apply valves to the function
-        if hasattr(function_module, "valves") and hasattr(function_module, "Valves"):
-            valves = Functions.get_function_valves_by_id(filter_id)
-            function_module.valves = function_module.Valves(
-                **(valves if valves else {})
+        self.checked_at = time.monotonic()
+
+        self.filters = []
+        self.skip_files = None
+
+        for function in self.filter_functions:
+            if not function:
+                continue
+
+            filter_id = function.id
+
+            function_module = get_function_module(
+                self.request, filter_id, load_from_db=(self.filter_type != "stream")
             )
+            # Prepare handler function
+            handler = getattr(function_module, self.filter_type, None)
+            if not handler:
+                continue
 
-        try:
-            # Prepare parameters
-            sig = inspect.signature(handler)
+            # Check if the function has a file_handler variable
+            if self.filter_type == "inlet" and hasattr(function_module, "file_handler"):
+                self.skip_files = function_module.file_handler
 
-            params = {"body": form_data}
-            if filter_type == "stream":
-                params = {"event": form_data}
+            # Apply valves to the function
+            if hasattr(function_module, "valves") and hasattr(
+                function_module, "Valves"
+            ):
+                valves = Functions.get_function_valves_by_id(filter_id)
+                function_module.valves = function_module.Valves(
+                    **(valves if valves else {})
+                )
 
-            params = params | {
+            # Prepare parameters
+            sig = inspect.signature(handler)
+            params = {
                 k: v
                 for k, v in {
-                    **extra_params,
+                    **self.extra_params,
                     "__id__": filter_id,
                 }.items()
                 if k in sig.parameters
@@ -108,29 +186,71 @@ async def process_filter_functions(
             if "__user__" in sig.parameters:
                 if hasattr(function_module, "UserValves"):
                     try:
-                        params["__user__"]["valves"] = function_module.UserValves(
-                            **Functions.get_user_valves_by_id_and_user_id(
-                                filter_id, params["__user__"]["id"]
-                            )
-                        )
+                        params["__user__"] = {
+                            **params["__user__"],
+                            "valves": function_module.UserValves(
+                                **Functions.get_user_valves_by_id_and_user_id(
+                                    filter_id, params["__user__"]["id"]
+                                )
+                            ),
+                        }
                     except Exception as e:
                         log.exception(f"Failed to get user values: {e}")
 
-            # Execute handler
-            if inspect.iscoroutinefunction(handler):
-                form_data = await handler(**params)
-            else:
-                form_data = handler(**params)
+            self.filters.append(
+                (filter_id, handler, params, inspect.iscoroutinefunction(handler))
+            )
+
+        return self
+
+    async def refresh(self):
+        now = time.monotonic()
+        if now - self.checked_at < FILTER_PIPELINE_REFRESH_INTERVAL:
+            return
+
+        self.checked_at = now
+        version = await get_cache_versions(self.request.app, *FILTER_PIPELINE_CACHES)
+        if version != self.version:
+            log.debug(f"Valves changed, preparing {self.filter_type} filters again")
+            await self.prepare()
+
+    async def run(self, form_data):
+        await self.refresh()
+
+        payload_key = "event" if self.filter_type == "stream" else "body"
+        for filter_id, handler, params, is_coroutine in self.filters:
+            try:
+                # Execute handler
+                if is_coroutine:
+                    form_data = await handler(**{payload_key: form_data, **params})
+                else:
+                    form_data = handler(**{payload_key: form_data, **params})
+
+            except Exception as e:
+                log.debug(f"Error in {self.filter_type} handler {filter_id}: {e}")
+                raise e
+
+        # Handle file cleanup for inlet
+        if self.skip_files:
+            if "files" in form_data.get("metadata", {}):
+                del form_data["metadata"]["files"]
+            if "files" in form_data:
+                del form_data["files"]
 
-        except Exception as e:
-            log.debug(f"Error in {filter_type} handler {filter_id}: {e}")
-            raise e
+        return form_data, {}
 
-    # Handle file cleanup for inlet
-    if skip_files:
-        if "files" in form_data.get("metadata", {}):
-            del form_data["metadata"]["files"]
-        if "files" in form_data:
-            del form_data["files"]
 
-    return form_data, {}
+async def get_filter_pipeline(
+    request, filter_functions, filter_type, extra_params
+) -> FilterPipeline:
+    pipeline = FilterPipeline(request, filter_functions, filter_type, extra_params)
+    return await pipeline.prepare()
+
+
+async def process_filter_functions(
+    request, filter_functions, filter_type, form_data, extra_params
+):
+    pipeline = await get_filter_pipeline(
+        request, filter_functions, filter_type, extra_params
+    )
+    return await pipeline.run(form_data)
@@ -14,9 +14,9 @@ import html
 import inspect
 import re
 import ast
+import weakref
 
 from uuid import uuid4
-from concurrent.futures import ThreadPoolExecutor
 
 
 from fastapi import Request, HTTPException
@@ -55,7 +55,6 @@ from open_webui.utils.webhook import post_webhook
 
 
 from open_webui.models.users import UserModel
-from open_webui.models.functions import Functions
 from open_webui.models.models import Models
 
 from open_webui.retrieval.utils import get_sources_from_items
@@ -81,10 +80,12 @@ from open_webui.utils.misc import (
 from open_webui.utils.tools import get_tools
 from open_webui.utils.plugin import load_function_module_by_id
 from open_webui.utils.filter import (
-    get_sorted_filter_ids,
+    get_sorted_filter_functions,
+    get_filter_pipeline,
     process_filter_functions,
 )
 from open_webui.utils.code_interpreter import execute_code_jupyter
+from open_webui.utils.stages import Stage, run_stages, format_stage_timings
 from open_webui.utils.payload import apply_system_prompt_to_body
 
 
@@ -99,6 +100,9 @@ from open_webui.env import (
     GLOBAL_LOG_LEVEL,
     CHAT_RESPONSE_STREAM_DELTA_CHUNK_SIZE,
     CHAT_RESPONSE_MAX_TOOL_CALL_RETRIES,
+    CHAT_BACKGROUND_TASKS_MAX_CONCURRENCY,
+    CHAT_PREPROCESSING_STAGE_TIMEOUT,
+    CHAT_PREPROCESSING_TIMEOUT,
     BYPASS_MODEL_ACCESS_CONTROL,
     ENABLE_REALTIME_CHAT_SAVE,
     ENABLE_QUERIES_CACHE,
@@ -111,6 +115,23 @@ log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
 
+# Details blocks and images are removed from messages sent to the task model
+BACKGROUND_TASK_CONTENT_SCRUB_PATTERN = re.compile(
+    r"<details\b[^>]*>.*?<\/details>|!\[.*?\]\(.*?\)", flags=re.S | re.I
+)
+
+# Post-response task slots by user id, dropped once no task holds them
+BACKGROUND_TASK_SEMAPHORES = weakref.WeakValueDictionary()
+
+
+def get_background_task_semaphore(user_id: str) -> asyncio.Semaphore:
+    semaphore = BACKGROUND_TASK_SEMAPHORES.get(user_id)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(CHAT_BACKGROUND_TASKS_MAX_CONCURRENCY)
+        BACKGROUND_TASK_SEMAPHORES[user_id] = semaphore
+    return semaphore
+
+
 DEFAULT_REASONING_TAGS = [
     ("<think>", "</think>"),
     ("<thinking>", "</thinking>"),
@@ -321,9 +342,7 @@ async def chat_completion_tools_handler(
     return body, {"sources": sources}
 
 
-async def chat_memory_handler(
-    request: Request, form_data: dict, extra_params: dict, user
-):
+async def get_memory_context(request: Request, form_data: dict, user) -> str:
     try:
         results = await query_memory(
             request,
@@ -353,13 +372,23 @@ async def chat_memory_handler(
 
                 user_context += f"{doc_idx + 1}. [{created_at_date}] {doc}\n"
 
+    return user_context
+
+
+def apply_memory_context(form_data: dict, user_context: str) -> dict:
     form_data["messages"] = add_or_update_system_message(
         f"User Context:\n{user_context}\n", form_data["messages"], append=True
     )
-
     return form_data
 
 
+async def chat_memory_handler(
+    request: Request, form_data: dict, extra_params: dict, user
+):
+    user_context = await get_memory_context(request, form_data, user)
+    return apply_memory_context(form_data, user_context)
+
+
 async def chat_web_search_handler(
     request: Request, form_data: dict, extra_params: dict, user
 ):
@@ -523,9 +552,9 @@ async def chat_web_search_handler(
     return form_data
 
 
-async def chat_image_generation_handler(
+async def get_image_generation_context(
     request: Request, form_data: dict, extra_params: dict, user
-):
+) -> str:
     __event_emitter__ = extra_params["__event_emitter__"]
     await __event_emitter__(
         {
@@ -616,6 +645,16 @@ async def chat_image_generation_handler(
 
         system_message_content = "<context>Unable to generate an image, tell the user that an error occurred</context>"
 
+    return system_message_content
+
+
+async def chat_image_generation_handler(
+    request: Request, form_data: dict, extra_params: dict, user
+):
+    system_message_content = await get_image_generation_context(
+        request, form_data, extra_params, user
+    )
+
     if system_message_content:
         form_data["messages"] = add_or_update_system_message(
             system_message_content, form_data["messages"]
@@ -624,44 +663,57 @@ async def chat_image_generation_handler(
     return form_data
 
 
-async def chat_completion_files_handler(
-    request: Request, body: dict, extra_params: dict, user: UserModel
-) -> tuple[dict, dict[str, list]]:
-    __event_emitter__ = extra_params["__event_emitter__"]
-    sources = []
+async def generate_retrieval_queries(
+    request: Request, body: dict, user: UserModel
+) -> list[str]:
+    queries = []
+    try:
+        queries_response = await generate_queries(
+            request,
+            {
+                "model": body["model"],
+                "messages": body["messages"],
+                "type": "retrieval",
+            },
+            user,
+        )
+        queries_response = queries_response["choices"][0]["message"]["content"]
 
-    if files := body.get("metadata", {}).get("files", None):
-        queries = []
         try:
-            queries_response = await generate_queries(
-                request,
-                {
-                    "model": body["model"],
-                    "messages": body["messages"],
-                    "type": "retrieval",
-                },
-                user,
-            )
-            queries_response = queries_response["choices"][0]["message"]["content"]
+            bracket_start = queries_response.find("{")
+            bracket_end = queries_response.rfind("}") + 1
 
-            try:
-                bracket_start = queries_response.find("{")
-                bracket_end = queries_response.rfind("}") + 1
+            if bracket_start == -1 or bracket_end == -1:
+                raise Exception("No JSON object found in the response")
 
-                if bracket_start == -1 or bracket_end == -1:
-                    raise Exception("No JSON object found in the response")
+            queries_response = queries_response[bracket_start:bracket_end]
+            queries_response = json.loads(queries_response)
+        except Exception as e:
+            queries_response = {"queries": [queries_response]}
 
-                queries_response = queries_response[bracket_start:bracket_end]
-                queries_response = json.loads(queries_response)
-            except Exception as e:
-                queries_response = {"queries": [queries_response]}
+        queries = queries_response.get("queries", [])
+    except:
+        pass
 
-            queries = queries_response.get("queries", [])
-        except:
-            pass
+    if len(queries) == 0:
+        queries = [get_last_user_message(body["messages"])]
+
+    return queries
 
-        if len(queries) == 0:
-            queries = [get_last_user_message(body["messages"])]
+
+async def chat_completion_files_handler(
+    request: Request,
+    body: dict,
+    extra_params: dict,
+    user: UserModel,
+    queries: Optional[list[str]] = None,
+) -> tuple[dict, dict[str, list]]:
+    __event_emitter__ = extra_params["__event_emitter__"]
+    sources = []
+
+    if files := body.get("metadata", {}).get("files", None):
+        if not queries:
+            queries = await generate_retrieval_queries(request, body, user)
 
         await __event_emitter__(
             {
@@ -675,36 +727,34 @@ async def chat_completion_files_handler(
         )
 
         try:
-            # Offload get_sources_from_items to a separate thread
-            loop = asyncio.get_running_loop()
-            with ThreadPoolExecutor() as executor:
-                sources = await loop.run_in_executor(
-                    executor,
-                    lambda: get_sources_from_items(
-                        request=request,
-                        items=files,
-                        queries=queries,
-                        embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
-                            query, prefix=prefix, user=user
-                        ),
-                        k=request.app.state.config.TOP_K,
-                        reranking_function=(
-                            (
-                                lambda sentences: request.app.state.RERANKING_FUNCTION(
-                                    sentences, user=user
-                                )
+            # Offload get_sources_from_items to the shared thread pool instead
+            # of spinning up an executor per chat turn
+            sources = await asyncio.to_thread(
+                lambda: get_sources_from_items(
+                    request=request,
+                    items=files,
+                    queries=queries,
+                    embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
+                        query, prefix=prefix, user=user
+                    ),
+                    k=request.app.state.config.TOP_K,
+                    reranking_function=(
+                        (
+                            lambda sentences: request.app.state.RERANKING_FUNCTION(
+                                sentences, user=user
                             )
-                            if request.app.state.RERANKING_FUNCTION
-                            else None
-                        ),
-                        k_reranker=request.app.state.config.TOP_K_RERANKER,
-                        r=request.app.state.config.RELEVANCE_THRESHOLD,
-                        hybrid_bm25_weight=request.app.state.config.HYBRID_BM25_WEIGHT,
-                        hybrid_search=request.app.state.config.ENABLE_RAG_HYBRID_SEARCH,
-                        full_context=request.app.state.config.RAG_FULL_CONTEXT,
-                        user=user,
+                        )
+                        if request.app.state.RERANKING_FUNCTION
+                        else None
                     ),
-                )
+                    k_reranker=request.app.state.config.TOP_K_RERANKER,
+                    r=request.app.state.config.RELEVANCE_THRESHOLD,
+                    hybrid_bm25_weight=request.app.state.config.HYBRID_BM25_WEIGHT,
+                    hybrid_search=request.app.state.config.ENABLE_RAG_HYBRID_SEARCH,
+                    full_context=request.app.state.config.RAG_FULL_CONTEXT,
+                    user=user,
+                ),
+            )
         except Exception as e:
             log.exception(e)
 
@@ -926,12 +976,9 @@ async def process_chat_payload(request, form_data, user, metadata, model):
         raise e
 
     try:
-        filter_functions = [
-            Functions.get_function_by_id(filter_id)
-            for filter_id in get_sorted_filter_ids(
-                request, model, metadata.get("filter_ids", [])
-            )
-        ]
+        filter_functions = await get_sorted_filter_functions(
+            request, model, metadata.get("filter_ids", [])
+        )
 
         form_data, flags = await process_filter_functions(
             request=request,
@@ -943,39 +990,135 @@ async def process_chat_payload(request, form_data, user, metadata, model):
     except Exception as e:
         raise Exception(f"{e}")
 
-    features = form_data.pop("features", None)
-    if features:
-        if "memory" in features and features["memory"]:
-            form_data = await chat_memory_handler(
-                request, form_data, extra_params, user
+    features = form_data.pop("features", None) or {}
+    tool_ids = form_data.pop("tool_ids", None)
+
+    def get_unique_files(files):
+        return list({json.dumps(f, sort_keys=True): f for f in files}.values())
+
+    # Independent pre-processing steps run concurrently as stages, their
+    # results are applied to the form data in a fixed order afterwards
+    stages = []
+
+    if features.get("memory"):
+        stages.append(
+            Stage(
+                "memory",
+                lambda results: get_memory_context(request, form_data, user),
+                timeout=CHAT_PREPROCESSING_STAGE_TIMEOUT,
+                default="",
             )
+        )
+
+    if features.get("web_search"):
 
-        if "web_search" in features and features["web_search"]:
-            form_data = await chat_web_search_handler(
-                request, form_data, extra_params, user
+        async def web_search_stage(results):
+            search_form_data = await chat_web_search_handler(
+                request, {**form_data, "files": []}, extra_params, user
             )
+            return search_form_data["files"]
+
+        stages.append(
+            Stage(
+                "web_search",
+                web_search_stage,
+                timeout=CHAT_PREPROCESSING_STAGE_TIMEOUT,
+                default=[],
+            )
+        )
 
-        if "image_generation" in features and features["image_generation"]:
-            form_data = await chat_image_generation_handler(
-                request, form_data, extra_params, user
+    if features.get("image_generation"):
+        stages.append(
+            Stage(
+                "image_generation",
+                lambda results: get_image_generation_context(
+                    request, form_data, extra_params, user
+                ),
+                timeout=CHAT_PREPROCESSING_STAGE_TIMEOUT,
+                default="",
             )
+        )
 
-        if "code_interpreter" in features and features["code_interpreter"]:
-            form_data["messages"] = add_or_update_user_message(
-                (
-                    request.app.state.config.CODE_INTERPRETER_PROMPT_TEMPLATE
-                    if request.app.state.config.CODE_INTERPRETER_PROMPT_TEMPLATE != ""
-                    else DEFAULT_CODE_INTERPRETER_PROMPT
+    if form_data.get("files") or features.get("web_search"):
+        stages.append(
+            Stage(
+                "retrieval_queries",
+                lambda results: generate_retrieval_queries(request, form_data, user),
+                # Cached web search queries are reused for retrieval
+                depends_on=(
+                    ("web_search",)
+                    if ENABLE_QUERIES_CACHE and features.get("web_search")
+                    else ()
                 ),
-                form_data["messages"],
+                timeout=CHAT_PREPROCESSING_STAGE_TIMEOUT,
             )
+        )
+
+    if tool_ids:
+
+        async def tools_stage(results):
+            return await get_tools(
+                request,
+                tool_ids,
+                user,
+                {
+                    **extra_params,
+                    "__model__": models[task_model_id],
+                    "__messages__": form_data["messages"],
+                    "__files__": get_unique_files(
+                        [
+                            *form_data.get("files", []),
+                            *(results.get("web_search") or []),
+                        ]
+                    ),
+                },
+            )
+
+        stages.append(
+            Stage(
+                "tools",
+                tools_stage,
+                depends_on=("web_search",) if features.get("web_search") else (),
+                timeout=CHAT_PREPROCESSING_STAGE_TIMEOUT,
+                default={},
+            )
+        )
+
+    stage_results, stage_timings = await run_stages(
+        stages, timeout=CHAT_PREPROCESSING_TIMEOUT
+    )
+    if stage_timings:
+        log.info(f"Chat pre-processing stages: {format_stage_timings(stage_timings)}")
+
+    if features.get("memory"):
+        form_data = apply_memory_context(form_data, stage_results["memory"])
+
+    if features.get("web_search"):
+        form_data["files"] = [
+            *form_data.get("files", []),
+            *stage_results["web_search"],
+        ]
+
+    if stage_results.get("image_generation"):
+        form_data["messages"] = add_or_update_system_message(
+            stage_results["image_generation"], form_data["messages"]
+        )
+
+    if features.get("code_interpreter"):
+        form_data["messages"] = add_or_update_user_message(
+            (
+                request.app.state.config.CODE_INTERPRETER_PROMPT_TEMPLATE
+                if request.app.state.config.CODE_INTERPRETER_PROMPT_TEMPLATE != ""
+                else DEFAULT_CODE_INTERPRETER_PROMPT
+            ),
+            form_data["messages"],
+        )
 
-    tool_ids = form_data.pop("tool_ids", None)
     files = form_data.pop("files", None)
 
     # Remove files duplicates
     if files:
-        files = list({json.dumps(f, sort_keys=True): f for f in files}.values())
+        files = get_unique_files(files)
 
     metadata = {
         **metadata,
@@ -984,28 +1127,13 @@ async def process_chat_payload(request, form_data, user, metadata, model):
     }
     form_data["metadata"] = metadata
 
-    # Server side tools
-    tool_ids = metadata.get("tool_ids", None)
     # Client side tools
     tool_servers = metadata.get("tool_servers", None)
 
     log.debug(f"{tool_ids=}")
     log.debug(f"{tool_servers=}")
 
-    tools_dict = {}
-
-    if tool_ids:
-        tools_dict = await get_tools(
-            request,
-            tool_ids,
-            user,
-            {
-                **extra_params,
-                "__model__": models[task_model_id],
-                "__messages__": form_data["messages"],
-                "__files__": metadata.get("files", []),
-            },
-        )
+    tools_dict = stage_results.get("tools") or {}
 
     if tool_servers:
         for tool_server in tool_servers:
@@ -1038,7 +1166,11 @@ async def process_chat_payload(request, form_data, user, metadata, model):
 
     try:
         form_data, flags = await chat_completion_files_handler(
-            request, form_data, extra_params, user
+            request,
+            form_data,
+            extra_params,
+            user,
+            queries=stage_results.get("retrieval_queries"),
         )
         sources.extend(flags.get("sources", []))
     except Exception as e:
@@ -1131,200 +1263,162 @@ async def process_chat_response(
     request, response, form_data, user, metadata, model, events, tasks
 ):
     async def background_tasks_handler():
+        if not tasks:
+            return
+
         messages_map = Chats.get_messages_map_by_chat_id(metadata["chat_id"])
         message = messages_map.get(metadata["message_id"]) if messages_map else None
+        if not message:
+            return
+
+        # get_message_list creates a new list and messages are copied below, so
+        # removing details tags and files does not affect the stored messages
+        messages = []
+        for item in get_message_list(messages_map, metadata["message_id"]):
+            content = item.get("content", "")
+            if isinstance(content, list):
+                for part in content:
+                    if part.get("type") == "text":
+                        content = part["text"]
+                        break
 
-        if message:
-            message_list = get_message_list(messages_map, metadata["message_id"])
-
-            # Remove details tags and files from the messages.
-            # as get_message_list creates a new list, it does not affect
-            # the original messages outside of this handler
-
-            messages = []
-            for message in message_list:
-                content = message.get("content", "")
-                if isinstance(content, list):
-                    for item in content:
-                        if item.get("type") == "text":
-                            content = item["text"]
-                            break
-
-                if isinstance(content, str):
-                    content = re.sub(
-                        r"<details\b[^>]*>.*?<\/details>|!\[.*?\]\(.*?\)",
-                        "",
-                        content,
-                        flags=re.S | re.I,
-                    ).strip()
-
-                messages.append(
-                    {
-                        **message,
-                        "role": message.get(
-                            "role", "assistant"
-                        ),  # Safe fallback for missing role
-                        "content": content,
-                    }
-                )
-
-            if tasks and messages:
-                if (
-                    TASKS.FOLLOW_UP_GENERATION in tasks
-                    and tasks[TASKS.FOLLOW_UP_GENERATION]
-                ):
-                    res = await generate_follow_ups(
-                        request,
-                        {
-                            "model": message["model"],
-                            "messages": messages,
-                            "message_id": metadata["message_id"],
-                            "chat_id": metadata["chat_id"],
-                        },
-                        user,
-                    )
-
-                    if res and isinstance(res, dict):
-                        if len(res.get("choices", [])) == 1:
-                            follow_ups_string = (
-                                res.get("choices", [])[0]
-                                .get("message", {})
-                                .get("content", "")
-                            )
-                        else:
-                            follow_ups_string = ""
-
-                        follow_ups_string = follow_ups_string[
-                            follow_ups_string.find("{") : follow_ups_string.rfind("}")
-                            + 1
-                        ]
-
-                        try:
-                            follow_ups = json.loads(follow_ups_string).get(
-                                "follow_ups", []
-                            )
-
-                            Chats.upsert_message_to_chat_by_id_and_message_id(
-                                metadata["chat_id"],
-                                metadata["message_id"],
-                                {
-                                    "followUps": follow_ups,
-                                },
-                            )
-
-                            await event_emitter(
-                                {
-                                    "type": "chat:message:follow_ups",
-                                    "data": {
-                                        "follow_ups": follow_ups,
-                                    },
-                                }
-                            )
-                        except Exception as e:
-                            pass
-
-                if TASKS.TITLE_GENERATION in tasks:
-                    user_message = get_last_user_message(messages)
-                    if user_message and len(user_message) > 100:
-                        user_message = user_message[:100] + "..."
-
-                    if tasks[TASKS.TITLE_GENERATION]:
+            if isinstance(content, str):
+                content = BACKGROUND_TASK_CONTENT_SCRUB_PATTERN.sub("", content).strip()
 
-                        res = await generate_title(
-                            request,
-                            {
-                                "model": message["model"],
-                                "messages": messages,
-                                "chat_id": metadata["chat_id"],
-                            },
-                            user,
-                        )
-
-                        if res and isinstance(res, dict):
-                            if len(res.get("choices", [])) == 1:
-                                title_string = (
-                                    res.get("choices", [])[0]
-                                    .get("message", {})
-                                    .get(
-                                        "content", message.get("content", user_message)
-                                    )
-                                )
-                            else:
-                                title_string = ""
+            messages.append(
+                {
+                    **item,
+                    "role": item.get(
+                        "role", "assistant"
+                    ),  # Safe fallback for missing role
+                    "content": content,
+                }
+            )
 
-                            title_string = title_string[
-                                title_string.find("{") : title_string.rfind("}") + 1
-                            ]
+        if not messages:
+            return
 
-                            try:
-                                title = json.loads(title_string).get(
-                                    "title", user_message
-                                )
-                            except Exception as e:
-                                title = ""
+        task_form_data = {
+            "model": message["model"],
+            "messages": messages,
+            "chat_id": metadata["chat_id"],
+        }
+        semaphore = get_background_task_semaphore(user.id)
 
-                            if not title:
-                                title = messages[0].get("content", user_message)
+        def get_response_json(res) -> Optional[dict]:
+            if not res or not isinstance(res, dict):
+                return None
 
-                            Chats.update_chat_title_by_id(metadata["chat_id"], title)
+            if len(res.get("choices", [])) == 1:
+                content = res["choices"][0].get("message", {}).get("content", "")
+            else:
+                content = ""
 
-                            await event_emitter(
-                                {
-                                    "type": "chat:title",
-                                    "data": title,
-                                }
-                            )
-                    elif len(messages) == 2:
-                        title = messages[0].get("content", user_message)
+            content = content[content.find("{") : content.rfind("}") + 1]
+            try:
+                return json.loads(content)
+            except Exception:
+                return {}
+
+        async def follow_ups_task():
+            async with semaphore:
+                res = await generate_follow_ups(
+                    request,
+                    {**task_form_data, "message_id": metadata["message_id"]},
+                    user,
+                )
 
-                        Chats.update_chat_title_by_id(metadata["chat_id"], title)
+            data = get_response_json(res)
+            if data and "follow_ups" in data:
+                return data["follow_ups"]
+            return None
+
+        async def title_task():
+            user_message = get_last_user_message(messages)
+            if user_message and len(user_message) > 100:
+                user_message = user_message[:100] + "..."
+
+            if not tasks[TASKS.TITLE_GENERATION]:
+                if len(messages) == 2:
+                    return messages[0].get("content", user_message)
+                return None
+
+            async with semaphore:
+                res = await generate_title(request, task_form_data, user)
+
+            data = get_response_json(res)
+            if data is None:
+                return None
+
+            title = data.get("title", user_message) if data else ""
+            if not title:
+                title = messages[0].get("content", user_message)
+            return title
+
+        async def tags_task():
+            async with semaphore:
+                res = await generate_chat_tags(request, task_form_data, user)
+
+            data = get_response_json(res)
+            if data and "tags" in data:
+                return data["tags"]
+            return None
+
+        async def no_task():
+            return None
+
+        # The task model calls are independent, run them concurrently
+        follow_ups, title, tags = await asyncio.gather(
+            (follow_ups_task() if tasks.get(TASKS.FOLLOW_UP_GENERATION) else no_task()),
+            title_task() if TASKS.TITLE_GENERATION in tasks else no_task(),
+            tags_task() if tasks.get(TASKS.TAGS_GENERATION) else no_task(),
+            return_exceptions=True,
+        )
 
-                        await event_emitter(
-                            {
-                                "type": "chat:title",
-                                "data": message.get("content", user_message),
-                            }
-                        )
+        results = {}
+        for name, result in (
+            ("follow_ups", follow_ups),
+            ("title", title),
+            ("tags", tags),
+        ):
+            if isinstance(result, BaseException):
+                log.warning(f"Background task {name} failed: {result}")
+            elif result is not None:
+                results[name] = result
+
+        if not results:
+            return
+
+        Chats.update_chat_task_results_by_id(
+            metadata["chat_id"], user.id, metadata["message_id"], **results
+        )
 
-                if TASKS.TAGS_GENERATION in tasks and tasks[TASKS.TAGS_GENERATION]:
-                    res = await generate_chat_tags(
-                        request,
-                        {
-                            "model": message["model"],
-                            "messages": messages,
-                            "chat_id": metadata["chat_id"],
+        if event_emitter:
+            if "follow_ups" in results:
+                await event_emitter(
+                    {
+                        "type": "chat:message:follow_ups",
+                        "data": {
+                            "follow_ups": results["follow_ups"],
                         },
-                        user,
-                    )
-
-                    if res and isinstance(res, dict):
-                        if len(res.get("choices", [])) == 1:
-                            tags_string = (
-                                res.get("choices", [])[0]
-                                .get("message", {})
-                                .get("content", "")
-                            )
-                        else:
-                            tags_string = ""
-
-                        tags_string = tags_string[
-                            tags_string.find("{") : tags_string.rfind("}") + 1
-                        ]
+                    }
+                )
 
-                        try:
-                            tags = json.loads(tags_string).get("tags", [])
-                            Chats.update_chat_tags_by_id(
-                                metadata["chat_id"], tags, user
-                            )
+            if "title" in results:
+                await event_emitter(
+                    {
+                        "type": "chat:title",
+                        "data": results["title"],
+                    }
+                )
 
-                            await event_emitter(
-                                {
-                                    "type": "chat:tags",
-                                    "data": tags,
-                                }
-                            )
-                        except Exception as e:
-                            pass
+            if "tags" in results:
+                await event_emitter(
+                    {
+                        "type": "chat:tags",
+                        "data": results["tags"],
+                    }
+                )
 
     event_emitter = None
     event_caller = None
@@ -1514,12 +1608,9 @@ async def process_chat_response(
         "__request__": request,
         "__model__": model,
     }
-    filter_functions = [
-        Functions.get_function_by_id(filter_id)
-        for filter_id in get_sorted_filter_ids(
-            request, model, metadata.get("filter_ids", [])
-        )
-    ]
+    filter_functions = await get_sorted_filter_functions(
+        request, model, metadata.get("filter_ids", [])
+    )
 
     # Streaming response
     if event_emitter and event_caller:
@@ -1970,6 +2061,13 @@ async def process_chat_response(
                     )
                     last_delta_data = None
 
+                    stream_filter_pipeline = await get_filter_pipeline(
+                        request=request,
+                        filter_functions=filter_functions,
+                        filter_type="stream",
+                        extra_params={"__body__": form_data, **extra_params},
+                    )
+
                     async def flush_pending_delta_data(threshold: int = 0):
                         nonlocal delta_count
                         nonlocal last_delta_data
@@ -2002,13 +2100,7 @@ async def process_chat_response(
                         try:
                             data = json.loads(data)
 
-                            data, _ = await process_filter_functions(
-                                request=request,
-                                filter_functions=filter_functions,
-                                filter_type="stream",
-                                form_data=data,
-                                extra_params={"__body__": form_data, **extra_params},
-                            )
+                            data, _ = await stream_filter_pipeline.run(data)
 
                             if data:
                                 if "event" in data:
@@ -2557,6 +2649,7 @@ async def process_chat_response(
                                             else None
                                         ),
                                         request.app.state.config.CODE_INTERPRETER_JUPYTER_TIMEOUT,
+                                        session_id=metadata.get("chat_id"),
                                     )
                                 else:
                                     output = {
@@ -2730,26 +2823,21 @@ async def process_chat_response(
             def wrap_item(item):
                 return f"data: {item}\n\n"
 
+            stream_filter_pipeline = await get_filter_pipeline(
+                request=request,
+                filter_functions=filter_functions,
+                filter_type="stream",
+                extra_params=extra_params,
+            )
+
             for event in events:
-                event, _ = await process_filter_functions(
-                    request=request,
-                    filter_functions=filter_functions,
-                    filter_type="stream",
-                    form_data=event,
-                    extra_params=extra_params,
-                )
+                event, _ = await stream_filter_pipeline.run(event)
 
                 if event:
                     yield wrap_item(json.dumps(event))
 
             async for data in original_generator:
-                data, _ = await process_filter_functions(
-                    request=request,
-                    filter_functions=filter_functions,
-                    filter_type="stream",
-                    form_data=data,
-                    extra_params=extra_params,
-                )
+                data, _ = await stream_filter_pipeline.run(data)
 
                 if data:
                     yield data
@@ -1,7 +1,9 @@
 import time
+import json
 import logging
 import asyncio
 import sys
+from typing import Optional
 
 from aiocache import cached
 from fastapi import Request
@@ -11,6 +13,7 @@ from open_webui.functions import get_function_models
 
 
 from open_webui.models.functions import Functions
+from open_webui.models.groups import Groups
 from open_webui.models.models import Models
 
 
@@ -19,6 +22,7 @@ from open_webui.utils.plugin import (
     get_function_module_from_cache,
 )
 from open_webui.utils.access_control import has_access
+from open_webui.utils.cache import get_cache_versions, bump_cache_versions
 
 
 from open_webui.config import (
@@ -26,7 +30,13 @@ from open_webui.config import (
     DEFAULT_ARENA_MODEL,
 )
 
-from open_webui.env import BYPASS_MODEL_ACCESS_CONTROL, SRC_LOG_LEVELS, GLOBAL_LOG_LEVEL
+from open_webui.env import (
+    BYPASS_MODEL_ACCESS_CONTROL,
+    SRC_LOG_LEVELS,
+    GLOBAL_LOG_LEVEL,
+    REDIS_KEY_PREFIX,
+    MODELS_CACHE_REFRESH_INTERVAL,
+)
 from open_webui.models.users import UserModel
 
 
@@ -35,6 +45,25 @@ log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
 
+REDIS_MODELS_REGISTRY_KEY = f"{REDIS_KEY_PREFIX}:models:registry"
+
+# The model registry is rebuilt whenever any of these caches is invalidated
+MODELS_REGISTRY_CACHES = ("models", "functions", "connections")
+
+
+async def periodic_models_cache_refresh(app):
+    """
+    Refresh the upstream model lists on a schedule, so that requests made
+    after an idle period don't wait for every provider.
+    """
+    while True:
+        await asyncio.sleep(MODELS_CACHE_REFRESH_INTERVAL)
+        await asyncio.gather(
+            ollama.OLLAMA_MODELS_CACHE.refresh(app),
+            openai.OPENAI_MODELS_CACHE.refresh(app),
+        )
+
+
 async def fetch_ollama_models(request: Request, user: UserModel = None):
     raw_ollama_models = await ollama.get_all_models(request, user=user)
     return [
@@ -77,126 +106,129 @@ async def get_all_base_models(request: Request, user: UserModel = None):
     return function_models + openai_models + ollama_models
 
 
-async def get_all_models(request, refresh: bool = False, user: UserModel = None):
-    if (
-        request.app.state.MODELS
-        and request.app.state.BASE_MODELS
-        and (request.app.state.config.ENABLE_BASE_MODELS_CACHE and not refresh)
-    ):
-        base_models = request.app.state.BASE_MODELS
+def get_arena_models(request) -> list[dict]:
+    if len(request.app.state.config.EVALUATION_ARENA_MODELS) > 0:
+        arena_models = request.app.state.config.EVALUATION_ARENA_MODELS
     else:
-        base_models = await get_all_base_models(request, user=user)
-        request.app.state.BASE_MODELS = base_models
+        # Add default arena model
+        arena_models = [DEFAULT_ARENA_MODEL]
 
-    # deep copy the base models to avoid modifying the original list
-    models = [model.copy() for model in base_models]
+    return [
+        {
+            "id": model["id"],
+            "name": model["name"],
+            "info": {
+                "meta": model["meta"],
+            },
+            "object": "model",
+            "created": int(time.time()),
+            "owned_by": "arena",
+            "arena": True,
+        }
+        for model in arena_models
+    ]
 
-    # If there are no models, return an empty list
-    if len(models) == 0:
-        return []
 
-    # Add arena models
-    if request.app.state.config.ENABLE_EVALUATION_ARENA_MODELS:
-        arena_models = []
-        if len(request.app.state.config.EVALUATION_ARENA_MODELS) > 0:
-            arena_models = [
-                {
-                    "id": model["id"],
-                    "name": model["name"],
-                    "info": {
-                        "meta": model["meta"],
-                    },
-                    "object": "model",
-                    "created": int(time.time()),
-                    "owned_by": "arena",
-                    "arena": True,
-                }
-                for model in request.app.state.config.EVALUATION_ARENA_MODELS
-            ]
-        else:
-            # Add default arena model
-            arena_models = [
-                {
-                    "id": DEFAULT_ARENA_MODEL["id"],
-                    "name": DEFAULT_ARENA_MODEL["name"],
-                    "info": {
-                        "meta": DEFAULT_ARENA_MODEL["meta"],
-                    },
-                    "object": "model",
-                    "created": int(time.time()),
-                    "owned_by": "arena",
-                    "arena": True,
+async def get_models_registry(request, version: str) -> Optional[dict]:
+    """
+    Return the materialized model registry for the given version, either from
+    the current worker or from the copy shared by other workers in Redis.
+    """
+    registry = getattr(request.app.state, "MODELS_REGISTRY", None)
+    if registry and registry["version"] == version:
+        return registry
+
+    redis = getattr(request.app.state, "redis", None)
+    if redis is not None:
+        try:
+            data = await redis.get(REDIS_MODELS_REGISTRY_KEY)
+            registry = json.loads(data) if data else None
+            if registry and registry.get("version") == version:
+                request.app.state.MODELS_REGISTRY = registry
+                request.app.state.MODELS = {
+                    model["id"]: model for model in registry["models"]
                 }
-            ]
-        models = models + arena_models
+                request.app.state.MODELS_ACCESS = registry["access"]
+                return registry
+        except Exception as e:
+            log.warning(f"Failed to load models registry from redis: {e}")
 
-    global_action_ids = [
-        function.id for function in Functions.get_global_action_functions()
-    ]
-    enabled_action_ids = [
-        function.id
-        for function in Functions.get_functions_by_type("action", active_only=True)
-    ]
+    return None
 
-    global_filter_ids = [
-        function.id for function in Functions.get_global_filter_functions()
-    ]
-    enabled_filter_ids = [
-        function.id
-        for function in Functions.get_functions_by_type("filter", active_only=True)
-    ]
 
-    custom_models = Models.get_all_models()
+async def set_models_registry(request, registry: dict):
+    request.app.state.MODELS_REGISTRY = registry
+
+    redis = getattr(request.app.state, "redis", None)
+    if redis is not None:
+        try:
+            await redis.set(REDIS_MODELS_REGISTRY_KEY, json.dumps(registry))
+        except Exception as e:
+            log.warning(f"Failed to store models registry in redis: {e}")
+
+
+def merge_custom_models(models: list[dict], custom_models: list) -> list[dict]:
+    """
+    Apply custom model overrides and presets to the base models.
+
+    Models are indexed by id (and by base name for Ollama tags such as
+    'llama3' vs. 'llama3:7b') so merging is linear in the number of models.
+    """
+    models_by_id = {}
+    models_by_base_name = {}
+    ollama_models_by_base_name = {}
+    positions = {}
+
+    def index_model(model):
+        positions[id(model)] = len(positions)
+        models_by_id.setdefault(model["id"], []).append(model)
+        base_name = model["id"].split(":")[0]
+        models_by_base_name.setdefault(base_name, []).append(model)
+        if model.get("owned_by") == "ollama":
+            ollama_models_by_base_name.setdefault(base_name, []).append(model)
+
+    for model in models:
+        index_model(model)
+
+    removed = set()
     for custom_model in custom_models:
         if custom_model.base_model_id is None:
             # Applied directly to a base model
-            for model in models:
-                if custom_model.id == model["id"] or (
-                    model.get("owned_by") == "ollama"
-                    and custom_model.id
-                    == model["id"].split(":")[
-                        0
-                    ]  # Ollama may return model ids in different formats (e.g., 'llama3' vs. 'llama3:7b')
-                ):
-                    if custom_model.is_active:
-                        model["name"] = custom_model.name
-                        model["info"] = custom_model.model_dump()
-
-                        # Set action_ids and filter_ids
-                        action_ids = []
-                        filter_ids = []
-
-                        if "info" in model and "meta" in model["info"]:
-                            action_ids.extend(
-                                model["info"]["meta"].get("actionIds", [])
-                            )
-                            filter_ids.extend(
-                                model["info"]["meta"].get("filterIds", [])
-                            )
-
-                        model["action_ids"] = action_ids
-                        model["filter_ids"] = filter_ids
-                    else:
-                        models.remove(model)
-
-        elif custom_model.is_active and (
-            custom_model.id not in [model["id"] for model in models]
-        ):
+            matches = models_by_id.get(
+                custom_model.id, []
+            ) + ollama_models_by_base_name.get(custom_model.id, [])
+
+            for model in {id(model): model for model in matches}.values():
+                if custom_model.is_active:
+                    model["name"] = custom_model.name
+                    model["info"] = custom_model.model_dump()
+
+                    # Set action_ids and filter_ids
+                    meta = model["info"].get("meta") or {}
+                    model["action_ids"] = list(meta.get("actionIds", []))
+                    model["filter_ids"] = list(meta.get("filterIds", []))
+                else:
+                    removed.add(id(model))
+
+        elif custom_model.is_active and custom_model.id not in models_by_id:
             owned_by = "openai"
             pipe = None
 
             action_ids = []
             filter_ids = []
 
-            for model in models:
-                if (
-                    custom_model.base_model_id == model["id"]
-                    or custom_model.base_model_id == model["id"].split(":")[0]
-                ):
-                    owned_by = model.get("owned_by", "unknown owner")
-                    if "pipe" in model:
-                        pipe = model["pipe"]
-                    break
+            candidates = [
+                model
+                for model in models_by_id.get(custom_model.base_model_id, [])
+                + models_by_base_name.get(custom_model.base_model_id, [])
+                if id(model) not in removed
+            ]
+            if candidates:
+                # Pick the first match in list order, as a linear scan would
+                base_model = min(candidates, key=lambda model: positions[id(model)])
+                owned_by = base_model.get("owned_by", "unknown owner")
+                if "pipe" in base_model:
+                    pipe = base_model["pipe"]
 
             if custom_model.meta:
                 meta = custom_model.meta.model_dump()
@@ -207,20 +239,58 @@ async def get_all_models(request, refresh: bool = False, user: UserModel = None)
                 if "filterIds" in meta:
                     filter_ids.extend(meta["filterIds"])
 
-            models.append(
-                {
-                    "id": f"{custom_model.id}",
-                    "name": custom_model.name,
-                    "object": "model",
-                    "created": custom_model.created_at,
-                    "owned_by": owned_by,
-                    "info": custom_model.model_dump(),
-                    "preset": True,
-                    **({"pipe": pipe} if pipe is not None else {}),
-                    "action_ids": action_ids,
-                    "filter_ids": filter_ids,
-                }
-            )
+            model = {
+                "id": f"{custom_model.id}",
+                "name": custom_model.name,
+                "object": "model",
+                "created": custom_model.created_at,
+                "owned_by": owned_by,
+                "info": custom_model.model_dump(),
+                "preset": True,
+                **({"pipe": pipe} if pipe is not None else {}),
+                "action_ids": action_ids,
+                "filter_ids": filter_ids,
+            }
+            models.append(model)
+            index_model(model)
+
+    return [model for model in models if id(model) not in removed]
+
+
+def build_models_registry(request, base_models: list[dict], version: str) -> dict:
+    # copy the base models to avoid modifying the original list
+    models = [model.copy() for model in base_models]
+
+    # If there are no models, return an empty registry
+    if len(models) == 0:
+        return {"version": version, "models": [], "access": {}}
+
+    # Add arena models
+    if request.app.state.config.ENABLE_EVALUATION_ARENA_MODELS:
+        models = models + get_arena_models(request)
+
+    custom_models = Models.get_all_models()
+    models = merge_custom_models(models, custom_models)
+
+    # Load all functions at once instead of querying them per model
+    functions = {function.id: function for function in Functions.get_functions()}
+
+    global_action_ids = set()
+    enabled_action_ids = set()
+    global_filter_ids = set()
+    enabled_filter_ids = set()
+    for function in functions.values():
+        if not function.is_active:
+            continue
+
+        if function.type == "action":
+            enabled_action_ids.add(function.id)
+            if function.is_global:
+                global_action_ids.add(function.id)
+        elif function.type == "filter":
+            enabled_filter_ids.add(function.id)
+            if function.is_global:
+                global_filter_ids.add(function.id)
 
     # Process action_ids to get the actions
     def get_action_items_from_module(function, module):
@@ -266,50 +336,102 @@ async def get_all_models(request, refresh: bool = False, user: UserModel = None)
             }
         ]
 
-    def get_function_module_by_id(function_id):
-        function_module, _, _ = get_function_module_from_cache(request, function_id)
-        return function_module
+    action_items = {}
+    filter_items = {}
+
+    def get_function_items(function_id, items, get_items_from_module):
+        if function_id not in items:
+            function = functions.get(function_id)
+            if function is None:
+                raise Exception(f"Function not found: {function_id}")
+
+            function_module, _, _ = get_function_module_from_cache(request, function_id)
+            items[function_id] = get_items_from_module(function, function_module)
+        return items[function_id]
+
+    def get_toggle_filter_items_from_module(function, module):
+        if getattr(module, "toggle", None):
+            return get_filter_items_from_module(function, module)
+        return []
 
     for model in models:
         action_ids = [
             action_id
-            for action_id in list(set(model.pop("action_ids", []) + global_action_ids))
+            for action_id in list(set(model.pop("action_ids", [])) | global_action_ids)
             if action_id in enabled_action_ids
         ]
         filter_ids = [
             filter_id
-            for filter_id in list(set(model.pop("filter_ids", []) + global_filter_ids))
+            for filter_id in list(set(model.pop("filter_ids", [])) | global_filter_ids)
             if filter_id in enabled_filter_ids
         ]
 
         model["actions"] = []
         for action_id in action_ids:
-            action_function = Functions.get_function_by_id(action_id)
-            if action_function is None:
-                raise Exception(f"Action not found: {action_id}")
-
-            function_module = get_function_module_by_id(action_id)
             model["actions"].extend(
-                get_action_items_from_module(action_function, function_module)
+                get_function_items(
+                    action_id, action_items, get_action_items_from_module
+                )
             )
 
         model["filters"] = []
         for filter_id in filter_ids:
-            filter_function = Functions.get_function_by_id(filter_id)
-            if filter_function is None:
-                raise Exception(f"Filter not found: {filter_id}")
+            model["filters"].extend(
+                get_function_items(
+                    filter_id, filter_items, get_toggle_filter_items_from_module
+                )
+            )
 
-            function_module = get_function_module_by_id(filter_id)
+    # Precompute the access index used to serve per-user filtered views
+    access = {
+        custom_model.id: {
+            "user_id": custom_model.user_id,
+            "access_control": custom_model.access_control,
+        }
+        for custom_model in custom_models
+    }
 
-            if getattr(function_module, "toggle", None):
-                model["filters"].extend(
-                    get_filter_items_from_module(filter_function, function_module)
-                )
+    return {"version": version, "models": models, "access": access}
+
+
+async def get_all_models(request, refresh: bool = False, user: UserModel = None):
+    if refresh:
+        await bump_cache_versions(request.app, "connections")
+
+    versions = await get_cache_versions(request.app, *MODELS_REGISTRY_CACHES)
+    version = ":".join(str(version) for version in versions)
+    connections_version = versions[MODELS_REGISTRY_CACHES.index("connections")]
+
+    if request.app.state.config.ENABLE_BASE_MODELS_CACHE and not refresh:
+        # Nothing the registry depends on has changed, serve it as is
+        registry = await get_models_registry(request, version)
+        if registry is not None:
+            return list(registry["models"])
+
+    if (
+        request.app.state.BASE_MODELS
+        and (request.app.state.config.ENABLE_BASE_MODELS_CACHE and not refresh)
+        and getattr(request.app.state, "BASE_MODELS_VERSION", None)
+        == connections_version
+    ):
+        base_models = request.app.state.BASE_MODELS
+    else:
+        base_models = await get_all_base_models(request, user=user)
+        request.app.state.BASE_MODELS = base_models
+        request.app.state.BASE_MODELS_VERSION = connections_version
+
+    registry = build_models_registry(request, base_models, version)
+    models = registry["models"]
 
     log.debug(f"get_all_models() returned {len(models)} models")
 
     request.app.state.MODELS = {model["id"]: model for model in models}
-    return models
+    request.app.state.MODELS_ACCESS = registry["access"]
+
+    if request.app.state.config.ENABLE_BASE_MODELS_CACHE:
+        await set_models_registry(request, registry)
+
+    return list(models)
 
 
 def check_model_access(user, model):
@@ -335,12 +457,23 @@ def check_model_access(user, model):
             raise Exception("Model not found")
 
 
-def get_filtered_models(models, user):
+def get_filtered_models(models, user, access_index: Optional[dict] = None):
     # Filter out models that the user does not have access to
     if (
         user.role == "user"
         or (user.role == "admin" and not BYPASS_ADMIN_ACCESS_CONTROL)
     ) and not BYPASS_MODEL_ACCESS_CONTROL:
+        if access_index is None:
+            access_index = {
+                model.id: {
+                    "user_id": model.user_id,
+                    "access_control": model.access_control,
+                }
+                for model in Models.get_all_models()
+            }
+
+        user_group_ids = {group.id for group in Groups.get_groups_by_member_id(user.id)}
+
         filtered_models = []
         for model in models:
             if model.get("arena"):
@@ -350,19 +483,21 @@ def get_filtered_models(models, user):
                     access_control=model.get("info", {})
                     .get("meta", {})
                     .get("access_control", {}),
+                    user_group_ids=user_group_ids,
                 ):
                     filtered_models.append(model)
                 continue
 
-            model_info = Models.get_model_by_id(model["id"])
+            model_info = access_index.get(model["id"])
             if model_info:
                 if (
                     (user.role == "admin" and BYPASS_ADMIN_ACCESS_CONTROL)
-                    or user.id == model_info.user_id
+                    or user.id == model_info["user_id"]
                     or has_access(
                         user.id,
                         type="read",
-                        access_control=model_info.access_control,
+                        access_control=model_info["access_control"],
+                        user_group_ids=user_group_ids,
                     )
                 ):
                     filtered_models.append(model)
@@ -1,20 +1,47 @@
 import os
 import re
+import hashlib
+import marshal
 import subprocess
 import sys
 from importlib import util
 import types
 import tempfile
+import time
 import logging
 
-from open_webui.env import SRC_LOG_LEVELS, PIP_OPTIONS, PIP_PACKAGE_INDEX_OPTIONS
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    PIP_OPTIONS,
+    PIP_PACKAGE_INDEX_OPTIONS,
+    ENABLE_PLUGIN_BYTECODE_CACHE,
+)
+from open_webui.config import CACHE_DIR
 from open_webui.models.functions import Functions
 from open_webui.models.tools import Tools
+from open_webui.utils.cache import bump_cache_versions_nowait
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
 
+PLUGIN_CACHE_DIR = CACHE_DIR / "plugins"
+
+# Compiled tool/function code objects, keyed by the hash of their content
+PLUGIN_CODE_CACHE = {}
+
+# Seconds after a function's `updated_at` before it can be trusted to tell
+# whether the content changed, as saves within the same second share it
+FUNCTION_UPDATED_AT_GRACE = 2
+
+# Cached files of contents no longer used are removed once this old, other
+# workers may still be loading contents that were just written
+PLUGIN_CACHE_MIN_AGE = 60 * 60
+
+# Requirements already installed by this process
+INSTALLED_REQUIREMENTS = set()
+
+
 def extract_frontmatter(content):
     """
     Extract frontmatter as a dictionary from the provided content string.
@@ -68,6 +95,62 @@ def replace_imports(content):
     return content
 
 
+def get_content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def write_cache_file(path, data: bytes):
+    # Write to a temporary file first so concurrent workers never read a partial file
+    try:
+        with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as f:
+            f.write(data)
+        os.replace(f.name, path)
+    except Exception as e:
+        log.warning(f"Failed to write plugin cache file {path}: {e}")
+
+
+def compile_plugin_content(content: str):
+    """
+    Compile the content of a tool or function.
+
+    Code objects are cached in memory by content hash and, when enabled,
+    marshalled to the cache directory so other workers and restarts can skip
+    compilation. The source is kept next to the bytecode and its path is
+    returned to be used as the module's `__file__`.
+    """
+    content_hash = get_content_hash(content)
+
+    PLUGIN_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    source_path = PLUGIN_CACHE_DIR / f"{content_hash}.py"
+    bytecode_path = (
+        PLUGIN_CACHE_DIR / f"{content_hash}.{sys.implementation.cache_tag}.pyc"
+    )
+
+    if not source_path.is_file():
+        write_cache_file(source_path, content.encode("utf-8"))
+
+    code = PLUGIN_CODE_CACHE.get(content_hash)
+    if code is not None:
+        return code, source_path
+
+    if ENABLE_PLUGIN_BYTECODE_CACHE and bytecode_path.is_file():
+        try:
+            with open(bytecode_path, "rb") as f:
+                code = marshal.load(f)
+        except Exception as e:
+            log.warning(f"Failed to load cached bytecode {bytecode_path}: {e}")
+            code = None
+
+    if code is None:
+        code = compile(content, str(source_path), "exec")
+
+        if ENABLE_PLUGIN_BYTECODE_CACHE:
+            write_cache_file(bytecode_path, marshal.dumps(code))
+
+    PLUGIN_CODE_CACHE[content_hash] = code
+    return code, source_path
+
+
 def load_tool_module_by_id(tool_id, content=None):
 
     if content is None:
@@ -88,17 +171,14 @@ def load_tool_module_by_id(tool_id, content=None):
     module = types.ModuleType(module_name)
     sys.modules[module_name] = module
 
-    # Create a temporary file and use it to define `__file__` so
-    # that it works as expected from the module's perspective.
-    temp_file = tempfile.NamedTemporaryFile(delete=False)
-    temp_file.close()
     try:
-        with open(temp_file.name, "w", encoding="utf-8") as f:
-            f.write(content)
-        module.__dict__["__file__"] = temp_file.name
+        code, file_path = compile_plugin_content(content)
+
+        # Define `__file__` so that it works as expected from the module's perspective.
+        module.__dict__["__file__"] = str(file_path)
 
         # Executing the modified content in the created module's namespace
-        exec(content, module.__dict__)
+        exec(code, module.__dict__)
         frontmatter = extract_frontmatter(content)
         log.info(f"Loaded module: {module.__name__}")
 
@@ -111,19 +191,23 @@ def load_tool_module_by_id(tool_id, content=None):
         log.error(f"Error loading module: {tool_id}: {e}")
         del sys.modules[module_name]  # Clean up
         raise e
-    finally:
-        os.unlink(temp_file.name)
 
 
-def load_function_module_by_id(function_id: str, content: str | None = None):
+def load_function_module_by_id(function_id: str, content: str | None = None, app=None):
+    # `app` is given to invalidate the caches built from functions when the
+    # function is written back to the database
     if content is None:
         function = Functions.get_function_by_id(function_id)
         if not function:
             raise Exception(f"Function not found: {function_id}")
         content = function.content
 
-        content = replace_imports(content)
-        Functions.update_function_by_id(function_id, {"content": content})
+        new_content = replace_imports(content)
+        if new_content != content:
+            content = new_content
+            Functions.update_function_by_id(function_id, {"content": content})
+            if app is not None:
+                bump_cache_versions_nowait(app, "functions")
     else:
         frontmatter = extract_frontmatter(content)
         install_frontmatter_requirements(frontmatter.get("requirements", ""))
@@ -132,17 +216,14 @@ def load_function_module_by_id(function_id: str, content: str | None = None):
     module = types.ModuleType(module_name)
     sys.modules[module_name] = module
 
-    # Create a temporary file and use it to define `__file__` so
-    # that it works as expected from the module's perspective.
-    temp_file = tempfile.NamedTemporaryFile(delete=False)
-    temp_file.close()
     try:
-        with open(temp_file.name, "w", encoding="utf-8") as f:
-            f.write(content)
-        module.__dict__["__file__"] = temp_file.name
+        code, file_path = compile_plugin_content(content)
+
+        # Define `__file__` so that it works as expected from the module's perspective.
+        module.__dict__["__file__"] = str(file_path)
 
         # Execute the modified content in the created module's namespace
-        exec(content, module.__dict__)
+        exec(code, module.__dict__)
         frontmatter = extract_frontmatter(content)
         log.info(f"Loaded module: {module.__name__}")
 
@@ -161,71 +242,137 @@ def load_function_module_by_id(function_id: str, content: str | None = None):
         del sys.modules[module_name]
 
         Functions.update_function_by_id(function_id, {"is_active": False})
+        if app is not None:
+            bump_cache_versions_nowait(app, "functions")
         raise e
-    finally:
-        os.unlink(temp_file.name)
 
 
 def get_function_module_from_cache(request, function_id, load_from_db=True):
+    state = request.app.state
+    if not hasattr(state, "FUNCTIONS"):
+        state.FUNCTIONS = {}
+    if not hasattr(state, "FUNCTION_HASHES"):
+        state.FUNCTION_HASHES = {}
+    if not hasattr(state, "FUNCTION_UPDATED_AT"):
+        state.FUNCTION_UPDATED_AT = {}
+
+    content_hash = None
+
     if load_from_db:
-        # Always load from the database by default
+        # Always check the database by default
         # This is useful for hooks like "inlet" or "outlet" where the content might change
         # and we want to ensure the latest content is used.
+        # Only `updated_at` is read, the content is read and hashed when it
+        # may have changed, and the module is reloaded when its hash changed.
 
-        function = Functions.get_function_by_id(function_id)
-        if not function:
+        updated_at = Functions.get_function_updated_at_by_id(function_id)
+        if updated_at is None:
+            raise Exception(f"Function not found: {function_id}")
+
+        checked = state.FUNCTION_UPDATED_AT.get(function_id)
+        if (
+            function_id in state.FUNCTIONS
+            and checked is not None
+            and checked[0] == updated_at
+            and checked[1] >= updated_at + FUNCTION_UPDATED_AT_GRACE
+        ):
+            return state.FUNCTIONS[function_id], None, None
+
+        checked_at = time.time()
+        content = Functions.get_function_content_by_id(function_id)
+        if content is None:
             raise Exception(f"Function not found: {function_id}")
-        content = function.content
 
         new_content = replace_imports(content)
         if new_content != content:
             content = new_content
             # Update the function content in the database
             Functions.update_function_by_id(function_id, {"content": content})
+            bump_cache_versions_nowait(request.app, "functions")
+        else:
+            state.FUNCTION_UPDATED_AT[function_id] = (updated_at, checked_at)
 
+        content_hash = get_content_hash(content)
         if (
-            hasattr(request.app.state, "FUNCTION_CONTENTS")
-            and function_id in request.app.state.FUNCTION_CONTENTS
-        ) and (
-            hasattr(request.app.state, "FUNCTIONS")
-            and function_id in request.app.state.FUNCTIONS
+            function_id in state.FUNCTIONS
+            and state.FUNCTION_HASHES.get(function_id) == content_hash
         ):
-            if request.app.state.FUNCTION_CONTENTS[function_id] == content:
-                return request.app.state.FUNCTIONS[function_id], None, None
+            return state.FUNCTIONS[function_id], None, None
 
         function_module, function_type, frontmatter = load_function_module_by_id(
-            function_id, content
+            function_id, content, app=request.app
         )
     else:
         # Load from cache (e.g. "stream" hook)
         # This is useful for performance reasons
 
-        if (
-            hasattr(request.app.state, "FUNCTIONS")
-            and function_id in request.app.state.FUNCTIONS
-        ):
-            return request.app.state.FUNCTIONS[function_id], None, None
+        if function_id in state.FUNCTIONS:
+            return state.FUNCTIONS[function_id], None, None
 
         function_module, function_type, frontmatter = load_function_module_by_id(
-            function_id
+            function_id, app=request.app
         )
 
-    if not hasattr(request.app.state, "FUNCTIONS"):
-        request.app.state.FUNCTIONS = {}
+    state.FUNCTIONS[function_id] = function_module
+    state.FUNCTION_HASHES[function_id] = content_hash
 
-    if not hasattr(request.app.state, "FUNCTION_CONTENTS"):
-        request.app.state.FUNCTION_CONTENTS = {}
+    return function_module, function_type, frontmatter
 
-    request.app.state.FUNCTIONS[function_id] = function_module
-    request.app.state.FUNCTION_CONTENTS[function_id] = content
 
-    return function_module, function_type, frontmatter
+def prune_plugin_cache(content_hashes: set[str]):
+    """
+    Remove the cached sources and bytecode of the contents that are no longer
+    used by any tool or function.
+    """
+    if not PLUGIN_CACHE_DIR.is_dir():
+        return
+
+    cutoff = time.time() - PLUGIN_CACHE_MIN_AGE
+    for path in PLUGIN_CACHE_DIR.iterdir():
+        if path.name.split(".")[0] in content_hashes:
+            continue
+
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            continue
+
+
+def warm_function_module_cache(request):
+    """
+    Load the modules of all active functions ahead of the first request, and
+    prune the plugin cache down to the contents in use.
+    """
+    for function in Functions.get_functions(active_only=True):
+        try:
+            get_function_module_from_cache(request, function.id)
+        except Exception as e:
+            log.warning(f"Failed to warm up function {function.id}: {e}")
+
+    try:
+        prune_plugin_cache(
+            {
+                get_content_hash(replace_imports(plugin.content))
+                for plugin in [*Functions.get_functions(), *Tools.get_tools()]
+            }
+        )
+    except Exception as e:
+        log.warning(f"Failed to prune the plugin cache: {e}")
 
 
 def install_frontmatter_requirements(requirements: str):
     if requirements:
+        req_list = [
+            req.strip()
+            for req in requirements.split(",")
+            if req.strip() and req.strip() not in INSTALLED_REQUIREMENTS
+        ]
+        if not req_list:
+            log.debug("Requirements already installed.")
+            return
+
         try:
-            req_list = [req.strip() for req in requirements.split(",")]
             log.info(f"Installing requirements: {' '.join(req_list)}")
             subprocess.check_call(
                 [sys.executable, "-m", "pip", "install"]
@@ -233,6 +380,7 @@ def install_frontmatter_requirements(requirements: str):
                 + req_list
                 + PIP_PACKAGE_INDEX_OPTIONS
             )
+            INSTALLED_REQUIREMENTS.update(req_list)
         except Exception as e:
             log.error(f"Error installing packages: {' '.join(req_list)}")
             raise e
@@ -5,7 +5,13 @@ import logging
 
 import redis
 
-from open_webui.env import REDIS_SENTINEL_MAX_RETRY_COUNT
+from open_webui.env import (
+    REDIS_CLUSTER,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_MAX_RETRY_COUNT,
+    REDIS_SENTINEL_PORT,
+    REDIS_URL,
+)
 
 log = logging.getLogger(__name__)
 
@@ -188,6 +194,24 @@ def get_redis_connection(
     return connection
 
 
+def get_shared_redis_connection():
+    """
+    Synchronous connection to the Redis configured in the environment, used by
+    caches shared between workers. None when Redis is not configured.
+    """
+    if not REDIS_URL:
+        return None
+
+    return get_redis_connection(
+        redis_url=REDIS_URL,
+        redis_sentinels=get_sentinels_from_env(
+            REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT
+        ),
+        redis_cluster=REDIS_CLUSTER,
+        decode_responses=True,
+    )
+
+
 def get_sentinels_from_env(sentinel_hosts_env, sentinel_port_env):
     if sentinel_hosts_env:
         sentinel_hosts = sentinel_hosts_env.split(",")
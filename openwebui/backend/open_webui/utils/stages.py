@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class Stage:
+    """
+    A step of a pipeline. `func` receives the results of the stages completed
+    so far and is started as soon as the stages in `depends_on` are done.
+    When the stage fails or exceeds its timeout its result is `default`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[dict], Awaitable[Any]],
+        depends_on: tuple[str, ...] = (),
+        timeout: Optional[float] = None,
+        default: Any = None,
+    ):
+        self.name = name
+        self.func = func
+        self.depends_on = depends_on
+        self.timeout = timeout
+        self.default = default
+
+
+async def run_stages(
+    stages: list[Stage], timeout: Optional[float] = None
+) -> tuple[dict, dict]:
+    """
+    Run the stages concurrently, each one once its dependencies are done.
+
+    :param stages: Stages to run, dependencies must refer to stages in the list
+    :param timeout: Budget in seconds for all stages together (optional)
+    :return: The results and the timings of the stages by name
+    """
+    dependencies = {stage.name: set(stage.depends_on) for stage in stages}
+    for name, depends_on in dependencies.items():
+        missing = depends_on - dependencies.keys()
+        if missing:
+            raise ValueError(f"Stage {name} depends on unknown stages {missing}")
+
+    # Resolve the stages in dependency order to reject cycles up front
+    resolved = set()
+    while len(resolved) < len(dependencies):
+        ready = {
+            name
+            for name, depends_on in dependencies.items()
+            if name not in resolved and depends_on <= resolved
+        }
+        if not ready:
+            raise ValueError(
+                f"Stages have cyclic dependencies: {dependencies.keys() - resolved}"
+            )
+        resolved |= ready
+
+    started_at = time.perf_counter()
+    deadline = started_at + timeout if timeout else None
+
+    results = {}
+    timings = {}
+    tasks: dict[str, asyncio.Task] = {}
+
+    async def run(stage: Stage):
+        if stage.depends_on:
+            await asyncio.gather(*[tasks[name] for name in stage.depends_on])
+
+        stage_started_at = time.perf_counter()
+
+        stage_timeout = stage.timeout
+        if deadline is not None:
+            remaining = max(deadline - stage_started_at, 0)
+            stage_timeout = (
+                min(stage_timeout, remaining) if stage_timeout else remaining
+            )
+
+        status = "ok"
+        try:
+            results[stage.name] = await asyncio.wait_for(
+                stage.func(results), timeout=stage_timeout
+            )
+        except asyncio.TimeoutError:
+            log.warning(f"Stage {stage.name} timed out after {stage_timeout}s")
+            results[stage.name] = stage.default
+            status = "timeout"
+        except Exception as e:
+            log.exception(f"Stage {stage.name} failed: {e}")
+            results[stage.name] = stage.default
+            status = "error"
+
+        timings[stage.name] = {
+            "wait": stage_started_at - started_at,
+            "duration": time.perf_counter() - stage_started_at,
+            "status": status,
+        }
+
+    # Tasks are created before any of them runs, so dependencies can be looked
+    # up regardless of the order of the stages
+    for stage in stages:
+        tasks[stage.name] = asyncio.create_task(run(stage))
+
+    try:
+        await asyncio.gather(*tasks.values())
+    finally:
+        for task in tasks.values():
+            task.cancel()
+
+    return results, timings
+
+
+def format_stage_timings(timings: dict) -> str:
+    return ", ".join(
+        f"{name}={timing['duration']:.3f}s"
+        + (f" (+{timing['wait']:.3f}s wait)" if timing["wait"] >= 0.001 else "")
+        + (f" [{timing['status']}]" if timing["status"] != "ok" else "")
+        for name, timing in timings.items()
+    )
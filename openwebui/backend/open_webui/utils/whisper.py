@@ -0,0 +1,185 @@
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["AUDIO"])
+
+
+class WhisperPoolFullError(Exception):
+    pass
+
+
+##########################################
+#
+# Worker process
+#
+##########################################
+
+# Model kept resident in each worker process
+_model = None
+_pipeline = None
+_batch_size = 1
+
+
+def load_whisper_model(model_kwargs: dict):
+    from faster_whisper import WhisperModel
+
+    try:
+        return WhisperModel(**model_kwargs)
+    except Exception:
+        log.warning(
+            "WhisperModel initialization failed, attempting download with local_files_only=False"
+        )
+        return WhisperModel(**{**model_kwargs, "local_files_only": False})
+
+
+def _init_worker(model_kwargs: dict, batch_size: int):
+    global _model, _pipeline, _batch_size
+
+    _model = load_whisper_model(model_kwargs)
+    _batch_size = batch_size
+
+    if batch_size > 1:
+        from faster_whisper import BatchedInferencePipeline
+
+        _pipeline = BatchedInferencePipeline(model=_model)
+
+
+def _transcribe(file_path: str, options: dict, segment_queue=None) -> dict:
+    try:
+        if _pipeline is not None:
+            segments, info = _pipeline.transcribe(
+                file_path, batch_size=_batch_size, **options
+            )
+        else:
+            segments, info = _model.transcribe(file_path, **options)
+
+        # Segments are decoded lazily, forward each one as soon as it is ready
+        texts = []
+        for segment in segments:
+            texts.append(segment.text)
+            if segment_queue is not None:
+                segment_queue.put(segment.text)
+
+        return {
+            "text": "".join(texts).strip(),
+            "language": info.language,
+            "language_probability": info.language_probability,
+        }
+    finally:
+        if segment_queue is not None:
+            segment_queue.put(None)
+
+
+##########################################
+#
+# Pool
+#
+##########################################
+
+
+class WhisperWorkerPool:
+    """
+    Runs local faster-whisper transcriptions in worker processes so that
+    they are not bound by the GIL of the server process.
+
+    Each worker loads the model once and keeps it resident. At most
+    `workers + queue_size` transcriptions are accepted at a time; further
+    requests wait up to `queue_timeout` seconds for a slot and are rejected
+    with WhisperPoolFullError afterwards.
+    """
+
+    def __init__(
+        self,
+        model_kwargs: dict,
+        workers: int = 1,
+        queue_size: int = 8,
+        queue_timeout: float = 30,
+        batch_size: int = 1,
+    ):
+        workers = max(1, workers)
+
+        if model_kwargs.get("device") == "cpu" and not model_kwargs.get("cpu_threads"):
+            # Share the cores between replicas instead of oversubscribing them
+            model_kwargs = {
+                **model_kwargs,
+                "cpu_threads": max(1, (os.cpu_count() or 1) // workers),
+            }
+
+        # Spawned rather than forked, so workers do not inherit the server's
+        # threads, sockets or CUDA context
+        self._context = multiprocessing.get_context("spawn")
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=self._context,
+            initializer=_init_worker,
+            initargs=(model_kwargs, batch_size),
+        )
+        self._slots = threading.BoundedSemaphore(workers + max(0, queue_size))
+        self._queue_timeout = queue_timeout
+
+        self._manager = None
+        self._manager_lock = threading.Lock()
+
+    def _get_manager(self):
+        with self._manager_lock:
+            if self._manager is None:
+                self._manager = self._context.Manager()
+            return self._manager
+
+    def submit(self, file_path: str, options: dict, segment_queue=None):
+        if not self._slots.acquire(timeout=self._queue_timeout):
+            raise WhisperPoolFullError("Too many transcriptions in progress")
+
+        try:
+            future = self._executor.submit(
+                _transcribe, file_path, options, segment_queue
+            )
+        except Exception:
+            self._slots.release()
+            raise
+
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def transcribe(
+        self,
+        file_path: str,
+        options: dict,
+        on_segment: Optional[Callable[[str], None]] = None,
+    ) -> dict:
+        if on_segment is None:
+            return self.submit(file_path, options).result()
+
+        segment_queue = self._get_manager().Queue()
+        future = self.submit(file_path, options, segment_queue)
+
+        while True:
+            try:
+                text = segment_queue.get(timeout=0.1)
+            except queue.Empty:
+                # The worker died without sending the end of the segments
+                if future.done():
+                    break
+                continue
+
+            if text is None:
+                break
+            on_segment(text)
+
+        return future.result()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+        with self._manager_lock:
+            if self._manager is not None:
+                self._manager.shutdown()
+                self._manager = None